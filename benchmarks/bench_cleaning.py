@@ -0,0 +1,70 @@
+"""Бенчмарк очистки листов: прежний построчный алгоритм против векторизованного.
+
+Запуск: python benchmarks/bench_cleaning.py [число_строк ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.excel_loader import blank_rows_mask, stringify_frame
+
+
+def legacy_clean(df):
+    """Прежняя очистка из load_excel_data(): проход по столбцам и apply по строкам"""
+    cleaned_df = df.fillna('')
+    for col in cleaned_df.columns:
+        cleaned_df[col] = cleaned_df[col].astype(str)
+        cleaned_df[col] = cleaned_df[col].replace('nan', '')
+        cleaned_df[col] = cleaned_df[col].replace('None', '')
+        cleaned_df[col] = cleaned_df[col].replace('<NA>', '')
+    mask = cleaned_df.apply(lambda row: all(str(val).strip() == '' for val in row), axis=1)
+    return cleaned_df[~mask]
+
+
+def vectorized_clean(df):
+    """Новая очистка: один проход mask и маска пустых строк по столбцам"""
+    cleaned_df = stringify_frame(df)
+    return cleaned_df[~blank_rows_mask(cleaned_df)]
+
+
+def make_sheet(rows, seed=0):
+    """Синтетический лист: текст, числа, даты строками и ~20% пустых ячеек"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Задача": rng.choice(["Ввод скрипта", "Анализ причин отвала", "Контроль", None], rows),
+        "Начало": (pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D")).strftime("%Y-%m-%d"),
+        "Длительность": rng.integers(1, 60, rows).astype(float),
+        "Конверсия": rng.random(rows),
+        "Комментарий": rng.choice(["", "None", "nan", "ok"], rows),
+    })
+    for col in df.columns:
+        df.loc[rng.random(rows) < 0.2, col] = None
+    return df
+
+
+def measure(func, df, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    print(f"{'строк':>8} {'прежняя, с':>12} {'новая, с':>10} {'ускорение':>10}")
+    for rows in sizes:
+        df = make_sheet(rows)
+        assert legacy_clean(df).equals(vectorized_clean(df))
+        legacy = measure(legacy_clean, df)
+        vectorized = measure(vectorized_clean, df)
+        print(f"{rows:>8} {legacy:>12.4f} {vectorized:>10.4f} {legacy / vectorized:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 100_000])
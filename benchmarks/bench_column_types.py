@@ -0,0 +1,58 @@
+"""Бенчмарк памяти разделов: все ячейки строками против типизированных столбцов.
+
+Запуск: python benchmarks/bench_column_types.py [число_строк]
+"""
+import glob
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.column_types import infer_column_types
+from core.excel_loader import parse_workbook, stringify_frame
+
+
+def make_sheet(rows, seed=0):
+    """Очищенный лист мониторинга, как раньше: все ячейки - строки, пустые - ''"""
+    rng = np.random.default_rng(seed)
+    plan = rng.integers(10, 500, rows).astype(float)
+    fact = np.round(plan * rng.uniform(0.5, 1.5, rows), 2)
+    df = pd.DataFrame({
+        "Показатель": rng.choice(["Конверсия", "Выручка", "Количество записей", "Средний чек"], rows),
+        "Месяц": (pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 1000, rows), unit="D")).strftime("%Y-%m-%d"),
+        "План": plan,
+        "Факт": np.where(rng.random(rows) < 0.2, np.nan, fact),
+        "Выполнение": [f"{value:.1f}%" for value in rng.uniform(50, 150, rows)],
+        "Комментарий": [f"Комментарий {i}" for i in range(rows)],
+    })
+    return stringify_frame(df)
+
+
+def memory(frames):
+    return sum(int(df.memory_usage(deep=True).sum()) for df in frames)
+
+
+def report(label, str_frames):
+    object_frames = [df.astype(object) for df in str_frames]
+    typed_frames = [infer_column_types(df) for df in str_frames]
+    before_object, before_str, after = memory(object_frames), memory(str_frames), memory(typed_frames)
+    print(f"{label:>28} {before_object / 2**20:10.2f} {before_str / 2**20:10.2f} {after / 2**20:10.2f} "
+          f"{before_object / after:8.1f}x {before_str / after:8.1f}x")
+
+
+def main(rows=100000):
+    print(f"{'':>28} {'object, МБ':>10} {'str, МБ':>10} {'типы, МБ':>10} {'от object':>9} {'от str':>9}")
+    report(f"мониторинг, {rows} строк", [make_sheet(rows)])
+    workbooks = sorted(glob.glob(os.path.join(ROOT, "*.xlsx")))
+    if workbooks:
+        # Разделы из репозитория: возвращаем их к прежнему виду "все строки" для сравнения
+        sections = [stringify_frame(df) for path in workbooks for df in parse_workbook(path).values()]
+        report(f"книги репозитория ({len(sections)} листов)", sections)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,43 @@
+"""Бенчмарк холодного импорта: приложение Streamlit против слоя данных core.
+
+Каждый импорт выполняется в новом процессе интерпретатора (медиана из нескольких запусков).
+Запуск: python benchmarks/bench_import.py [запусков]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "приложение (business_case_app)": "import business_case_app",
+    "слой данных core": "import core.config, core.portfolio, core.changelog_store, core.excel_export, "
+                        "core.section_registry, core.search_index, core.project_list",
+    "хранилище (core.storage)": "import core.storage",
+    "итоги портфеля (core.portfolio)": "import core.portfolio",
+    "openpyxl (теперь - только при чтении Excel)": "import openpyxl",
+}
+
+
+def import_time(statement, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def main(runs=5):
+    baseline = import_time("pass", runs)
+    print(f"Запуск интерпретатора: {baseline * 1000:.0f} мс (вычитается из результатов)")
+    print(f"{'':>46} {'импорт, мс':>11}")
+    for label, statement in CASES.items():
+        print(f"{label:>46} {(import_time(statement, runs) - baseline) * 1000:11.0f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,80 @@
+"""Бенчмарк поиска: инвертированный индекс против перебора текстов проектов.
+
+Запуск: python benchmarks/bench_search.py [число_проектов]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.search_index import SearchIndex, tokenize
+
+WORDS = [
+    "конверсия", "выручка", "клиники", "запись", "пациенты", "маркетинг", "CRM", "телемедицина",
+    "скидка", "лояльность", "анализы", "диагностика", "расписание", "врачи", "отчетность", "бюджет",
+    "персонал", "обучение", "сайт", "приложение", "звонки", "повторные", "визиты", "средний", "чек",
+]
+QUERIES = ["конверсии", "crm", "повторные визиты", "телемед", "средний чек 2026", "несуществующее"]
+SECTIONS = 6
+
+
+def make_documents(projects, seed=0):
+    """Поля и разделы синтетических проектов: {(project_id, документ): текст}"""
+    rng = np.random.default_rng(seed)
+    documents = {}
+    for i in range(projects):
+        project_id = f"project_{i}"
+        documents[(project_id, "Название")] = " ".join(rng.choice(WORDS, 3))
+        documents[(project_id, "Описание")] = " ".join(rng.choice(WORDS, 20))
+        for section in range(SECTIONS):
+            cells = list(rng.choice(WORDS, 200)) + [str(value) for value in rng.integers(2024, 2030, 50)]
+            documents[(project_id, f"Раздел {section}")] = " ".join(cells)
+    return documents
+
+
+def scan(documents, query):
+    """Поиск без индекса: токенизация каждого документа на каждый запрос"""
+    terms = tokenize(query)
+    found = set()
+    for doc_id, text in documents.items():
+        doc_terms = tokenize(text)
+        if all(any(term.startswith(prefix) for term in doc_terms) for prefix in terms):
+            found.add(doc_id)
+    return found
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main(projects=500):
+    documents = make_documents(projects)
+    index = SearchIndex()
+    started = time.perf_counter()
+    for doc_id, text in documents.items():
+        index.index_document(doc_id, text)
+    print(f"{projects} проектов, {len(documents)} документов, построение индекса: "
+          f"{time.perf_counter() - started:.2f} с")
+
+    print(f"{'запрос':>20} {'найдено':>8} {'перебор, мс':>12} {'индекс, мс':>11}")
+    for query in QUERIES:
+        scan_time, expected = timed(lambda: scan(documents, query), 1)
+        index_time, found = timed(lambda: index.search(query), 100)
+        assert found == expected, query
+        print(f"{query:>20} {len(found):8} {scan_time * 1000:12.1f} {index_time * 1000:11.3f}")
+
+    # Правка одного раздела переиндексирует только его
+    doc_id = ("project_0", "Раздел 0")
+    update_time, _ = timed(lambda: index.index_document(doc_id, documents[doc_id] + " новаятерминология"), 1)
+    print(f"переиндексация одного раздела: {update_time * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,105 @@
+"""Бенчмарк памяти на сессию: прежний словарь excel_data против общего реестра разделов.
+
+Запуск: python benchmarks/bench_session_memory.py [проектов] [строк_на_лист] [сессий]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import DEFAULT_SECTIONS
+from core.excel_loader import stringify_frame
+from core.section_registry import SectionSnapshot, SectionView
+
+SECTIONS = DEFAULT_SECTIONS
+# Раздел с тестовыми данными статусов (последний стандартный раздел)
+STATUS_SECTION = SECTIONS[-1]
+
+
+def make_workbooks(projects, rows, seed=0):
+    """Синтетические очищенные листы, как их отдает кэш Excel файлов"""
+    rng = np.random.default_rng(seed)
+    words = np.array(["Ввод скрипта", "Анализ причин отвала", "Контроль", "0.25", "2025-05-01", ""])
+    return {
+        f"business_case_{p + 1}.xlsx": {
+            sheet: stringify_frame(pd.DataFrame(rng.choice(words, (rows, 6)), columns=[f"Столбец_{i}" for i in range(6)]))
+            for sheet in SECTIONS
+        }
+        for p in range(projects)
+    }
+
+
+def sample_status():
+    return pd.DataFrame({"Инициатива": ["a", "b", "c"], "Статус": ["L3", "L2", "L4"], "Прогресс (%)": [75, 45, 90]})
+
+
+def legacy_session(workbooks):
+    """Прежний load_excel_data(): копия под ключом проекта и под названием раздела"""
+    all_data = {}
+    for path, sheets in workbooks.items():
+        project_id = path.replace(".xlsx", "")
+        for sheet_name, df in sheets.items():
+            all_data[f"{project_id}_{sheet_name}"] = df.copy()
+            all_data[sheet_name] = df.copy()
+    sample_data = sample_status()
+    all_data[STATUS_SECTION] = sample_data
+    for path in workbooks:
+        all_data[f"{path.replace('.xlsx', '')}_{STATUS_SECTION}"] = sample_data.copy()
+    return all_data
+
+
+def registry_snapshot(workbooks):
+    """Общий снимок: каждая таблица один раз, названия разделов - псевдонимы"""
+    frames, aliases = {}, {}
+    for path, sheets in workbooks.items():
+        project_id = path.replace(".xlsx", "")
+        for sheet_name, df in sheets.items():
+            frames[f"{project_id}_{sheet_name}"] = df
+            aliases[sheet_name] = f"{project_id}_{sheet_name}"
+    sample_data = sample_status()
+    for path in workbooks:
+        frames[f"{path.replace('.xlsx', '')}_{STATUS_SECTION}"] = sample_data
+    return SectionSnapshot(frames, aliases)
+
+
+def allocated():
+    return tracemalloc.get_traced_memory()[0] + pa.total_allocated_bytes()
+
+
+def measure(build_session, sessions):
+    """Средний прирост памяти (Python + Arrow) на одну сессию, которая правит один раздел"""
+    gc.collect()
+    before = allocated()
+    states = []
+    for _ in range(sessions):
+        state = build_session()
+        key = "business_case_1_d. Диаграмма Ганта"
+        edited = state[key].copy()
+        edited.iloc[0, 0] = "правка"
+        state[key] = edited
+        states.append(state)
+    gc.collect()
+    return (allocated() - before) / sessions
+
+
+def main(projects=20, rows=2000, sessions=10):
+    workbooks = make_workbooks(projects, rows)
+    snapshot = registry_snapshot(workbooks)
+    tracemalloc.start()
+    legacy = measure(lambda: legacy_session(workbooks), sessions)
+    shared = measure(lambda: SectionView(snapshot), sessions)
+    tracemalloc.stop()
+    print(f"проектов: {projects}, строк на лист: {rows}, сессий: {sessions}")
+    print(f"прежний словарь excel_data: {legacy / 2**20:8.2f} МБ на сессию")
+    print(f"реестр разделов:            {shared / 2**20:8.2f} МБ на сессию")
+    print(f"экономия:                   {legacy / max(shared, 1):8.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
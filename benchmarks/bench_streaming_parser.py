@@ -0,0 +1,94 @@
+"""Бенчмарк чтения Excel: pd.read_excel + очистка против потокового разбора openpyxl.
+
+Каждый способ запускается в отдельном процессе, чтобы честно измерить пик памяти (RSS).
+Запуск: python benchmarks/bench_streaming_parser.py [число_строк]
+"""
+import datetime
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bulk_import import DETAILS_SECTION
+from core.effect_series import MONITORING_SECTION
+from core.excel_loader import clean_sheet_data, parse_workbook
+
+
+def make_workbook(path, rows, seed=0):
+    """Синтетическая книга: большой лист мониторинга (даты, числа, текст, пропуски,
+    пустые строки и пустой столбец) и небольшой лист деталей"""
+    rng = np.random.default_rng(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    details = workbook.create_sheet(DETAILS_SECTION)
+    details.append(["Название инициативы", "Описание инициативы", "Ответственный за инициативу"])
+    details.append(["Синтетическая инициатива", "Описание", "Владелец"])
+
+    monitoring = workbook.create_sheet(MONITORING_SECTION)
+    monitoring.append(["Показатель", "Месяц", "План", "Факт", None, "Отклонение", "Комментарий"])
+    start = datetime.datetime(2025, 1, 1)
+    names = ["Конверсия", "Выручка", "Количество записей", "Средний чек"]
+    comments = ["", "ok", "Требуется анализ", "N/A"]
+    for i in range(rows):
+        if i % 50 == 49:
+            monitoring.append([None] * 7)
+            continue
+        plan = float(rng.integers(10, 500))
+        fact = None if rng.random() < 0.2 else round(plan * rng.uniform(0.5, 1.5), 2)
+        monitoring.append([
+            names[i % len(names)],
+            start + datetime.timedelta(days=int(i % 1000)),
+            plan,
+            fact,
+            None,
+            None if fact is None else round(fact - plan, 2),
+            comments[i % len(comments)] or None,
+        ])
+    workbook.save(path)
+
+
+def legacy_parse(path):
+    """Прежний путь load_excel_data(): pd.read_excel всех листов и очистка"""
+    return {name: clean_sheet_data(name, df) for name, df in pd.read_excel(path, sheet_name=None).items()}
+
+
+def run(method, path, queue):
+    parse = {"pd.read_excel": legacy_parse, "потоковый openpyxl": parse_workbook}[method]
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    sheets = parse(path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    queue.put((elapsed, peak * 1024, len(sheets[MONITORING_SECTION])))
+
+
+def measure(method, path):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=run, args=(method, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main(rows=100000):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.xlsx")
+        make_workbook(path, rows)
+        print(f"строк: {rows}, размер файла: {os.path.getsize(path) / 2**20:.1f} МБ")
+        print(f"{'способ':>20} {'время, с':>10} {'пик RSS, МБ':>12} {'строк':>8}")
+        for method in ("pd.read_excel", "потоковый openpyxl"):
+            elapsed, peak, parsed_rows = measure(method, path)
+            print(f"{method:>20} {elapsed:10.2f} {peak / 2**20:12.1f} {parsed_rows:8}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,315 @@
+"""Набор бенчмарков основных путей приложения на синтетическом портфеле, без сервера Streamlit.
+
+Генерирует N проектов с M стандартными разделами по R строк, замеряет загрузку
+разделов (Excel и снимки), очистку листов, выгрузку в Excel, сохранение проектов
+и разделов, запись истории изменений, фильтрацию списка проектов, сводный план (Гант)
+и ряды мониторинга эффекта. Результат -
+JSON с временем, пропускной способностью и приростом пика памяти (RSS) каждого этапа, чтобы
+отслеживать регрессии между версиями.
+
+Запуск: python benchmarks/run_benchmarks.py --projects 20 --sheets 6 --rows 500 [--backend sqlite] [--output result.json]
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.config import DEFAULT_SECTIONS
+from core.excel_export import update_workbook
+from core.excel_loader import WorkbookCache, clean_sheet_data, read_sheet_streaming
+from core.fingerprint import frame_fingerprint
+from core.effect_series import MONITORING_SECTION, EffectStore, parse_monitoring_sheet
+from core.gantt import GANTT_SECTION, GanttCache, build_figure, parse_tasks
+from core.portfolio import FINANCIAL_SECTION
+from core.project_list import ProjectFacets, get_page, sort_projects
+from core.section_registry import SectionSnapshot, SectionView
+from core.snapshot_store import SnapshotStore
+from core.storage import create_storage
+
+# Стандартные разделы бизнес-кейса
+SECTIONS = DEFAULT_SECTIONS
+STATUSES = ["L0", "L1", "L2", "L3", "L4", "L5"]
+OWNERS = ["Екатерина Михненко", "РОП офис Москва", "Светлана (РОП)", "Руслан Амерханов"]
+DEPARTMENTS = ["Маркетинг и продажи", "Продажи и сервис", "Региональные продажи", "Финансы"]
+CHANGELOG_ENTRIES = 1000
+
+
+def write_section(worksheet, section, rows, rng):
+    """Лист раздела: заголовок и rows строк с числами, датами, текстом и пропусками"""
+    start = datetime.datetime(2025, 1, 1)
+    if section == FINANCIAL_SECTION:
+        worksheet.append(["Показатель", "2025", "2026", "2027", "Комментарий"])
+        for i in range(rows):
+            worksheet.append([f"Статья {i}"] + [float(value) for value in rng.integers(0, 100, 3)] + [None])
+    elif section == GANTT_SECTION:
+        worksheet.append(["Задача", "Ответственный", "Начало", "Окончание", "Статус"])
+        for i in range(rows):
+            begin = start + datetime.timedelta(days=int(rng.integers(0, 700)))
+            worksheet.append([f"Задача {i}", OWNERS[i % len(OWNERS)], begin,
+                              begin + datetime.timedelta(days=int(rng.integers(5, 90))),
+                              ["Не начата", "В работе", "Завершена"][i % 3]])
+    else:
+        worksheet.append(["Показатель", "Месяц", "План", "Факт", "Комментарий"])
+        for i in range(rows):
+            plan = float(rng.integers(10, 500))
+            fact = None if rng.random() < 0.2 else round(plan * rng.uniform(0.5, 1.5), 2)
+            worksheet.append([f"Показатель {i % 20}", start + datetime.timedelta(days=30 * (i % 36)),
+                              plan, fact, None if i % 3 else f"Комментарий {i}"])
+
+
+def make_portfolio(directory, projects, sheets, rows, seed=0):
+    """Синтетический портфель: книги Excel проектов и записи базы проектов"""
+    rng = np.random.default_rng(seed)
+    workbooks = {}
+    database = {}
+    for i in range(projects):
+        project_id = f"bench_project_{i}"
+        path = os.path.join(directory, f"{project_id}.xlsx")
+        workbook = openpyxl.Workbook(write_only=True)
+        for section in SECTIONS[:sheets]:
+            write_section(workbook.create_sheet(section), section, rows, rng)
+        workbook.save(path)
+        workbooks[project_id] = path
+        database[project_id] = {
+            "id": project_id,
+            "name": f"Синтетический проект {i}",
+            "description": "Увеличение конверсии и повторных визитов",
+            "sections": {section: "" for section in SECTIONS[:sheets]},
+            "status": STATUSES[i % len(STATUSES)],
+            "owner": OWNERS[i % len(OWNERS)],
+            "department": DEPARTMENTS[(i // 2) % len(DEPARTMENTS)],
+            "target_revenue": f"{i % 200} млн руб (2026)",
+            "start_date": "2025-01-01",
+            "end_date": "2026-12-31",
+            "last_updated": (datetime.datetime(2025, 1, 1) + datetime.timedelta(hours=i)).isoformat(),
+            "created_date": "2025-01-01",
+        }
+    return workbooks, database
+
+
+def current_rss():
+    """Текущий RSS процесса в байтах (Linux: /proc/self/statm; иначе - пиковый ru_maxrss)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler:
+    """Пик RSS за время этапа: фоновый поток опрашивает память процесса.
+
+    В отличие от tracemalloc, не замедляет код и учитывает память Arrow и numpy.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        gc.collect()
+        self.baseline = self.peak = current_rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+def measure(results, name, func, items, unit):
+    """Запускаем этап, записываем время, пропускную способность и прирост пика RSS"""
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - started
+    results[name] = {
+        "seconds": round(seconds, 6),
+        "items": items,
+        "unit": unit,
+        "throughput_per_second": round(items / seconds, 2) if seconds > 0 else None,
+        "peak_memory_mb": round((sampler.peak - sampler.baseline) / 2**20, 3),
+    }
+    return value
+
+
+def load_sections(workbooks, cache):
+    """Как load_excel_data(): общий снимок разделов с ленивым загрузчиком листов, чтение всех разделов"""
+    def load_section(section_key):
+        project_id, section = section_key.split("|", 1)
+        return cache.get_sheet(workbooks[project_id], section)
+
+    view = SectionView(SectionSnapshot({}, loader=load_section))
+    return {key: view[key] for key in (f"{project_id}|{section}" for project_id in workbooks for section in SECTIONS)
+            if key in view}
+
+
+def filter_projects(facets, projects_database, iterations=100):
+    """Фильтрация списка: пересечение фасетов, сортировка и первая страница"""
+    selections = [
+        {"status": ["L2", "L3"]},
+        {"status": ["L0"], "owner": [OWNERS[0]]},
+        {"department": DEPARTMENTS[:2]},
+        {},
+    ]
+    for i in range(iterations):
+        ids = facets.filter(selections[i % len(selections)])
+        projects = sort_projects([projects_database[project_id] for project_id in ids], "Последнее обновление")
+        get_page(projects, 1, 25)
+
+
+def run(projects, sheets, rows, backend="json", keep=False):
+    directory = tempfile.mkdtemp(prefix="bench_portfolio_")
+    results = {}
+    try:
+        workbooks, database = measure(
+            results, "generate_workbooks", lambda: make_portfolio(directory, projects, sheets, rows),
+            projects * sheets, "sheets")
+        total_rows = projects * sheets * rows
+
+        # Загрузка: разбор Excel (с записью снимков), затем новый процесс-кэш поверх снимков
+        snapshot_dir = os.path.join(directory, ".snapshots")
+        project_for = {path: project_id for project_id, path in workbooks.items()}
+        cold_cache = WorkbookCache(SnapshotStore(snapshot_dir), project_for.get)
+        sections = measure(results, "load_sections_excel", lambda: load_sections(workbooks, cold_cache),
+                           total_rows, "rows")
+        warm_cache = WorkbookCache(SnapshotStore(snapshot_dir), project_for.get)
+        measure(results, "load_sections_snapshot", lambda: load_sections(workbooks, warm_cache),
+                total_rows, "rows")
+        measure(results, "load_sections_memory", lambda: load_sections(workbooks, warm_cache),
+                total_rows, "rows")
+
+        # Очистка листов отдельно от чтения
+        raw = {(project_id, section): read_sheet_streaming(path, section)
+               for project_id, path in workbooks.items() for section in SECTIONS[:sheets]}
+        measure(results, "clean_sheets",
+                lambda: [clean_sheet_data(section, df) for (_, section), df in raw.items()],
+                total_rows, "rows")
+
+        # Сохранение: по одному измененному листу на проект, как save_excel_data()
+        export_dir = os.path.join(directory, "exports")
+        dirty_section = SECTIONS[min(1, sheets - 1)]
+        measure(results, "save_excel_data", lambda: [
+            update_workbook(os.path.join(export_dir, os.path.basename(path)),
+                            {dirty_section: sections[f"{project_id}|{dirty_section}"]}, base_path=path)
+            for project_id, path in workbooks.items()
+        ], projects, "workbooks")
+
+        storage = create_storage(backend, os.path.join(directory, "projects_database.json"),
+                                 os.path.join(directory, "changelog.jsonl"),
+                                 db_file=os.path.join(directory, "business_cases.db"))
+        measure(results, "save_projects_database", lambda: storage.save_projects(database), projects, "projects")
+        if backend == "sqlite":
+            measure(results, "save_sections", lambda: storage.save_sections(
+                {key.replace("|", "_", 1): df for key, df in sections.items()}
+            ), len(sections), "sections")
+
+        entries = [{
+            "id": str(uuid.uuid4()),
+            "project_id": f"bench_project_{i % projects}",
+            "timestamp": datetime.datetime.now().isoformat(),
+            "user": "Бенчмарк",
+            "action": "Редактирование данных",
+            "details": f"Изменение {i}",
+        } for i in range(CHANGELOG_ENTRIES)]
+        single = entries[:CHANGELOG_ENTRIES // 10]
+        measure(results, "add_changelog_entry_single", lambda: [storage.append_changelog(entry) for entry in single],
+                len(single), "entries")
+        measure(results, "add_changelog_entry_batch", lambda: storage.append_changelog_entries(entries),
+                len(entries), "entries")
+
+        facets = measure(results, "build_list_facets", lambda: ProjectFacets(database.values()), projects, "projects")
+        measure(results, "filter_projects_list", lambda: filter_projects(facets, database), 100, "queries")
+
+        # Сводный план: разбор задач и фигура портфеля, затем повторный показ из кэша по отпечаткам
+        if GANTT_SECTION in SECTIONS[:sheets]:
+            gantt_cache = GanttCache()
+            gantt_frames = {project_id: sections[f"{project_id}|{GANTT_SECTION}"] for project_id in workbooks}
+
+            def portfolio_figure():
+                key = tuple((project_id, frame_fingerprint(df)) for project_id, df in gantt_frames.items())
+                return gantt_cache.get_or_build(key, lambda: build_figure(
+                    pd.concat([parse_tasks(df, project_id, database[project_id]["name"])
+                               for project_id, df in gantt_frames.items()], ignore_index=True),
+                    color_by="project", show_project=True))
+
+            measure(results, "gantt_portfolio_figure", portfolio_figure, projects * rows, "tasks")
+            measure(results, "gantt_portfolio_figure_cached", portfolio_figure, projects * rows, "tasks")
+
+        # Мониторинг эффекта: разбор листов в ряды, затем запросы по всему портфелю
+        if MONITORING_SECTION in SECTIONS[:sheets]:
+            effect_store = EffectStore()
+            measure(results, "effect_store_build", lambda: [
+                effect_store.set_project(project_id, parse_monitoring_sheet(sections[f"{project_id}|{MONITORING_SECTION}"]))
+                for project_id in workbooks
+            ], projects * rows, "rows")
+            measure(results, "effect_query_quarterly", lambda: effect_store.query(freq="QS"), projects * rows, "rows")
+            measure(results, "effect_portfolio_totals", lambda: [effect_store.totals(metric, freq="YS")
+                                                                 for metric in effect_store.metrics()],
+                    projects * rows, "rows")
+    finally:
+        if keep:
+            print(f"Данные бенчмарка сохранены в {directory}", file=sys.stderr)
+        else:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        "parameters": {"projects": projects, "sheets": sheets, "rows": rows, "backend": backend},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now().isoformat(),
+        },
+        "stages": results,
+        # ru_maxrss в Linux - в килобайтах
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=20, help="число проектов (N)")
+    parser.add_argument("--sheets", type=int, default=len(SECTIONS), choices=range(1, len(SECTIONS) + 1),
+                        help="число разделов на проект (M)")
+    parser.add_argument("--rows", type=int, default=500, help="строк на лист (R)")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json", help="хранилище проектов")
+    parser.add_argument("--output", help="файл для JSON результата (по умолчанию - stdout)")
+    parser.add_argument("--keep", action="store_true", help="не удалять сгенерированные файлы")
+    args = parser.parse_args(argv)
+
+    report = run(args.projects, args.sheets, args.rows, args.backend, args.keep)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,48 +5,36 @@ from datetime import datetime, date
 import os
 import json
 import uuid
+import time
 
-# Конфигурация страницы
-st.set_page_config(
-    page_title="Управление бизнес-кейсами",
-    page_icon="💼",
-    layout="wide"
+from core.config import (
+    DEFAULT_SECTIONS, EXCEL_FILES, EXCEL_MAX_WORKERS, EXPORT_DIR, JOB_QUEUE_SIZE, JOB_WORKERS, L_STATUSES, PROJECT_TO_FILE,
+    PROJECTS_FILE, open_storage, open_workbook_cache
 )
+from core.bulk_import import import_workbooks
+from core.excel_loader import stringify_frame, warm_workbook_cache
+from core.fingerprint import frame_fingerprint
+from core.effect_series import FREQUENCIES, MONITORING_SECTION, EffectStore, parse_monitoring_sheet
+from core.gantt import GANTT_SECTION, GanttCache, build_figure, empty_tasks, filter_window, parse_tasks, timeline_span
+from core.excel_export import ExcelExporter
+from core.job_queue import JobScheduler, QueueFullError, concat_args, merge_dict_args
+from core.changelog_store import ChangelogIndex
+from core.storage import ConflictError
+from core.section_changes import PendingChanges, diff_frames, has_changes, summarize
+from core.section_registry import CopyOnWrite, SectionRegistry, SectionView
+from core.column_types import DATE, NUMERIC, PERCENT, blank_row, column_kind
+from core.portfolio import FINANCIAL_SECTION, ROLLUP_DIMENSIONS, PortfolioRollups, project_amounts, project_attributes
+from core.search_index import SearchIndex
+from core.profiling import profiled, profiler, session_state_sizes
+from core.project_list import (DEFAULT_PAGE_SIZE, PAGE_SIZE_OPTIONS, SORT_OPTIONS, ProjectFacets, get_page,
+                               page_count, projects_table, sort_projects)
 
-# Путь к Excel файлам
-EXCEL_FILES = [
-    "Бизнес_кейс_Михненко_Екатерина.xlsx",
-    "Бизнес_кейс_Зырянова.xlsx",
-    "Бизнес_кейс. Руслан Амерханов.xlsx"
-]
-PROJECTS_FILE = "projects_database.json"
-CHANGELOG_FILE = "changelog.json"
-
-# L-статусы с описаниями
-L_STATUSES = {
-    "L0": {"name": "Идея", "description": "Сбор всех идей, независимо от реализуемости или масштаба"},
-    "L1": {"name": "Идентифицировано", "description": "Инициатива признана перспективной, проводится первичная оценка и уточнение"},
-    "L2": {"name": "Планирование", "description": "Разработка подробного бизнес-кейса, утверждение инициативы"},
-    "L3": {"name": "Исполнение", "description": "Реализация инициативы по утвержденному плану, выполнение ключевых мероприятий"},
-    "L4": {"name": "Завершено", "description": "Все шаги по реализации завершены, идет проверка достижения целевых показателей"},
-    "L5": {"name": "Реализовано", "description": "Фактическая ценность подтверждена в бизнес-результатах"}
-}
-
-# Инициализация состояния
-if 'current_view' not in st.session_state:
-    st.session_state.current_view = "projects_list"  # projects_list, project_detail, new_project, changelog
-
-if 'selected_project' not in st.session_state:
-    st.session_state.selected_project = None
-
-if 'selected_section' not in st.session_state:
-    st.session_state.selected_section = None
-
-if 'projects_database' not in st.session_state:
-    st.session_state.projects_database = {}
-
-if 'changelog' not in st.session_state:
-    st.session_state.changelog = []
+# Правки таблиц копятся и записываются в историю не чаще раза в N секунд (или при сохранении)
+CHANGELOG_DEBOUNCE_SECONDS = 30
+# Сколько изменений ячеек хранить в одной записи истории
+CHANGELOG_MAX_CELL_CHANGES = 200
+# Размеры страницы в истории изменений
+CHANGELOG_PAGE_SIZES = [10, 20, 50, 100]
 
 def generate_sample_status_data():
     """Генерируем данные для статусов инициатив на основе загруженных проектов"""
@@ -89,146 +77,209 @@ def generate_sample_status_data():
     })
     return status_data
 
-def load_excel_data():
-    """Загружаем все листы из Excel файлов"""
-    all_data = {}
-    
-    # Маппинг файлов к проектам
-    file_to_project = {
-        "Бизнес_кейс_Михненко_Екатерина.xlsx": "business_case_1",
-        "Бизнес_кейс_Зырянова.xlsx": "business_case_2",
-        "Бизнес_кейс. Руслан Амерханов.xlsx": "business_case_3"
-    }
+@st.cache_resource
+def get_storage():
+    """Хранилище проектов, разделов и истории изменений, общее для всех сессий"""
+    return open_storage()
+
+@st.cache_resource
+def get_workbook_cache():
+    """Кэш разобранных Excel файлов, общий для всех сессий"""
+    return open_workbook_cache()
+
+@st.cache_resource
+def get_job_scheduler():
+    """Очередь фоновых задач ввода-вывода, общая для всех сессий"""
+    return JobScheduler(max_workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE)
+
+@st.cache_resource
+def get_excel_exporter():
+    """Фоновая выгрузка разделов в Excel, общая для всех сессий"""
+    return ExcelExporter(EXPORT_DIR, scheduler=get_job_scheduler())
+
+def track_job(job, notify=False, dirty_keys=()):
+    """Запоминаем задачу сессии, чтобы показать ее прогресс и результат при следующих перезапусках"""
+    jobs = st.session_state.setdefault('jobs', {})
+    tracked = jobs.setdefault(job.id, {"job": job, "notify": False, "dirty_keys": set()})
+    tracked["notify"] = tracked["notify"] or notify
+    tracked["dirty_keys"].update(dirty_keys)
+
+def submit_job(target, label, func, *args, merge=None, progress=False, notify=False):
+    """Выполняем операцию в фоне; если очередь заполнена - сразу, в текущем потоке"""
+    try:
+        job = get_job_scheduler().submit(target, func, *args, label=label, merge=merge, progress=progress)
+    except QueueFullError:
+        if progress:
+            func(*args, progress=lambda fraction, message="": None)
+        else:
+            func(*args)
+        return None
+    track_job(job, notify=notify)
+    return job
+
+def show_job_status():
+    """Прогресс фоновых задач сессии и результаты завершившихся"""
+    jobs = st.session_state.get('jobs', {})
+    for job_id, tracked in list(jobs.items()):
+        job = tracked["job"]
+        if not job.done:
+            text = f"⏳ {job.label}" + (f": {job.message}" if job.message else "")
+            st.sidebar.progress(job.progress, text=text)
+            continue
+        del jobs[job_id]
+        if job.status == "error":
+            st.sidebar.error(f"❌ {job.label}: {job.error}")
+            # Разделы остаются несохраненными и попадут в следующее сохранение
+            if tracked["dirty_keys"] and 'excel_data' in st.session_state:
+                st.session_state.excel_data.mark_dirty(tracked["dirty_keys"])
+        elif tracked["notify"]:
+            st.sidebar.success(f"✅ {job.label}")
+
+@st.cache_resource
+def get_section_registry():
+    """Таблицы разделов, общие для всех сессий (каждая хранится один раз)"""
+    return SectionRegistry()
+
+def project_source_file(project_id, projects=None):
+    """Исходный Excel файл проекта: импортированный (source_file) или известный файл
+    (projects - по умолчанию проекты сессии)"""
+    projects = st.session_state.get('projects_database', {}) if projects is None else projects
+    return projects.get(project_id, {}).get("source_file") or PROJECT_TO_FILE.get(project_id)
+
+class SectionLoadError(Exception):
+    """Раздел не удалось прочитать из хранилища или Excel файла проекта"""
+
+def load_section(section_key):
+    """Загружаем один раздел: из хранилища, иначе из Excel файла его проекта - читается только нужный лист.
+
+    Загрузчик общий для всех сессий (снимок разделов), поэтому проекты берутся из хранилища,
+    а не из session state, а ошибки поднимаются исключением: снимок запоминает их, и сообщение
+    показывает show_section_data той сессии, которая открыла раздел.
+    """
+    storage = get_storage()
+    # Разделы первого проекта могли быть сохранены под простым названием раздела
+    stored_keys = [section_key]
+    if section_key.startswith("business_case_1_"):
+        stored_keys.append(section_key[len("business_case_1_"):])
+    try:
+        for stored_key in stored_keys:
+            df = storage.load_section(stored_key)
+            if df is not None:
+                return df
+        projects = storage.load_projects()
+    except Exception as e:
+        raise SectionLoadError(f"Не удалось загрузить раздел из хранилища: {e}") from e
     
-    # Загружаем каждый Excel файл
-    for excel_file in EXCEL_FILES:
+    project_id, section_name = split_section_key(section_key, projects)
+    excel_file = project_source_file(project_id, projects)
+    if excel_file and os.path.exists(excel_file):
         try:
-            if os.path.exists(excel_file):
-                excel_data = pd.read_excel(excel_file, sheet_name=None)
-                filename = os.path.basename(excel_file).replace('.xlsx', '')
-                project_id = file_to_project.get(excel_file, "business_case_1")
-                
-                st.success(f"✅ Загружен файл: {filename}")
-                
-                for sheet_name, df in excel_data.items():
-                    # Очищаем и нормализуем данные
-                    cleaned_df = df.copy()
-                    
-                    # Удаляем полностью пустые строки и столбцы
-                    cleaned_df = cleaned_df.dropna(how='all').dropna(axis=1, how='all')
-                    
-                    # Переименовываем проблематичные колонки
-                    new_columns = []
-                    for i, col in enumerate(cleaned_df.columns):
-                        col_str = str(col)
-                        if col_str.startswith('Unnamed:') or col_str.isdigit() or col_str in ['nan', 'None'] or col_str.strip() == '':
-                            # Даем осмысленные названия
-                            if sheet_name == "a. Детали инициативы":
-                                new_columns.append(f"Поле_{i+1}")
-                            elif sheet_name == "b. Финансовое влияние":
-                                new_columns.append(f"Финансы_{i+1}")
-                            else:
-                                new_columns.append(f"Столбец_{i+1}")
-                        else:
-                            new_columns.append(col_str)
-                    
-                    cleaned_df.columns = new_columns
-                    
-                    # Очищаем от пустых значений и преобразуем в строки
-                    cleaned_df = cleaned_df.fillna('')
-                    for col in cleaned_df.columns:
-                        try:
-                            cleaned_df[col] = cleaned_df[col].astype(str)
-                            cleaned_df[col] = cleaned_df[col].replace('nan', '')
-                            cleaned_df[col] = cleaned_df[col].replace('None', '')
-                            cleaned_df[col] = cleaned_df[col].replace('<NA>', '')
-                        except:
-                            cleaned_df[col] = ''
-                    
-                    # Удаляем строки где все значения пустые
-                    mask = cleaned_df.apply(lambda row: all(str(val).strip() == '' for val in row), axis=1)
-                    cleaned_df = cleaned_df[~mask]
-                    
-                    # Если данных недостаточно, дополняем базовой структурой
-                    if len(cleaned_df) == 0:
-                        if sheet_name == "a. Детали инициативы":
-                            cleaned_df = pd.DataFrame({
-                                "Параметр": ["Название инициативы", "Описание инициативы", "Ответственный за инициативу"],
-                                "Значение": ["", "", ""],
-                                "Комментарий": ["", "", ""]
-                            })
-                        else:
-                            cleaned_df = pd.DataFrame({
-                                "Параметр": [""],
-                                "Значение": [""],
-                                "Комментарий": [""]
-                            })
-                    
-                    # Сохраняем данные с ключом проекта и раздела
-                    section_key = f"{project_id}_{sheet_name}"
-                    all_data[section_key] = cleaned_df.copy()
-                    
-                    # Также сохраняем под простым названием раздела для обратной совместимости
-                    all_data[sheet_name] = cleaned_df.copy()
-                    
+            df = get_workbook_cache().get_sheet(excel_file, section_name)
         except Exception as e:
-            st.error(f"❌ Не удалось загрузить файл {excel_file}: {e}")
-            continue
-    
-    # Если ничего не загрузилось, создаем тестовые данные
-    if not all_data:
-        default_sections = [
-            "a. Детали инициативы",
-            "b. Финансовое влияние", 
-            "c. Поддерживающие расчеты",
-            "d. Диаграмма Ганта",
-            "e. Мониторинг эффекта",
-            "f. Статус инициатив"
-        ]
-        
-        for section in default_sections:
-            empty_df = pd.DataFrame({
-                "Параметр": ["Пример параметра"],
-                "Значение": ["Пример значения"],
-                "Комментарий": ["Пример комментария"]
-            })
-            all_data[section] = empty_df
-            
-            # Для всех проектов
-            for project_id in ["business_case_1", "business_case_2", "business_case_3"]:
-                all_data[f"{project_id}_{section}"] = empty_df.copy()
-    
-    # Добавляем тестовые данные для статусов инициатив
-    status_section = "f. Статус инициатив"
-    sample_data = generate_sample_status_data()
-    all_data[status_section] = sample_data
-    
-    for project_id in ["business_case_1", "business_case_2", "business_case_3"]:
-        all_data[f"{project_id}_{status_section}"] = sample_data.copy()
-    
-    return all_data
+            raise SectionLoadError(f"Не удалось загрузить файл {excel_file}: {e}") from e
+        if df is not None:
+            return df
+    return sample_section(project_id, section_name, excel_file)
+
+def sample_section(project_id, section_name, excel_file):
+    """Тестовые данные разделов начальных проектов - только если раздела нет ни в хранилище, ни в Excel"""
+    if project_id not in PROJECT_TO_FILE:
+        return None
+    if section_name == "f. Статус инициатив":
+        return generate_sample_status_data()
+    # Если Excel файла нет, создаем тестовые данные
+    if section_name in DEFAULT_SECTIONS and not (excel_file and os.path.exists(excel_file)):
+        return pd.DataFrame({
+            "Параметр": ["Пример параметра"],
+            "Значение": ["Пример значения"],
+            "Комментарий": ["Пример комментария"]
+        })
+    return None
+
+def project_workbooks():
+    """Существующие Excel файлы проектов: известные файлы и книги массового импорта (source_file)"""
+    excel_files = list(EXCEL_FILES) + [project["source_file"]
+                                       for project in st.session_state.get('projects_database', {}).values()
+                                       if project.get("source_file")]
+    seen, existing = set(), []
+    for excel_file in excel_files:
+        abs_path = os.path.abspath(excel_file)
+        if abs_path not in seen and os.path.exists(excel_file):
+            seen.add(abs_path)
+            existing.append(excel_file)
+    return existing
+
+def reimport_changed_workbooks():
+    """Книги массового импорта, изменившиеся после импорта, импортируем заново (как повторный запуск CLI):
+    их разделы заменяют сохраненные, в проекте обновляется хэш. Возвращаем число обновленных проектов"""
+    workbook_cache = get_workbook_cache()
+    changed = [project["source_file"] for project in st.session_state.projects_database.values()
+               if project.get("source_hash") and os.path.exists(project["source_file"])
+               and workbook_cache.file_fingerprint(project["source_file"]) != project["source_hash"]]
+    if not changed:
+        return 0
+    # Фоновые сохранения проектов должны завершиться до чтения базы импортом
+    get_job_scheduler().wait_for("projects")
+    report = import_workbooks(changed, get_storage(), max_workers=EXCEL_MAX_WORKERS, log=lambda message: None)
+    for path, error in report["failed"].items():
+        st.error(f"❌ Не удалось импортировать {os.path.basename(path)}: {error}")
+    updated = len(report["imported"]) + len(report["updated"])
+    if updated:
+        st.session_state.projects_database = load_projects_database()
+        st.session_state.pop('project_facets', None)
+    return updated
+
+def build_sections():
+    """Собираем псевдонимы ключей разделов и загрузчик: таблицы читаются при первом обращении"""
+    # Простое название раздела - псевдоним раздела первого проекта для обратной совместимости
+    aliases = {section: f"business_case_1_{section}" for section in DEFAULT_SECTIONS}
+    # Разделы читаются из хранилища (приоритет), затем из Excel, иначе - тестовые данные
+    return {}, aliases, load_section
+
+@profiled()
+def load_excel_data():
+    """Разделы проектов для сессии; листы Excel читаются лениво, при первом открытии раздела"""
+    existing_files = project_workbooks()
+    
+    # Пока файлы и сохраненные разделы не менялись, сессии делят один набор таблиц.
+    # Версия считается по хэшам содержимого файлов (без разбора Excel; хэш пересчитывается,
+    # только если у файла сменились mtime или размер)
+    workbook_cache = get_workbook_cache()
+    version = (
+        tuple((excel_file, workbook_cache.file_fingerprint(excel_file)) for excel_file in existing_files),
+        get_storage().sections_version()
+    )
+    snapshot = get_section_registry().get_or_build(version, build_sections)
+    return SectionView(snapshot)
 
 def load_changelog():
     """Загружаем историю изменений"""
     try:
-        if os.path.exists(CHANGELOG_FILE):
-            with open(CHANGELOG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        return get_storage().load_changelog()
     except Exception as e:
         st.error(f"Ошибка загрузки истории изменений: {e}")
     return []
 
-def save_changelog(changelog):
-    """Сохраняем историю изменений"""
+@profiled()
+def save_changelog_entry(entry):
+    """Дописываем запись в историю изменений (в фоне; записи, ждущие очереди, пишутся одной пачкой)"""
     try:
-        with open(CHANGELOG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(changelog, f, ensure_ascii=False, indent=2)
+        submit_job("changelog", "Запись истории изменений", get_storage().append_changelog_entries, [entry],
+                   merge=concat_args)
         return True
     except Exception as e:
         st.error(f"Ошибка сохранения истории изменений: {e}")
         return False
 
-def add_changelog_entry(project_id, action, details, user="Текущий пользователь"):
+def get_changelog_index():
+    """Индекс истории изменений по проектам и времени (строится один раз за сессию)"""
+    if 'changelog' not in st.session_state:
+        st.session_state.changelog = load_changelog()
+    if 'changelog_index' not in st.session_state:
+        st.session_state.changelog_index = ChangelogIndex(st.session_state.changelog)
+    return st.session_state.changelog_index
+
+def add_changelog_entry(project_id, action, details, user="Текущий пользователь", changes=None):
     """Добавляем запись в историю изменений"""
     entry = {
         "id": str(uuid.uuid4()),
@@ -238,22 +289,43 @@ def add_changelog_entry(project_id, action, details, user="Текущий пол
         "action": action,
         "details": details
     }
+    if changes:
+        entry["changes"] = changes
     
     if 'changelog' not in st.session_state:
         st.session_state.changelog = load_changelog()
     
+    changelog_index = get_changelog_index()
     st.session_state.changelog.append(entry)
-    save_changelog(st.session_state.changelog)
+    changelog_index.add(entry)
+    save_changelog_entry(entry)
+
+def get_pending_changes():
+    """Правки таблиц текущей сессии, еще не записанные в историю"""
+    if 'pending_changes' not in st.session_state:
+        st.session_state.pending_changes = PendingChanges()
+    return st.session_state.pending_changes
+
+def flush_pending_changes(force=False):
+    """Записываем накопленные правки в историю: по истечении интервала или принудительно"""
+    pending = get_pending_changes()
+    if not (force or pending.is_due(CHANGELOG_DEBOUNCE_SECONDS)):
+        return
+    for project_id, section_name, diff in pending.drain():
+        add_changelog_entry(
+            project_id,
+            "Изменение данных",
+            f"Раздел {section_name}: {summarize(diff)}",
+            changes=diff["cells"][:CHANGELOG_MAX_CELL_CHANGES]
+        )
 
 def load_projects_database():
     """Загружаем базу данных проектов"""
     try:
-        if os.path.exists(PROJECTS_FILE):
-            with open(PROJECTS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Если данные не пустые, возвращаем их
-                if data:
-                    return data
+        data = get_storage().load_projects()
+        # Если данные не пустые, возвращаем их
+        if data:
+            return data
     except Exception as e:
         st.warning(f"Ошибка загрузки базы проектов: {e}. Создаем новые данные.")
     
@@ -331,24 +403,51 @@ def load_projects_database():
     
     # Автоматически сохраняем созданные данные
     try:
-        with open(PROJECTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, ensure_ascii=False, indent=2)
+        get_storage().save_projects(projects)
         st.success("✅ Созданы начальные данные проектов")
     except Exception as e:
         st.warning(f"Не удалось сохранить данные: {e}")
     
     return projects
 
+@profiled()
 def save_projects_database(projects_db):
     """Сохраняем базу данных проектов"""
     try:
-        with open(PROJECTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(projects_db, f, ensure_ascii=False, indent=2)
+        get_storage().save_projects(projects_db)
+        return True
+    except Exception as e:
+        st.error(f"Ошибка сохранения базы проектов: {e}")
+        return False
+
+@profiled()
+def save_project(project, expected_last_updated=None):
+    """Сохраняем один проект; ConflictError, если его изменили в другой сессии"""
+    try:
+        get_storage().save_project(project, expected_last_updated=expected_last_updated)
         return True
+    except ConflictError:
+        raise
     except Exception as e:
         st.error(f"Ошибка сохранения базы проектов: {e}")
         return False
 
+@profiled()
+def save_sections_data(data_dict):
+    """Сохраняем разделы в хранилище (в режиме JSON разделы хранятся только в Excel)"""
+    try:
+        saved = get_storage().save_sections(data_dict)
+        if saved:
+            st.success(f"✅ Разделы сохранены в базу данных: {saved}")
+        return True
+    except Exception as e:
+        st.error(f"❌ Ошибка сохранения разделов: {e}")
+        return False
+
+def format_last_updated(value):
+    """Дата последнего обновления для отображения (в базе хранится время с точностью до микросекунд)"""
+    return str(value)[:10]
+
 def get_project_info():
     """Получаем информацию о проектах"""
     if not st.session_state.projects_database:
@@ -356,8 +455,8 @@ def get_project_info():
     
     return list(st.session_state.projects_database.values())
 
-def create_new_project(project_data):
-    """Создаем новый проект"""
+def create_new_project(project_data, additional_sections=()):
+    """Создаем новый проект; additional_sections - пользовательские разделы сверх стандартных"""
     project_id = str(uuid.uuid4())
     today = datetime.now().strftime("%Y-%m-%d")
     
@@ -370,39 +469,50 @@ def create_new_project(project_data):
         "e. Мониторинг эффекта": "Отслеживание результатов",
         "f. Статус инициатив": "Текущий статус и прогресс"
     }
+    # Проект собирается целиком до постановки в очередь записи: задача не должна видеть его изменения
+    sections = dict(default_sections)
+    for section in additional_sections:
+        sections[section] = f"Пользовательский раздел: {section}"
     
     new_project = {
         "id": project_id,
         "name": project_data["name"],
         "description": project_data["description"],
-        "sections": default_sections,
+        "sections": sections,
         "status": project_data["status"],
         "owner": project_data["owner"],
         "department": project_data.get("department", "Не указан"),
         "start_date": project_data.get("start_date", ""),
         "end_date": project_data.get("end_date", ""),
-        "last_updated": today,
+        "last_updated": datetime.now().isoformat(),
         "created_date": today
     }
     
     # Добавляем в базу данных
     st.session_state.projects_database[project_id] = new_project
     
-    # Создаем пустые данные для разделов
+    # Создаем пустые данные для разделов (одна общая таблица, копируется при первой правке)
+    empty_df = pd.DataFrame({
+        "Параметр": [""],
+        "Значение": [""],
+        "Комментарий": [""]
+    })
     for section_name in default_sections.keys():
-        if section_name not in st.session_state.get('excel_data', {}):
-            # Создаем пустую таблицу для нового раздела
-            empty_df = pd.DataFrame({
-                "Параметр": [""],
-                "Значение": [""],
-                "Комментарий": [""]
-            })
-            if 'excel_data' not in st.session_state:
-                st.session_state.excel_data = {}
-            st.session_state.excel_data[section_name] = empty_df
+        section_key = f"{project_id}_{section_name}"
+        # Создаем пустую таблицу для нового раздела
+        if 'excel_data' not in st.session_state:
+            st.session_state.excel_data = load_excel_data()
+        if section_key not in st.session_state.excel_data:
+            st.session_state.excel_data[section_key] = empty_df
+    
+    # Сохраняем в хранилище в фоне (несколько новых проектов подряд - одна запись)
+    submit_job("projects", "Сохранение проектов", get_storage().upsert_projects,
+               {project_id: dict(new_project, sections=dict(sections))},
+               merge=merge_dict_args)
     
-    # Сохраняем в файл
-    save_projects_database(st.session_state.projects_database)
+    update_portfolio(new_project, section_changed=True)
+    update_project_facets(new_project)
+    update_search_index(new_project, sections.keys())
     
     # Добавляем запись в историю изменений
     add_changelog_entry(project_id, "Создание проекта", f"Создан новый проект: {project_data['name']}")
@@ -410,7 +520,10 @@ def create_new_project(project_data):
     return new_project
 
 def get_column_config(df):
-    """Автоматически определяем конфигурацию столбцов на основе типов данных"""
+    """Конфигурация столбцов редактора по типам данных (числа, проценты, даты, текст).
+
+    Категории редактируются как текст: в ячейку можно ввести и новое значение.
+    """
     column_config = {}
     
     for col in df.columns:
@@ -418,32 +531,225 @@ def get_column_config(df):
         col_str = str(col).lower()
         if any(x in col_str for x in ['столбец', 'column', 'unnamed', 'nan', 'none']):
             continue
-            
-        # Все колонки настраиваем как текстовые для избежания ошибок Arrow
-        column_config[col] = st.column_config.TextColumn(
-            col,
-            help=f"Поле: {col}",
-            max_chars=1000,
-            width=None,  # Автоматическая ширина
-        )
+        
+        help_text = f"Поле: {col}"
+        kind = column_kind(df, col)
+        if kind == NUMERIC:
+            column_config[col] = st.column_config.NumberColumn(col, help=help_text)
+        elif kind == PERCENT:
+            column_config[col] = st.column_config.NumberColumn(col, help=help_text, format="percent")
+        elif kind == DATE:
+            column_config[col] = st.column_config.DateColumn(col, help=help_text, format="YYYY-MM-DD")
+        else:
+            # Текстовые колонки и категории - строки, без смешения типов (безопасно для Arrow)
+            column_config[col] = st.column_config.TextColumn(
+                col,
+                help=help_text,
+                max_chars=1000,
+                width=None,  # Автоматическая ширина
+            )
     
     return column_config
 
-def save_excel_data(data_dict):
-    """Сохраняем все данные обратно в Excel файл"""
+def get_project_section(project_id, section_name):
+    """Раздел проекта (только по ключу проекта, без псевдонимов) или None"""
+    if 'excel_data' not in st.session_state:
+        st.session_state.excel_data = load_excel_data()
+    section_key = f"{project_id}_{section_name}"
+    if section_key in st.session_state.excel_data:
+        return st.session_state.excel_data[section_key]
+    return None
+
+@st.cache_resource
+def get_gantt_cache():
+    """Задачи и графики диаграмм Ганта по отпечаткам разделов, общие для всех сессий"""
+    return GanttCache()
+
+def get_project_tasks(project, section_key=None):
+    """Задачи диаграммы Ганта проекта: (ключ кэша, задачи); разбираются один раз на версию раздела"""
+    if 'excel_data' not in st.session_state:
+        st.session_state.excel_data = load_excel_data()
+    excel_data = st.session_state.excel_data
+    section_key = section_key or f"{project['id']}_{GANTT_SECTION}"
+    df = excel_data.get(section_key)
+    if df is None:
+        return None, empty_tasks()
+    name, owner = project.get('name') or project['id'], project.get('owner') or ""
+    key = ("tasks", project['id'], excel_data.fingerprint(section_key), name, owner)
+    return key, get_gantt_cache().get_or_build(key, lambda: parse_tasks(df, project['id'], name, owner))
+
+def get_financial_section(project_id):
+    """Раздел финансового влияния проекта"""
+    return get_project_section(project_id, FINANCIAL_SECTION)
+
+def get_section_data():
+    """Разделы проектов сессии (загружаются при первом обращении)"""
+    if 'excel_data' not in st.session_state:
+        st.session_state.excel_data = load_excel_data()
+    return st.session_state.excel_data
+
+def shared_by_project(name, build_project, empty):
+    """Общие для всех сессий данные по проектам (итоги, ряды): строятся один раз на версию данных
+    по проектам из хранилища и разделам без правок сессий.
+
+    Возвращает (объект, {project_id: last_updated проекта, по которому он построен}).
+    """
+    def build(sections):
+        value, versions = empty(), {}
+        for project in get_storage().load_projects().values():
+            build_project(value, project, sections)
+            versions[project['id']] = project.get('last_updated')
+        return value, versions
+    return get_section_data().derived(name, build)
+
+def session_by_project(state_key, name, build_project, empty, section_name, uses_fields=True):
+    """Общий объект для сессии с ее правками: проекты, созданные (или, если uses_fields, измененные)
+    после построения общих данных, и разделы section_name, отредактированные в сессии, применяются к копии"""
+    if state_key not in st.session_state:
+        value, versions = shared_by_project(name, build_project, empty)
+        wrapper = CopyOnWrite(value)
+        excel_data = get_section_data()
+        modified = excel_data.modified_keys()
+        projects = st.session_state.projects_database
+        for project in get_project_info():
+            if (project['id'] not in versions
+                    or (uses_fields and versions[project['id']] != project.get('last_updated'))
+                    or excel_data.resolve(f"{project['id']}_{section_name}") in modified):
+                build_project(wrapper.own(), project, excel_data)
+        for project_id in set(versions) - set(projects):
+            wrapper.own().remove_project(project_id)
+        st.session_state[state_key] = wrapper
+    return st.session_state[state_key]
+
+def portfolio_project(portfolio, project, sections):
+    """Вклад проекта в итоги портфеля по его разделу финансового влияния"""
+    portfolio.set_project(
+        project['id'],
+        project_attributes(project),
+        project_amounts(project, sections.get(f"{project['id']}_{FINANCIAL_SECTION}"))
+    )
+
+def get_portfolio():
+    """Итоги финансового эффекта портфеля: общие для сессий на версию данных, правки сессии - в ее копии"""
+    return session_by_project('portfolio', "portfolio", portfolio_project, PortfolioRollups, FINANCIAL_SECTION).get()
+
+def update_portfolio(project, section_changed=False):
+    """Пересчитываем вклад одного проекта в итоги портфеля, если итоги уже построены"""
+    if 'portfolio' not in st.session_state:
+        return
+    amounts = project_amounts(project, get_financial_section(project['id'])) if section_changed else None
+    st.session_state.portfolio.own().set_project(project['id'], project_attributes(project), amounts)
+
+def effect_project(store, project, sections):
+    """Ряды мониторинга эффекта проекта"""
+    store.set_project(project['id'], parse_monitoring_sheet(sections.get(f"{project['id']}_{MONITORING_SECTION}")))
+
+def get_effect_store():
+    """Ряды мониторинга эффекта всех проектов: общие для сессий на версию данных, правки сессии - в ее копии"""
+    # Ряды зависят только от разделов, поля проектов на них не влияют
+    return session_by_project('effect_store', "effect_store", effect_project, EffectStore, MONITORING_SECTION,
+                              uses_fields=False).get()
+
+def update_effect_store(project_id):
+    """Перечитываем ряды одного проекта после правки его раздела мониторинга"""
+    if 'effect_store' in st.session_state:
+        project = st.session_state.projects_database.get(project_id, {"id": project_id})
+        effect_project(st.session_state.effect_store.own(), project, get_section_data())
+
+# Поля проекта, по которым идет поиск (помимо содержимого разделов)
+SEARCH_FIELDS = {
+    "name": "Название",
+    "description": "Описание",
+    "key_metrics": "Ключевые метрики",
+}
+
+def section_search_text(section_name, df):
+    """Текст раздела для поиска: название раздела, названия столбцов и непустые ячейки"""
+    values = stringify_frame(df).to_numpy().ravel()
+    return " ".join([section_name] + [str(col) for col in df.columns] + [value for value in values if value])
+
+def index_project(index, project, section_names=None):
+    """Индексируем поля проекта и его разделы (section_names=None - все разделы проекта)"""
+    for field, label in SEARCH_FIELDS.items():
+        index.index_document((project['id'], label), project.get(field) or "")
+    if section_names is None:
+        section_names = project.get('sections', {}).keys()
+    for section_name in section_names:
+        df = get_project_section(project['id'], section_name)
+        if df is None:
+            index.remove_document((project['id'], section_name))
+        else:
+            index.index_document((project['id'], section_name), section_search_text(section_name, df))
+
+def get_project_facets():
+    """Индексы фильтров списка проектов: строятся один раз за сессию, затем обновляются по изменениям"""
+    if 'project_facets' not in st.session_state:
+        st.session_state.project_facets = ProjectFacets(get_project_info())
+    return st.session_state.project_facets
+
+def update_project_facets(project):
+    if 'project_facets' in st.session_state:
+        st.session_state.project_facets.set_project(project)
+
+def get_search_index():
+    """Поисковый индекс по проектам и разделам: строится при первом запросе, затем обновляется по изменениям"""
+    if 'search_index' not in st.session_state:
+        index = SearchIndex()
+        for project in get_project_info():
+            index_project(index, project)
+        st.session_state.search_index = index
+    return st.session_state.search_index
+
+def update_search_index(project, section_names=()):
+    """Переиндексируем поля проекта и измененные разделы, если индекс уже построен"""
+    if 'search_index' not in st.session_state:
+        return
+    index_project(st.session_state.search_index, project, section_names)
+
+def split_section_key(section_key, projects=None):
+    """Разбираем ключ {project_id}_{section} на проект и раздел (projects - по умолчанию проекты сессии)"""
+    projects = st.session_state.projects_database if projects is None else projects
+    project_ids = set(projects) | set(PROJECT_TO_FILE)
+    for project_id in sorted(project_ids, key=len, reverse=True):
+        if section_key.startswith(f"{project_id}_"):
+            return project_id, section_key[len(project_id) + 1:]
+    return None, section_key
+
+@profiled()
+def save_excel_data(sections):
+    """Выгружаем разделы в книги проектов в EXPORT_DIR (в фоне, перезаписываются только эти листы)"""
+    by_project = {}
+    for section_key, df in sections.items():
+        project_id, section_name = split_section_key(section_key)
+        if project_id is not None:
+            by_project.setdefault(project_id, {})[section_name] = df
+    
+    exporter = get_excel_exporter()
     try:
-        backup_file = "/Users/Vasily_Lukin/business_cases_backup.xlsx"
-        
-        with pd.ExcelWriter(backup_file, engine='openpyxl') as writer:
-            for sheet_name, df in data_dict.items():
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-        st.success("✅ Данные успешно сохранены в резервный файл!")
-        st.info(f"📁 Резервная копия: {backup_file}")
+        for project_id, project_sections in by_project.items():
+            source_file = project_source_file(project_id)
+            filename = os.path.basename(source_file) if source_file else f"{project_id}.xlsx"
+            job = exporter.submit(filename, project_sections, base_path=source_file)
+            track_job(job, notify=True,
+                      dirty_keys=[f"{project_id}_{section_name}" for section_name in project_sections])
+        if by_project:
+            st.info(f"⏳ Выгрузка в Excel запущена: {', '.join(sorted(by_project))}")
         return True
     except Exception as e:
         st.error(f"❌ Ошибка при сохранении: {e}")
         return False
 
+@profiled()
+def save_dirty_sections(excel_data):
+    """Сохраняем разделы, измененные после последнего сохранения: в хранилище и в Excel"""
+    dirty_keys = excel_data.dirty_keys()
+    if not dirty_keys:
+        st.info("ℹ️ Нет несохраненных изменений в разделах")
+        return
+    sections = {key: excel_data[key] for key in dirty_keys}
+    if save_sections_data(sections) and save_excel_data(sections):
+        excel_data.mark_clean(dirty_keys)
+
 def show_l_status_info():
     """Показываем информацию о L-статусах"""
     with st.expander("ℹ️ Информация о статусах инициатив (L0-L5)"):
@@ -466,13 +772,32 @@ def show_projects_list():
             st.rerun()
     with col2:
         if st.button("🔄 Перезагрузить данные", use_container_width=True):
-            st.session_state.excel_data = load_excel_data()
-            st.success("✅ Данные перезагружены из Excel файлов!")
-            st.rerun()
+            with st.spinner("Проверяем импортированные книги..."):
+                reimported = reimport_changed_workbooks()
+            if reimported:
+                st.toast(f"✅ Обновлено из Excel проектов: {reimported}")
+            excel_data = load_excel_data()
+            current = st.session_state.get('excel_data')
+            # Содержимое файлов и разделов не изменилось, правок в сессии нет - перезагружать нечего
+            if current is not None and excel_data.same_source(current) and not current.modified_keys():
+                st.toast("ℹ️ Исходные данные не изменились")
+            else:
+                st.session_state.excel_data = excel_data
+                st.session_state.pop('portfolio', None)
+                st.session_state.pop('effect_store', None)
+                st.session_state.pop('search_index', None)
+                # Изменившиеся файлы разбираем в фоне, список проектов не ждет загрузки
+                submit_job("excel_ingest", "Загрузка Excel файлов", warm_workbook_cache,
+                           get_workbook_cache(), project_workbooks(), EXCEL_MAX_WORKERS, progress=True, notify=True)
+                st.rerun()
     with col3:
         if st.button("📜 История изменений", use_container_width=True):
             st.session_state.current_view = "changelog"
             st.rerun()
+    with col4:
+        if st.button("📊 Финансовая сводка", use_container_width=True):
+            st.session_state.current_view = "portfolio"
+            st.rerun()
     
     projects = get_project_info()
     
@@ -482,29 +807,112 @@ def show_projects_list():
     
     st.subheader("📋 Список проектов")
     
-    # Фильтры
-    col1, col2, col3 = st.columns(3)
+    # Полнотекстовый поиск по полям проектов и содержимому разделов
+    search_query = st.text_input("🔍 Поиск по проектам и разделам",
+                                 placeholder="Например: конверсия, CRM, 2026")
+    search_matches = None
+    if search_query.strip():
+        # Индекс строится при первом запросе; время поиска считаем без построения
+        search_index = get_search_index()
+        started = time.perf_counter()
+        search_matches = search_index.search_projects(search_query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        st.caption(f"Найдено проектов: {len(search_matches)} ({elapsed_ms:.1f} мс)")
+    
+    # Фильтры: варианты и счетчики берутся из индексов фасетов, без прохода по проектам
+    facets = get_project_facets()
+    within = set(search_matches) if search_matches is not None else None
+    selection = {dimension: st.session_state.get(f"facet_{dimension}", []) for dimension in ROLLUP_DIMENSIONS}
+    columns = st.columns(len(ROLLUP_DIMENSIONS))
+    for column, (dimension, label) in zip(columns, ROLLUP_DIMENSIONS.items()):
+        counts = facets.counts(dimension, selection, within)
+        with column:
+            selection[dimension] = st.multiselect(
+                f"Фильтр: {label.lower()}",
+                facets.values(dimension),
+                key=f"facet_{dimension}",
+                format_func=lambda value, counts=counts: f"{value} ({counts.get(value, 0)})",
+                placeholder="Все",
+            )
+    
+    # Фильтрация - пересечение множеств id проектов
+    filtered_ids = facets.filter(selection, within)
+    projects_database = st.session_state.projects_database
+    filtered_projects = [projects_database[project_id] for project_id in filtered_ids]
+    
+    # Сортировка и вид списка
+    col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
-        statuses = list(set([p['status'] for p in projects]))
-        status_filter = st.selectbox("Фильтр по статусу", ["Все"] + statuses)
+        sort_by = st.selectbox("Сортировка", list(SORT_OPTIONS))
     with col2:
-        owners = list(set([p['owner'] for p in projects]))
-        owner_filter = st.selectbox("Фильтр по владельцу", ["Все"] + owners)
+        list_mode = st.radio("Вид", ["Карточки", "Таблица"], horizontal=True)
     with col3:
-        departments = list(set([p.get('department', '') for p in projects if p.get('department')]))
-        dept_filter = st.selectbox("Фильтр по отделу", ["Все"] + departments)
-    
-    # Фильтрация проектов
-    filtered_projects = projects
-    if status_filter != "Все":
-        filtered_projects = [p for p in filtered_projects if p['status'] == status_filter]
-    if owner_filter != "Все":
-        filtered_projects = [p for p in filtered_projects if p['owner'] == owner_filter]
-    if dept_filter != "Все":
-        filtered_projects = [p for p in filtered_projects if p.get('department') == dept_filter]
+        page_size = st.selectbox("Проектов на странице", PAGE_SIZE_OPTIONS,
+                                 index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE))
+    
+    filtered_projects = sort_projects(filtered_projects, sort_by)
+    if not filtered_projects:
+        st.info("Нет проектов, подходящих под условия поиска и фильтры.")
+        return
+    
+    if list_mode == "Таблица":
+        show_projects_table(filtered_projects)
+    else:
+        show_project_cards(filtered_projects, page_size, search_matches)
+
+def show_project_actions(project):
+    """Кнопки открытия, редактирования и истории проекта"""
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
+    with col1:
+        if st.button(f"📖 Открыть", key=f"open_{project['id']}"):
+            st.session_state.selected_project = project
+            st.session_state.current_view = "project_detail"
+            st.rerun()
+    with col2:
+        if st.button(f"✏️ Редактировать", key=f"edit_{project['id']}"):
+            st.session_state.selected_project = project
+            st.session_state.current_view = "edit_project"
+            st.rerun()
+    with col3:
+        if st.button(f"📜 История", key=f"history_{project['id']}"):
+            st.session_state.selected_project = project
+            st.session_state.current_view = "changelog"
+            st.rerun()
+
+def show_projects_table(projects):
+    """Компактный вид: одна таблица на все проекты, действия - для выбранной строки"""
+    table = projects_table(projects, {code: info['name'] for code, info in L_STATUSES.items()})
+    event = st.dataframe(
+        table,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="projects_table",
+        column_config={
+            "Целевая выручка, млн руб": st.column_config.NumberColumn(format="%.0f"),
+        },
+    )
+    st.caption(f"Проектов: {len(projects)}. Выберите строку, чтобы открыть проект.")
+    selected_rows = event.selection.rows if event is not None else []
+    if selected_rows:
+        show_project_actions(projects[selected_rows[0]])
+
+def show_project_cards(projects, page_size, search_matches=None):
+    """Карточки проектов постранично: на каждом перезапуске отрисовывается только текущая страница"""
+    pages = page_count(len(projects), page_size)
+    if pages > 1:
+        page = st.number_input(f"Страница (всего {pages})", min_value=1, max_value=pages,
+                               value=min(st.session_state.get('projects_page', 1), pages), step=1)
+    else:
+        page = 1
+    page_projects, page, pages = get_page(projects, page, page_size)
+    st.session_state.projects_page = page
+    first = (page - 1) * page_size + 1
+    st.caption(f"Проекты {first}–{first + len(page_projects) - 1} из {len(projects)}")
     
     # Отображение проектов
-    for project in filtered_projects:
+    for project in page_projects:
         with st.container():
             # Определяем цвет статуса
             status_colors = {
@@ -533,29 +941,58 @@ def show_projects_list():
                 </div>
                 <div style="display: flex; gap: 20px; margin: 15px 0; flex-wrap: wrap;">
                     <span>{dates_info}</span>
-                    <span><strong>Обновлено:</strong> {project['last_updated']}</span>
+                    <span><strong>Обновлено:</strong> {format_last_updated(project['last_updated'])}</span>
                 </div>
                 {f'<div style="margin: 15px 0; padding: 10px; background: #f8f9fa; border-radius: 4px;"><strong>🎯 Целевые показатели:</strong> {target_revenue}</div>' if target_revenue else ''}
                 {f'<div style="margin: 15px 0; padding: 10px; background: #e3f2fd; border-radius: 4px;"><strong>📊 Ключевые метрики:</strong> {key_metrics}</div>' if key_metrics else ''}
             </div>
             """, unsafe_allow_html=True)
+            if search_matches:
+                st.caption(f"🔍 Найдено в: {', '.join(search_matches[project['id']])}")
             
-            col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
-            with col1:
-                if st.button(f"📖 Открыть", key=f"open_{project['id']}"):
-                    st.session_state.selected_project = project
-                    st.session_state.current_view = "project_detail"
-                    st.rerun()
-            with col2:
-                if st.button(f"✏️ Редактировать", key=f"edit_{project['id']}"):
-                    st.session_state.selected_project = project
-                    st.session_state.current_view = "edit_project"
-                    st.rerun()
-            with col3:
-                if st.button(f"📜 История", key=f"history_{project['id']}"):
-                    st.session_state.selected_project = project
-                    st.session_state.current_view = "changelog"
-                    st.rerun()
+            show_project_actions(project)
+
+def show_portfolio():
+    """Показываем финансовый эффект портфеля по годам и в разрезах"""
+    if st.button("← Назад к списку"):
+        st.session_state.current_view = "projects_list"
+        st.rerun()
+    
+    st.title("📊 Финансовый эффект портфеля")
+    st.caption("Суммы в млн руб: из раздела «b. Финансовое влияние», а если он не заполнен - из целевых показателей проекта")
+    st.markdown("---")
+    
+    portfolio = get_portfolio()
+    by_year = portfolio.by_year()
+    if by_year.empty:
+        st.info("Финансовые показатели проектов не найдены.")
+        show_portfolio_effect()
+        show_portfolio_timeline()
+        return
+    
+    # Итоги по годам
+    columns = st.columns(min(len(by_year), 5))
+    for column, (_, row) in zip(columns, by_year.tail(5).iterrows()):
+        column.metric(f"{int(row['Год'])}", f"{row['Сумма (млн руб)']:,.1f}".replace(",", " "))
+    st.bar_chart(by_year.astype({"Год": str}).set_index("Год"))
+    
+    # Итоги в разрезе статуса, отдела или владельца
+    dimension = st.selectbox(
+        "Разрез",
+        list(ROLLUP_DIMENSIONS),
+        format_func=lambda dimension: ROLLUP_DIMENSIONS[dimension]
+    )
+    rollup = portfolio.rollup(dimension)
+    if dimension == "status":
+        rollup.index = [f"{status} - {L_STATUSES.get(status, {}).get('name', status)}" for status in rollup.index]
+        rollup.index.name = ROLLUP_DIMENSIONS[dimension]
+    st.dataframe(rollup.round(1), use_container_width=True)
+    
+    st.markdown("---")
+    show_portfolio_effect()
+    
+    st.markdown("---")
+    show_portfolio_timeline()
 
 def show_new_project_form():
     """Форма создания нового проекта"""
@@ -619,14 +1056,9 @@ def show_new_project_form():
                     "end_date": end_date.strftime("%Y-%m-%d") if end_date else ""
                 }
                 
-                # Создаем проект
-                new_project = create_new_project(project_data)
-                
-                # Добавляем дополнительные разделы
-                if additional_sections.strip():
-                    additional_list = [s.strip() for s in additional_sections.split('\n') if s.strip()]
-                    for section in additional_list:
-                        new_project['sections'][section] = f"Пользовательский раздел: {section}"
+                # Создаем проект вместе с дополнительными разделами
+                additional_list = [s.strip() for s in additional_sections.split('\n') if s.strip()]
+                new_project = create_new_project(project_data, additional_list)
                 
                 st.success(f"✅ Проект '{name}' успешно создан!")
                 st.info("Теперь вы можете открыть проект и начать заполнять данные в разделах.")
@@ -717,18 +1149,36 @@ def show_edit_project_form():
                     changes.append(f"Отдел: '{project.get('department', '')}' → '{department}'")
                 
                 # Обновляем данные проекта
-                project['name'] = name
-                project['description'] = description
-                project['status'] = status
-                project['owner'] = owner
-                project['department'] = department or "Не указан"
-                project['start_date'] = start_date.strftime("%Y-%m-%d") if start_date else ""
-                project['end_date'] = end_date.strftime("%Y-%m-%d") if end_date else ""
-                project['last_updated'] = datetime.now().strftime("%Y-%m-%d")
+                updated_project = dict(project)
+                updated_project['name'] = name
+                updated_project['description'] = description
+                updated_project['status'] = status
+                updated_project['owner'] = owner
+                updated_project['department'] = department or "Не указан"
+                updated_project['start_date'] = start_date.strftime("%Y-%m-%d") if start_date else ""
+                updated_project['end_date'] = end_date.strftime("%Y-%m-%d") if end_date else ""
+                updated_project['last_updated'] = datetime.now().isoformat()
+                
+                # Сохраняем в базу данных, если проект не изменили в другой сессии
+                # (фоновые сохранения проектов должны завершиться до проверки версии)
+                get_job_scheduler().wait_for("projects")
+                try:
+                    save_project(updated_project, expected_last_updated=project['last_updated'])
+                except ConflictError:
+                    st.error("❌ Проект был изменен в другой сессии. Данные обновлены - повторите изменения.")
+                    st.session_state.projects_database = load_projects_database()
+                    # Производные от базы проектов данные строятся заново из перечитанной базы
+                    for key in ('project_facets', 'portfolio', 'search_index'):
+                        st.session_state.pop(key, None)
+                    st.session_state.selected_project = st.session_state.projects_database.get(project['id'], project)
+                    return
                 
-                # Сохраняем в базу данных
+                project = updated_project
                 st.session_state.projects_database[project['id']] = project
-                save_projects_database(st.session_state.projects_database)
+                update_portfolio(project)
+                update_project_facets(project)
+                update_search_index(project)
+                st.session_state.selected_project = project
                 
                 # Записываем изменения в историю
                 if changes:
@@ -759,24 +1209,60 @@ def show_changelog():
             st.session_state.current_view = "projects_list"
             st.rerun()
     
-    # Загружаем историю изменений
-    if 'changelog' not in st.session_state:
-        st.session_state.changelog = load_changelog()
+    # Загружаем историю изменений (вместе с еще не записанными правками таблиц)
+    flush_pending_changes(force=True)
+    changelog_index = get_changelog_index()
     
-    # Фильтруем записи для текущего проекта
-    project_changelog = [entry for entry in st.session_state.changelog if entry['project_id'] == project['id']]
-    
-    if not project_changelog:
+    if not changelog_index.count(project['id']):
         st.info("📝 История изменений пуста")
         return
     
-    # Сортируем по дате (новые сначала)
-    project_changelog.sort(key=lambda x: x['timestamp'], reverse=True)
+    # Фильтры по типу действия и периоду
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        action_filter = st.multiselect("Тип действия", changelog_index.actions(project['id']))
+    with col2:
+        date_from = st.date_input("С даты", value=None)
+    with col3:
+        date_to = st.date_input("По дату", value=None)
+    with col4:
+        page_size = st.selectbox("Записей на странице", CHANGELOG_PAGE_SIZES, index=1)
+    
+    # Загружаем только видимую страницу (новые сначала)
+    page_key = f"changelog_page_{project['id']}"
+    page = st.session_state.get(page_key, 1)
+    query = dict(
+        actions=action_filter,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+    )
+    page_entries, total = changelog_index.query(project['id'], page=page, page_size=page_size, **query)
+    pages = max((total + page_size - 1) // page_size, 1)
+    if page > pages:
+        page = pages
+        page_entries, total = changelog_index.query(project['id'], page=page, page_size=page_size, **query)
+    
+    st.subheader(f"📊 Всего записей: {total}")
+    
+    if not page_entries:
+        st.info("📝 Нет записей, подходящих под фильтры")
+        return
     
-    st.subheader(f"📊 Всего записей: {len(project_changelog)}")
+    # Навигация по страницам
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("← Новее", disabled=page <= 1, use_container_width=True):
+            st.session_state[page_key] = page - 1
+            st.rerun()
+    with col2:
+        st.markdown(f"<div style='text-align: center;'>Страница {page} из {pages}</div>", unsafe_allow_html=True)
+    with col3:
+        if st.button("Старее →", disabled=page >= pages, use_container_width=True):
+            st.session_state[page_key] = page + 1
+            st.rerun()
     
     # Отображаем записи
-    for entry in project_changelog:
+    for entry in page_entries:
         timestamp = datetime.fromisoformat(entry['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
         
         # Определяем иконку для типа действия
@@ -800,6 +1286,14 @@ def show_changelog():
                 <p style="margin: 5px 0; color: #333;"><strong>Детали:</strong> {entry['details']}</p>
             </div>
             """, unsafe_allow_html=True)
+            
+            # Поячеечные изменения (для правок таблиц)
+            if entry.get('changes'):
+                with st.expander(f"🔍 Изменения ячеек: {len(entry['changes'])}"):
+                    changes_df = pd.DataFrame(entry['changes']).rename(columns={
+                        "row": "Строка", "column": "Столбец", "old": "Было", "new": "Стало"
+                    })
+                    st.dataframe(changes_df.astype(str), use_container_width=True, hide_index=True)
 
 def show_project_detail():
     """Показываем детали выбранного проекта"""
@@ -809,13 +1303,9 @@ def show_project_detail():
         st.error("Проект не выбран")
         return
     
-    # Загрузка данных Excel
+    # Загрузка данных Excel (пустое представление - не ошибка: разделы загружаются при первом обращении)
     if 'excel_data' not in st.session_state:
-        excel_data = load_excel_data()
-        if excel_data:
-            st.session_state.excel_data = excel_data
-        else:
-            st.session_state.excel_data = {}
+        st.session_state.excel_data = load_excel_data()
     
     # Заголовок с навигацией
     col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
@@ -845,7 +1335,7 @@ def show_project_detail():
     with col3:
         st.metric("Отдел", project.get('department', 'Не указан'))
     with col4:
-        st.metric("Последнее обновление", project['last_updated'])
+        st.metric("Последнее обновление", format_last_updated(project['last_updated']))
     
     st.markdown("---")
     
@@ -884,11 +1374,15 @@ def show_project_detail():
     
     with col1:
         if st.button("💾 Сохранить", use_container_width=True):
-            save_excel_data(st.session_state.excel_data)
+            flush_pending_changes(force=True)
+            save_dirty_sections(st.session_state.excel_data)
     
     with col2:
         if st.button("🔄 Сбросить", use_container_width=True):
             st.session_state.excel_data = load_excel_data()
+            st.session_state.pop('portfolio', None)
+            st.session_state.pop('effect_store', None)
+            st.session_state.pop('search_index', None)
             st.rerun()
     
     with col3:
@@ -898,18 +1392,30 @@ def show_project_detail():
     # Отображение выбранного раздела
     show_section_data(selected_section, project['sections'][selected_section], project['id'])
 
+def get_section_keys(section_name, project_id):
+    """Варианты ключей данных раздела в порядке приоритета"""
+    return [
+        f"{project_id}_{section_name}",  # business_case_1_a. Детали инициативы
+        section_name,  # прямое совпадение: a. Детали инициативы
+        f"Бизнес_кейс_Михненко_Екатерина_{section_name}",  # полный ключ файла
+    ]
+
+def find_section_key(section_name, project_id):
+    """Ищем данные раздела по всем возможным ключам"""
+    for key in get_section_keys(section_name, project_id):
+        if key in st.session_state.excel_data:
+            return key
+    return None
+
 def add_row_to_section(section_name, project_id):
     """Добавляем строку к выбранному разделу"""
-    if section_name in st.session_state.excel_data:
-        current_df = st.session_state.excel_data[section_name]
+    data_key = find_section_key(section_name, project_id)
+    if data_key is not None:
+        current_df = st.session_state.excel_data[data_key]
         
-        # Создаем новую строку с пустыми значениями
-        new_row_data = {}
-        for col in current_df.columns:
-            new_row_data[col] = ''
-        
-        new_row = pd.DataFrame([new_row_data])
-        st.session_state.excel_data[section_name] = pd.concat([current_df, new_row], ignore_index=True)
+        # Создаем новую строку с пустыми значениями (типы столбцов сохраняются)
+        new_row = blank_row(current_df)
+        st.session_state.excel_data[data_key] = pd.concat([current_df, new_row], ignore_index=True)
     else:
         # Создаем новую таблицу если раздел не существует
         empty_df = pd.DataFrame({
@@ -917,31 +1423,26 @@ def add_row_to_section(section_name, project_id):
             "Значение": [""],
             "Комментарий": [""]
         })
-        st.session_state.excel_data[section_name] = empty_df
+        st.session_state.excel_data[f"{project_id}_{section_name}"] = empty_df
     
     # Записываем в историю изменений
     add_changelog_entry(project_id, "Добавление данных", f"Добавлена новая строка в раздел: {section_name}")
     
     st.rerun()
 
+@profiled()
 def show_section_data(section_name, section_description, project_id):
     """Показываем данные выбранного раздела"""
     st.header(f"📄 {section_name}")
     st.info(section_description)
     
     # Ищем данные для раздела в разных вариантах ключей
-    data_key = None
-    potential_keys = [
-        section_name,  # прямое совпадение: a. Детали инициативы
-        f"{project_id}_{section_name}",  # business_case_1_a. Детали инициативы
-        f"Бизнес_кейс_Михненко_Екатерина_{section_name}",  # полный ключ файла
-    ]
-    
-    # Ищем данные по всем возможным ключам
-    for key in potential_keys:
-        if key in st.session_state.excel_data:
-            data_key = key
-            break
+    potential_keys = get_section_keys(section_name, project_id)
+    data_key = find_section_key(section_name, project_id)
+    # Раздел проекта не загрузился (ошибка чтения хранилища или Excel) - сообщаем в этой сессии
+    load_error = st.session_state.excel_data.load_error(potential_keys[0])
+    if load_error is not None:
+        st.error(f"❌ {load_error}")
     
     # Если данных нет, показываем сообщение с возможностью добавить данные
     if data_key is None:
@@ -964,30 +1465,30 @@ def show_section_data(section_name, section_description, project_id):
                 "Значение": [""],
                 "Комментарий": [""]
             })
-            st.session_state.excel_data[section_name] = empty_df
+            st.session_state.excel_data[f"{project_id}_{section_name}"] = empty_df
             add_changelog_entry(project_id, "Создание данных", f"Создана пустая таблица для раздела: {section_name}")
             st.rerun()
         return
     
     current_df = st.session_state.excel_data[data_key]
     
-    # Преобразуем все данные в строки для избежания конфликтов типов
-    display_df = current_df.copy()
-    
-    # Очищаем данные от проблематичных значений
-    for col in display_df.columns:
-        display_df[col] = display_df[col].astype(str)
-        display_df[col] = display_df[col].replace('nan', '')
-        display_df[col] = display_df[col].replace('None', '')
-        display_df[col] = display_df[col].replace('<NA>', '')
+    # Столбцы уже типизированы при загрузке (числа, даты, категории, строки) -
+    # редактор получает их как есть, без приведения всех ячеек к строкам
+    display_df = current_df
     
     # Удаляем колонки с проблематичными названиями
     problematic_cols = [col for col in display_df.columns if col.lower() in ['столбец', 'column', 'unnamed']]
     if problematic_cols:
         display_df = display_df.drop(columns=problematic_cols)
     
-    # Информация о данных
-    st.info(f"📊 Строк: {len(display_df)} | Столбцов: {len(display_df.columns)}")
+    # Категории передаем редактору строками: Categorical не принимает значения вне списка категорий
+    category_cols = [col for col in display_df.columns if isinstance(display_df[col].dtype, pd.CategoricalDtype)]
+    if category_cols:
+        display_df = display_df.astype({col: "string" for col in category_cols})
+    
+    # Информация о данных; отпечаток содержимого - ключ кэшей, построенных по разделу
+    fingerprint = st.session_state.excel_data.fingerprint(data_key)
+    st.info(f"📊 Строк: {len(display_df)} | Столбцов: {len(display_df.columns)} | Отпечаток: {fingerprint}")
     
     # Показываем информацию о содержимом
     with st.expander("🔍 Информация о данных"):
@@ -1000,6 +1501,9 @@ def show_section_data(section_name, section_description, project_id):
             })
         st.dataframe(pd.DataFrame(col_info), use_container_width=True)
     
+    # График над таблицей заполняется после редактора - по уже отредактированным данным
+    chart_area = st.container() if section_name in (GANTT_SECTION, MONITORING_SECTION) else None
+    
     # Получаем конфигурацию столбцов
     column_config = get_column_config(display_df)
     
@@ -1013,12 +1517,30 @@ def show_section_data(section_name, section_description, project_id):
             column_config=column_config
         )
         
-        # Проверяем на изменения
-        if not edited_df.equals(display_df):
-            add_changelog_entry(project_id, "Изменение данных", f"Изменены данные в разделе: {section_name}")
+        # Поячеечно сравниваем с исходной таблицей, только если отпечатки различаются;
+        # правки копятся и пишутся в историю пачкой
+        unchanged = display_df is current_df and frame_fingerprint(edited_df) == fingerprint
+        diff = None if unchanged else diff_frames(display_df, edited_df)
+        if diff is not None and has_changes(diff):
+            # Виды столбцов (например, проценты) переносим на отредактированную таблицу
+            edited_df.attrs = dict(display_df.attrs)
+            get_pending_changes().add(project_id, section_name, diff)
+            
+            # Обновляем данные в session state
+            st.session_state.excel_data[data_key] = edited_df
+            project = st.session_state.projects_database.get(project_id, {"id": project_id})
+            if section_name == FINANCIAL_SECTION:
+                update_portfolio(project, section_changed=True)
+            elif section_name == MONITORING_SECTION:
+                update_effect_store(project_id)
+            update_search_index(project, [section_name])
         
-        # Обновляем данные в session state
-        st.session_state.excel_data[data_key] = edited_df
+        if chart_area is not None:
+            with chart_area:
+                if section_name == GANTT_SECTION:
+                    show_gantt_chart(project_id, data_key)
+                else:
+                    show_effect_chart(project_id)
         
     except Exception as e:
         st.error(f"❌ Ошибка при отображении таблицы: {e}")
@@ -1027,22 +1549,188 @@ def show_section_data(section_name, section_description, project_id):
         st.subheader("📄 Просмотр данных (только чтение)")
         st.dataframe(display_df, use_container_width=True)
 
+def show_gantt_chart(project_id, section_key):
+    """Диаграмма Ганта раздела; фигура строится заново, только когда меняется содержимое раздела"""
+    project = st.session_state.projects_database.get(project_id, {"id": project_id})
+    key, tasks = get_project_tasks(project, section_key)
+    if tasks.empty:
+        st.caption("📅 Для диаграммы нужны столбцы «Задача» и «Начало» или «Конец» с датами")
+        return
+    figure = get_gantt_cache().get_or_build(("figure",) + key, lambda: build_figure(tasks))
+    st.plotly_chart(figure, use_container_width=True, key=f"gantt_{section_key}")
+
+def effect_column_config(is_rate):
+    """Формат значений показателя: доли - в процентах"""
+    number = st.column_config.NumberColumn(format="percent" if is_rate else "%.2f")
+    return {column: number for column in ["План", "Факт", "Отклонение"]} | {
+        "Отклонение, %": st.column_config.NumberColumn(format="percent")
+    }
+
+def show_effect_chart(project_id):
+    """План и факт показателей проекта по месяцам из рядов мониторинга эффекта"""
+    series = get_effect_store().query(project_ids=[project_id])
+    if series.empty:
+        st.caption("📈 Для графика нужны строки «План (показатель)» и «Факт (показатель)» с месяцами в заголовке")
+        return
+    metrics = series["metric"].unique().tolist()
+    metric = st.selectbox("Показатель", metrics, key=f"effect_metric_{project_id}") if len(metrics) > 1 else metrics[0]
+    values = series[series["metric"] == metric]
+    st.line_chart(values.set_index("month")[["plan", "fact"]].rename(columns={"plan": "План", "fact": "Факт"}))
+    compared = values.dropna(subset=["plan", "fact"])
+    if not compared.empty:
+        last = compared.iloc[-1]
+        value_format = "{:.1%}" if last["is_rate"] else "{:,.2f}"
+        st.caption(f"Отклонение от плана за {last['month']:%m.%Y}: {value_format.format(last['deviation'])}")
+
+def show_portfolio_effect():
+    """Мониторинг эффекта по портфелю: итог по показателю и отклонения проектов от плана"""
+    st.subheader("📈 Мониторинг эффекта")
+    store = get_effect_store()
+    metrics = store.metrics()
+    if not metrics:
+        st.info("В разделах «e. Мониторинг эффекта» нет значений плана и факта по месяцам.")
+        return
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        metric = st.selectbox("Показатель", metrics, key="effect_metric")
+    with col2:
+        freq = st.radio("Период", list(FREQUENCIES), format_func=FREQUENCIES.get, horizontal=True, key="effect_freq")
+    
+    totals = store.totals(metric, freq=freq)
+    if "cum_plan" in totals:
+        st.caption("Накопленный эффект портфеля (нарастающим итогом)")
+        chart = totals.set_index("month")[["cum_plan", "cum_fact"]]
+        st.line_chart(chart.rename(columns={"cum_plan": "План", "cum_fact": "Факт"}))
+    else:
+        st.caption("Среднее по проектам")
+        st.line_chart(totals.set_index("month")[["plan", "fact"]].rename(columns={"plan": "План", "fact": "Факт"}))
+    
+    series = store.query(metrics=[metric], freq=freq)
+    names = {project_id: project.get('name', project_id)
+             for project_id, project in st.session_state.projects_database.items()}
+    table = pd.DataFrame({
+        "Проект": series["project_id"].astype(str).map(lambda project_id: names.get(project_id, project_id)),
+        "Период": series["month"].dt.strftime("%m.%Y"),
+        "План": series["plan"],
+        "Факт": series["fact"],
+        "Отклонение": series["deviation"],
+        "Отклонение, %": series["deviation_pct"],
+    })
+    st.dataframe(table, use_container_width=True, hide_index=True,
+                 column_config=effect_column_config(store.query(metrics=[metric])["is_rate"].any()))
+
+def show_portfolio_timeline():
+    """Сводный план всех проектов с окном дат; фигура кэшируется по отпечаткам разделов и окну"""
+    st.subheader("📅 Сводный план проектов")
+    project_tasks = [get_project_tasks(project) for project in get_project_info()]
+    project_tasks = [(key, tasks) for key, tasks in project_tasks if not tasks.empty]
+    if not project_tasks:
+        st.info("В разделах «d. Диаграмма Ганта» нет задач с датами.")
+        return
+    
+    cache = get_gantt_cache()
+    portfolio_key = tuple(key for key, _ in project_tasks)
+    tasks = cache.get_or_build(("portfolio",) + portfolio_key,
+                               lambda: pd.concat([tasks for _, tasks in project_tasks], ignore_index=True))
+    first, last = (value.date() for value in timeline_span(tasks))
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        window = st.date_input("Период", value=(first, last), min_value=first, max_value=last,
+                               format="DD.MM.YYYY", key="timeline_window")
+    with col2:
+        color_by = st.radio("Цвет полос", ["project", "owner"], horizontal=True, key="timeline_color",
+                            format_func=lambda value: "Проект" if value == "project" else "Ответственный")
+    # Пока выбрана только начальная дата периода, показываем весь план
+    window_start, window_end = window if len(window) == 2 else (first, last)
+    
+    visible = filter_window(tasks, window_start, window_end)
+    st.caption(f"Задач в периоде: {len(visible)} из {len(tasks)}")
+    if visible.empty:
+        return
+    figure = cache.get_or_build(
+        ("portfolio_figure", portfolio_key, window_start, window_end, color_by),
+        lambda: build_figure(visible, window=(window_start, pd.Timestamp(window_end) + pd.Timedelta(days=1)),
+                             color_by=color_by, show_project=True)
+    )
+    st.plotly_chart(figure, use_container_width=True, key="portfolio_timeline")
+
+def show_diagnostics_panel():
+    """Панель диагностики в сайдбаре (по желанию): время вызовов, ввод-вывод, объем session state"""
+    st.sidebar.markdown("---")
+    if not st.sidebar.toggle("🩺 Диагностика производительности", key="show_diagnostics"):
+        return
+    
+    last_rerun = profiler.last("main")
+    state_sizes = session_state_sizes(st.session_state)
+    with st.sidebar.expander("🩺 Диагностика", expanded=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Перезапуск", f"{last_rerun.duration * 1000:.0f} мс" if last_rerun else "—")
+        with col2:
+            state_bytes = sum(state_sizes.values())
+            st.metric("Session state", f"{state_bytes / 2**20:.1f} МБ" if state_bytes >= 2**20
+                      else f"{state_bytes / 1024:.0f} КБ")
+        st.caption("Статистика вызовов - по всем сессиям процесса, включая фоновые задачи")
+        
+        summary = profiler.summary()
+        if not summary.empty:
+            table = pd.DataFrame({
+                "Имя": summary["Имя"],
+                "Вызовы": summary["Вызовы"],
+                "Всего, мс": summary["Всего, с"] * 1000,
+                "Среднее, мс": summary["Среднее, мс"],
+                "Макс, мс": summary["Макс, с"] * 1000,
+                "Прочитано, КБ": summary["Прочитано, байт"] / 1024,
+                "Записано, КБ": summary["Записано, байт"] / 1024,
+                "Ошибки": summary["Ошибки"],
+            })
+            st.dataframe(table, hide_index=True, use_container_width=True,
+                         column_config={col: st.column_config.NumberColumn(format="%.1f")
+                                        for col in ["Всего, мс", "Среднее, мс", "Макс, мс",
+                                                    "Прочитано, КБ", "Записано, КБ"]})
+        
+        st.caption("Session state по ключам")
+        st.dataframe(pd.DataFrame({"Ключ": list(state_sizes),
+                                   "КБ": [size / 1024 for size in state_sizes.values()]}).head(10),
+                     hide_index=True, use_container_width=True,
+                     column_config={"КБ": st.column_config.NumberColumn(format="%.1f")})
+        
+        st.download_button("⬇️ Трасса Chrome (JSON)", data=json.dumps(profiler.chrome_trace()),
+                           file_name="trace.json", mime="application/json", use_container_width=True)
+        st.download_button("⬇️ Статистика (JSON)", data=profiler.export_json(),
+                           file_name="profile.json", mime="application/json", use_container_width=True)
+        if st.button("🧹 Сбросить статистику", use_container_width=True):
+            profiler.reset()
+            st.rerun()
+
 def main():
-    """Основная функция приложения"""
+    """Основная функция приложения: экран (с замером времени) и панель диагностики"""
+    # Конфигурация страницы: в main(), чтобы импорт модуля не вызывал команд Streamlit
+    st.set_page_config(
+        page_title="Управление бизнес-кейсами",
+        page_icon="💼",
+        layout="wide"
+    )
+    with profiler.span("main", view=st.session_state.get('current_view', "projects_list")):
+        render_app()
+    show_diagnostics_panel()
+
+def render_app():
+    """Инициализация сессии, маршрутизация между экранами и сайдбар"""
     
     # Инициализация session state
     if 'current_view' not in st.session_state:
         st.session_state.current_view = "projects_list"
+    if 'selected_project' not in st.session_state:
+        st.session_state.selected_project = None
     if 'selected_project_id' not in st.session_state:
         st.session_state.selected_project_id = None
     if 'selected_section' not in st.session_state:
         st.session_state.selected_section = None
     
-    # Инициализация данных при первом запуске
-    if 'excel_data' not in st.session_state:
-        with st.spinner("Загружаем данные из Excel файлов..."):
-            st.session_state.excel_data = load_excel_data()
-    
+    # Данные Excel загружаются лениво: при открытии проекта читается только выбранный лист
     if 'projects_database' not in st.session_state:
         with st.spinner("Загружаем базу данных проектов..."):
             st.session_state.projects_database = load_projects_database()
@@ -1050,21 +1738,38 @@ def main():
     if 'changelog' not in st.session_state:
         st.session_state.changelog = load_changelog()
     
+    # Записываем в историю правки таблиц, накопленные за интервал
+    flush_pending_changes()
+    
     # Маршрутизация между экранами
-    if st.session_state.current_view == "projects_list":
-        show_projects_list()
-    elif st.session_state.current_view == "project_detail":
-        show_project_detail()
-    elif st.session_state.current_view == "new_project":
-        show_new_project_form()
-    elif st.session_state.current_view == "edit_project":
-        show_edit_project_form()
-    elif st.session_state.current_view == "changelog":
-        show_changelog()
+    with profiler.span(f"view: {st.session_state.current_view}"):
+        if st.session_state.current_view == "projects_list":
+            show_projects_list()
+        elif st.session_state.current_view == "project_detail":
+            show_project_detail()
+        elif st.session_state.current_view == "new_project":
+            show_new_project_form()
+        elif st.session_state.current_view == "edit_project":
+            show_edit_project_form()
+        elif st.session_state.current_view == "changelog":
+            show_changelog()
+        elif st.session_state.current_view == "portfolio":
+            show_portfolio()
+    
+    # Прогресс и результаты фоновых задач
+    show_job_status()
     
     # Информация в сайдбаре для главного экрана
     if st.session_state.current_view == "projects_list":
         st.sidebar.markdown("---")
+        # JSON остается форматом импорта/экспорта при любом хранилище
+        st.sidebar.download_button(
+            "⬇️ Экспорт проектов (JSON)",
+            data=json.dumps(st.session_state.projects_database, ensure_ascii=False, indent=2),
+            file_name=PROJECTS_FILE,
+            mime="application/json",
+            use_container_width=True
+        )
         with st.sidebar.expander("ℹ️ Информация"):
             st.markdown("""
             ### Управление бизнес-кейсами
@@ -1073,6 +1778,7 @@ def main():
             - ➕ Создание новых проектов
             - 📋 Просмотр списка всех проектов
             - 🔍 Фильтрация по статусу L0-L5, владельцу, отделу
+            - 🔎 Полнотекстовый поиск по проектам и содержимому разделов
             - 📖 Детальный просмотр каждого проекта
             - ✏️ Редактирование информации о проекте
             - 📑 Работа с разделами проектов
@@ -0,0 +1,7 @@
+"""Слой данных бизнес-кейсов без зависимости от Streamlit.
+
+Загрузка и очистка Excel, снимки, хранилище, история изменений, выгрузка,
+итоги портфеля, поиск и фоновые задачи. Модули импортируются по отдельности
+(from core.storage import create_storage), поэтому CLI и процессы пула
+загружают только нужное, а openpyxl - только при чтении или записи Excel.
+"""
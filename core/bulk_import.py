@@ -0,0 +1,259 @@
+"""Массовый импорт книг бизнес-кейсов из каталога: проекты, разделы и записи истории.
+
+Книги разбираются параллельно (по листам в пуле процессов) и записываются пачками:
+разделы, проекты и записи истории пачки - одним вызовом storage.import_batch
+(в SQLite - одна транзакция, в JSON история пишется раньше проектов).
+В проекте запоминаются путь и SHA-256 содержимого книги, поэтому повторный запуск
+пропускает неизменившиеся файлы, а прерванный импорт продолжается с первой
+незаписанной пачки.
+
+Запуск: python -m core.bulk_import КАТАЛОГ [--workers 4] [--batch-size 20] [--mapping ids.json] [--dry-run]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+from .config import (
+    FILE_TO_PROJECT, SNAPSHOT_DIR, open_storage, project_id_from_filename
+)
+from .excel_loader import WorkbookCache, stringify_frame
+from .fingerprint import file_hash
+from .snapshot_store import SnapshotStore
+
+DETAILS_SECTION = "a. Детали инициативы"
+# Поля проекта из листа деталей инициативы: поле -> столбец
+DETAILS_COLUMNS = {
+    "name": "Название инициативы",
+    "description": "Описание инициативы",
+    "owner": "Ответственный за инициативу",
+}
+DEFAULT_STATUS = "L0"
+IMPORT_USER = "Массовый импорт"
+
+
+def discover_workbooks(directory, recursive=True):
+    """.xlsx файлы каталога в стабильном порядке (временные файлы Excel "~$..." пропускаются)"""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        found.extend(os.path.join(root, name) for name in sorted(files)
+                     if name.lower().endswith(".xlsx") and not name.startswith("~$"))
+        if not recursive:
+            break
+    return found
+
+
+def source_path(path):
+    """Путь к книге для записи в проект: абсолютный, чтобы приложение нашло файл из любого каталога"""
+    return os.path.abspath(path)
+
+
+def assign_project_ids(paths, projects, mapping=None):
+    """Id проекта для каждой книги: {путь: project_id}.
+
+    Порядок: явное сопоставление mapping ({имя файла или путь: id}), проект,
+    уже импортированный из этого файла, известные файлы (FILE_TO_PROJECT),
+    затем id из имени файла. Если такой id уже занят другим файлом,
+    к нему добавляется короткий хэш пути - id не зависит от порядка файлов.
+    """
+    mapping = mapping or {}
+    by_source = {os.path.abspath(project["source_file"]): project_id
+                 for project_id, project in projects.items() if project.get("source_file")}
+    taken = {project_id: os.path.abspath(project["source_file"]) if project.get("source_file") else None
+             for project_id, project in projects.items()}
+    ids = {}
+    for path in paths:
+        abs_path = os.path.abspath(path)
+        project_id = (mapping.get(path) or mapping.get(os.path.basename(path)) or by_source.get(abs_path)
+                      or FILE_TO_PROJECT.get(os.path.basename(path)))
+        if project_id is None:
+            project_id = project_id_from_filename(path)
+            owner = taken.get(project_id, abs_path)
+            if project_id in taken and owner != abs_path:
+                project_id = f"{project_id}_{hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:6]}"
+        taken.setdefault(project_id, abs_path)
+        ids[path] = project_id
+    return ids
+
+
+def details_from_sheets(sheets):
+    """Название, описание и ответственный из листа деталей инициативы (первое непустое значение)"""
+    details = sheets.get(DETAILS_SECTION)
+    if details is None or details.empty:
+        return {}
+    text = stringify_frame(details)
+    values = {}
+    for field, column in DETAILS_COLUMNS.items():
+        if column in text.columns:
+            filled = text[column].str.strip()
+            filled = filled[filled != '']
+            if not filled.empty:
+                values[field] = filled.iloc[0]
+    return values
+
+
+def build_project(project_id, path, digest, sheets, existing=None, status=DEFAULT_STATUS):
+    """Запись проекта из книги; поля существующего проекта (статус, правки) сохраняются"""
+    now = datetime.now()
+    details = details_from_sheets(sheets)
+    project = dict(existing) if existing else {
+        "id": project_id,
+        "name": details.get("name") or os.path.splitext(os.path.basename(path))[0],
+        "description": details.get("description", ""),
+        "status": status,
+        "owner": details.get("owner", "Не указан"),
+        "department": "Не указан",
+        "start_date": "",
+        "end_date": "",
+        "created_date": now.strftime("%Y-%m-%d"),
+    }
+    sections = dict(project.get("sections", {}))
+    for sheet_name in sheets:
+        sections.setdefault(sheet_name, "Импортировано из Excel")
+    project.update({
+        "sections": sections,
+        "source_file": source_path(path),
+        "source_hash": digest,
+        "last_updated": now.isoformat(),
+    })
+    return project
+
+
+def changelog_entry(project, path, sheets, updated):
+    """Запись истории об импорте; id детерминирован, повторная запись пачки не дублирует ее в SQLite"""
+    action = "Обновление из Excel" if updated else "Импорт из Excel"
+    return {
+        "id": f"import:{project['id']}:{project['source_hash'][:16]}",
+        "project_id": project["id"],
+        "timestamp": project["last_updated"],
+        "user": IMPORT_USER,
+        "action": action,
+        "details": f"{action}: {os.path.basename(path)} (листов: {len(sheets)})",
+    }
+
+
+def plan_import(paths, projects, mapping=None):
+    """Что импортировать: [(путь, project_id, хэш)] и неизменившиеся файлы [(путь, project_id)]"""
+    ids = assign_project_ids(paths, projects, mapping)
+    pending, unchanged = [], []
+    for path in paths:
+        digest = file_hash(path)
+        stored = projects.get(ids[path])
+        if stored and stored.get("source_hash") == digest:
+            unchanged.append((path, ids[path]))
+        else:
+            pending.append((path, ids[path], digest))
+    return pending, unchanged
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def import_workbooks(paths, storage, mapping=None, max_workers=1, batch_size=20, status=DEFAULT_STATUS,
+                     snapshot_dir=SNAPSHOT_DIR, log=print):
+    """Импортируем книги в хранилище; возвращаем отчет {"imported", "updated", "unchanged", "failed"}.
+
+    Разделы, уже сохраненные в хранилище для проекта, который раньше не импортировался
+    из этого файла, не перезаписываются: в них могут быть правки из приложения.
+    Если книга изменилась после прошлого импорта, ее разделы заменяют сохраненные.
+    """
+    projects = storage.load_projects()
+    pending, unchanged = plan_import(paths, projects, mapping)
+    report = {"imported": [], "updated": [], "unchanged": [path for path, _ in unchanged], "failed": {}}
+    # Неизменившимся книгам, записанным прежде с относительным путем, исправляем только путь
+    moved = {project_id: dict(projects[project_id], source_file=source_path(path)) for path, project_id in unchanged
+             if projects[project_id].get("source_file") != source_path(path)}
+    if moved:
+        storage.upsert_projects(moved)
+        projects.update(moved)
+    if not pending:
+        return report
+
+    stored_keys = storage.section_keys()
+    ids = {path: project_id for path, project_id, _ in pending}
+    # Снимки пишутся при разборе: приложение откроет импортированные разделы без чтения Excel
+    cache = WorkbookCache(snapshot_store=SnapshotStore(snapshot_dir), project_id_for=lambda path: ids[path])
+
+    for number, batch in enumerate(_batches(pending, batch_size), start=1):
+        batch_paths = [path for path, _, _ in batch]
+        parsed, errors = cache.get_many(batch_paths, max_workers=max_workers)
+        for path, error in errors.items():
+            report["failed"][path] = str(error)
+
+        batch_projects, batch_sections, entries = {}, {}, []
+        for path, project_id, digest in batch:
+            if path not in parsed:
+                continue
+            sheets = parsed[path]
+            existing = projects.get(project_id)
+            updated = bool(existing and existing.get("source_hash"))
+            project = build_project(project_id, path, digest, sheets, existing, status)
+            for sheet_name, df in sheets.items():
+                key = f"{project_id}_{sheet_name}"
+                if updated or key not in stored_keys:
+                    batch_sections[key] = df
+            batch_projects[project_id] = project
+            entries.append(changelog_entry(project, path, sheets, updated))
+            report["updated" if updated else "imported"].append(path)
+
+        # Проект с хэшем книги записывается вместе с разделами и историей: пачка, прерванная
+        # до записи, повторится целиком. JSON хранилище разделы не хранит (вернет 0) -
+        # их отдают снимки и сами книги
+        saved_sections = storage.import_batch(batch_sections, batch_projects, entries) if batch_projects else 0
+        projects.update(batch_projects)
+        for path in batch_paths:
+            cache.invalidate(path)
+        sections_note = (f"разделов {saved_sections}" if saved_sections or not batch_sections
+                         else f"разделов 0 (хранилище {storage.name} не хранит разделы, {len(batch_sections)} - в снимках)")
+        log(f"Пачка {number}: записано проектов {len(batch_projects)}, {sections_note}, ошибок {len(errors)}")
+    return report
+
+
+def load_mapping(path):
+    """Сопоставление файлов и id проектов из JSON файла {имя файла или путь: id}"""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Массовый импорт книг бизнес-кейсов (.xlsx) из каталога")
+    parser.add_argument("directory", help="каталог с книгами Excel")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="процессов для разбора листов")
+    parser.add_argument("--batch-size", type=int, default=20, help="книг в одной пачке записи")
+    parser.add_argument("--mapping", help="JSON файл {имя файла или путь: id проекта}")
+    parser.add_argument("--status", default=DEFAULT_STATUS, help="L-статус новых проектов")
+    parser.add_argument("--no-recursive", action="store_true", help="не искать книги во вложенных каталогах")
+    parser.add_argument("--dry-run", action="store_true", help="только показать, что будет импортировано")
+    args = parser.parse_args(argv)
+
+    paths = discover_workbooks(args.directory, recursive=not args.no_recursive)
+    storage = open_storage()
+    mapping = load_mapping(args.mapping)
+    print(f"Найдено книг: {len(paths)}")
+
+    if args.dry_run:
+        pending, unchanged = plan_import(paths, storage.load_projects(), mapping)
+        for path, project_id, _ in pending:
+            print(f"  {project_id} <- {path}")
+        print(f"К импорту: {len(pending)}, без изменений: {len(unchanged)}")
+        return 0
+
+    report = import_workbooks(paths, storage, mapping=mapping, max_workers=args.workers,
+                              batch_size=args.batch_size, status=args.status)
+    print(f"Импортировано: {len(report['imported'])}, обновлено: {len(report['updated'])}, "
+          f"без изменений: {len(report['unchanged'])}, ошибок: {len(report['failed'])}")
+    for path, error in report["failed"].items():
+        print(f"  ❌ {path}: {error}", file=sys.stderr)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Журнал изменений в формате JSON Lines: одна запись - одна строка"""
+import bisect
+import json
+import os
+import tempfile
+import threading
+
+from .profiling import add_bytes, profiled
+
+_append_lock = threading.RLock()
+
+
+def append_entry(path, entry):
+    """Дописываем одну запись в конец журнала и сбрасываем ее на диск (O(1) от длины истории)"""
+    append_entries(path, [entry])
+
+
+@profiled("changelog.append")
+def append_entries(path, entries):
+    """Дописываем несколько записей одной записью в файл и одним fsync"""
+    if not entries:
+        return
+    data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+    with _append_lock:
+        # O_APPEND: строки целиком попадают в конец файла даже при записи из нескольких процессов
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # Недописанную последнюю строку (после сбоя) отделяем, чтобы не испортить новую запись
+            size = os.fstat(fd).st_size
+            if size:
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b"\n":
+                    data = "\n" + data
+            encoded = data.encode("utf-8")
+            os.write(fd, encoded)
+            add_bytes(written=len(encoded))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def iter_entries(path, errors=None):
+    """Потоково читаем записи журнала; поврежденные строки пропускаем.
+
+    Если передан список errors, в него добавляются номера пропущенных строк.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Например, недописанная строка после аварийного завершения
+                if errors is not None:
+                    errors.append(line_number)
+
+
+def write_entries(path, entries):
+    """Переписываем журнал целиком через временный файл и переименование"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        with _append_lock:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def compact(path):
+    """Сжимаем журнал: убираем поврежденные строки и дубликаты, упорядочиваем по времени"""
+    with _append_lock:
+        entries = {}
+        for entry in iter_entries(path):
+            entries[entry.get("id")] = entry
+        ordered = sorted(entries.values(), key=lambda entry: entry.get("timestamp", ""))
+        write_entries(path, ordered)
+    return len(ordered)
+
+
+def migrate_legacy(legacy_path, path):
+    """Переносим старый changelog.json (один JSON массив) в формат JSON Lines.
+
+    Старый файл сохраняется рядом с суффиксом .bak. Возвращает True, если перенос выполнен.
+    """
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return False
+    with open(legacy_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    write_entries(path, entries)
+    os.replace(legacy_path, legacy_path + ".bak")
+    return True
+
+
+class ChangelogIndex:
+    """Вторичный индекс журнала: записи каждого проекта, упорядоченные по времени"""
+
+    def __init__(self, entries=()):
+        self._timestamps = {}  # project_id -> [timestamp, ...] по возрастанию
+        self._entries = {}     # project_id -> [entry, ...] в том же порядке
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        """Добавляем запись; новые записи обычно идут в конец, поэтому вставка дешевая"""
+        project_id = entry.get("project_id")
+        timestamp = entry.get("timestamp", "")
+        timestamps = self._timestamps.setdefault(project_id, [])
+        entries = self._entries.setdefault(project_id, [])
+        position = bisect.bisect_right(timestamps, timestamp)
+        timestamps.insert(position, timestamp)
+        entries.insert(position, entry)
+
+    def count(self, project_id):
+        """Число записей проекта"""
+        return len(self._timestamps.get(project_id, []))
+
+    def actions(self, project_id):
+        """Типы действий, встречающиеся в истории проекта"""
+        return sorted({entry["action"] for entry in self._entries.get(project_id, [])})
+
+    def query(self, project_id, page=1, page_size=20, actions=None, date_from=None, date_to=None):
+        """Страница записей проекта (новые сначала) и общее число подходящих записей.
+
+        date_from и date_to - строки ISO (границы включительно, сравнение по префиксу даты).
+        """
+        timestamps = self._timestamps.get(project_id, [])
+        entries = self._entries.get(project_id, [])
+
+        # Диапазон дат находим бинарным поиском по отсортированным меткам времени
+        start = bisect.bisect_left(timestamps, date_from) if date_from else 0
+        end = bisect.bisect_right(timestamps, date_to + "\uffff") if date_to else len(timestamps)
+        matched = entries[start:end]
+
+        if actions:
+            actions = set(actions)
+            matched = [entry for entry in matched if entry.get("action") in actions]
+
+        total = len(matched)
+        # Новые сначала: страницы отсчитываем с конца диапазона
+        page_end = total - (page - 1) * page_size
+        page_start = max(page_end - page_size, 0)
+        return list(reversed(matched[page_start:max(page_end, 0)])), total
@@ -0,0 +1,109 @@
+"""Определение типов столбцов разделов и компактное хранение (числа, даты, проценты, категории)"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Вид столбца сохраняется в df.attrs: по нему строится конфигурация редактора
+KINDS_ATTR = "column_kinds"
+NUMERIC, PERCENT, DATE, CATEGORY, TEXT = "numeric", "percent", "date", "category", "text"
+
+# Категория: немного повторяющихся значений в достаточно длинном столбце
+CATEGORY_MIN_ROWS = 8
+CATEGORY_MAX_UNIQUE = 50
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+# Нетекстовый вид - только если заполнено не меньше TYPED_MIN_FILLED ячеек или больше половины строк:
+# одиночная ячейка (например, месяц в строке-заголовке) не делает столбец датами
+TYPED_MIN_FILLED = 3
+TYPED_MIN_FILLED_RATIO = 0.5
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}(?: 00:00:00)?$|^\d{2}\.\d{2}\.\d{4}$")
+
+
+def _normalize_number(text):
+    """"1 200,5" -> "1200.5" (пробелы-разделители и десятичная запятая)"""
+    return text.str.replace(r"[\s ]", "", regex=True).str.replace(",", ".", regex=False)
+
+
+def _compact_float(values):
+    """float32, если значения переживают float64 -> float32 -> float64 без изменений, иначе float64"""
+    values = values.astype("float64")
+    compact = values.astype("float32")
+    if np.array_equal(compact.to_numpy(dtype="float64"), values.to_numpy(), equal_nan=True):
+        return compact
+    return values
+
+
+def parse_dates(values):
+    """Строки дат "2025-05-01" и "01.05.2025" в datetime64; остальные значения - NaT"""
+    iso = values.str.match(r"^\d{4}-")
+    return pd.to_datetime(values.where(iso), format="ISO8601", errors="coerce").fillna(
+        pd.to_datetime(values.where(~iso), format="%d.%m.%Y", errors="coerce")
+    )
+
+
+def infer_column(values):
+    """Вид столбца очищенного раздела (строки, пустая ячейка - '') и типизированные значения"""
+    text = values.astype(str).str.strip()
+    filled = text[text != '']
+    if filled.empty or (len(filled) < TYPED_MIN_FILLED and len(filled) <= TYPED_MIN_FILLED_RATIO * len(text)):
+        return TEXT, values
+
+    numbers = pd.to_numeric(_normalize_number(filled), errors="coerce")
+    # Коды с ведущими нулями ("00123") оставляем текстом
+    leading_zeros = filled.str.match(r"^-?0\d").any()
+    if numbers.notna().all() and not leading_zeros:
+        return NUMERIC, _compact_float(pd.to_numeric(_normalize_number(text.mask(text == '')), errors="coerce"))
+
+    if filled.str.endswith("%").all():
+        percents = pd.to_numeric(_normalize_number(filled.str.rstrip("%")), errors="coerce")
+        if percents.notna().all():
+            parsed = pd.to_numeric(_normalize_number(text.mask(text == '').str.rstrip("%")), errors="coerce")
+            return PERCENT, _compact_float(parsed / 100)
+
+    if filled.str.match(DATE_PATTERN).all():
+        dates = parse_dates(filled)
+        if dates.notna().all():
+            return DATE, parse_dates(text.mask(text == ''))
+
+    unique = filled.nunique()
+    if (len(filled) >= CATEGORY_MIN_ROWS and unique <= CATEGORY_MAX_UNIQUE
+            and unique <= CATEGORY_MAX_UNIQUE_RATIO * len(filled)):
+        return CATEGORY, pd.Categorical(values.mask(text == ''))
+
+    return TEXT, values
+
+
+def infer_column_types(df):
+    """Типизируем очищенный раздел: float32/float64, datetime64, Categorical или строки.
+
+    Виды столбцов записываются в df.attrs["column_kinds"].
+    """
+    typed = {}
+    kinds = {}
+    for position, col in enumerate(df.columns):
+        kinds[col], typed[position] = infer_column(df.iloc[:, position])
+    result = pd.DataFrame(typed, index=df.index)
+    result.columns = df.columns
+    result.attrs[KINDS_ATTR] = kinds
+    return result
+
+
+def column_kind(df, col):
+    """Вид столбца: из df.attrs, а для таблиц без него (например, после редактора) - по dtype"""
+    kind = df.attrs.get(KINDS_ATTR, {}).get(col)
+    if kind is not None:
+        return kind
+    dtype = df[col].dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return CATEGORY
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return DATE
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return NUMERIC
+    return TEXT
+
+
+def blank_row(df):
+    """Пустая строка с типами столбцов таблицы (NaN, NaT или пустая категория)"""
+    return df.iloc[:0].reindex([0])
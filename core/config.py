@@ -0,0 +1,86 @@
+"""Настройки приложения и фабрики хранилища и кэша Excel без зависимости от Streamlit"""
+import os
+import re
+
+from .excel_loader import WorkbookCache
+from .snapshot_store import SnapshotStore
+from .storage import create_storage
+
+# Путь к Excel файлам
+EXCEL_FILES = [
+    "Бизнес_кейс_Михненко_Екатерина.xlsx",
+    "Бизнес_кейс_Зырянова.xlsx",
+    "Бизнес_кейс. Руслан Амерханов.xlsx"
+]
+# Число процессов для параллельного разбора Excel файлов, которых нет в кэше (1 - последовательно)
+EXCEL_MAX_WORKERS = int(os.environ.get("EXCEL_MAX_WORKERS", min(4, os.cpu_count() or 1)))
+# Маппинг файлов к проектам
+FILE_TO_PROJECT = {
+    "Бизнес_кейс_Михненко_Екатерина.xlsx": "business_case_1",
+    "Бизнес_кейс_Зырянова.xlsx": "business_case_2",
+    "Бизнес_кейс. Руслан Амерханов.xlsx": "business_case_3"
+}
+PROJECT_TO_FILE = {project_id: excel_file for excel_file, project_id in FILE_TO_PROJECT.items()}
+# Стандартные разделы бизнес-кейса (листы Excel файлов)
+DEFAULT_SECTIONS = [
+    "a. Детали инициативы",
+    "b. Финансовое влияние",
+    "c. Поддерживающие расчеты",
+    "d. Диаграмма Ганта",
+    "e. Мониторинг эффекта",
+    "f. Статус инициатив"
+]
+# Каталог бинарных снимков очищенных разделов (Arrow IPC)
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", ".snapshots")
+# Каталог выгрузки разделов в Excel (по книге на проект)
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "exports")
+# Фоновые задачи (выгрузка, сохранение, загрузка Excel): число потоков и размер очереди
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", 64))
+PROJECTS_FILE = "projects_database.json"
+CHANGELOG_FILE = "changelog.jsonl"
+# Прежний формат истории (один JSON массив), переносится в CHANGELOG_FILE автоматически
+LEGACY_CHANGELOG_FILE = "changelog.json"
+# Хранилище проектов и истории: "json" (файлы выше) или "sqlite" (SQLITE_DB_FILE)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json")
+SQLITE_DB_FILE = os.environ.get("SQLITE_DB_FILE", "smartpm.db")
+
+# L-статусы с описаниями
+L_STATUSES = {
+    "L0": {"name": "Идея", "description": "Сбор всех идей, независимо от реализуемости или масштаба"},
+    "L1": {"name": "Идентифицировано", "description": "Инициатива признана перспективной, проводится первичная оценка и уточнение"},
+    "L2": {"name": "Планирование", "description": "Разработка подробного бизнес-кейса, утверждение инициативы"},
+    "L3": {"name": "Исполнение", "description": "Реализация инициативы по утвержденному плану, выполнение ключевых мероприятий"},
+    "L4": {"name": "Завершено", "description": "Все шаги по реализации завершены, идет проверка достижения целевых показателей"},
+    "L5": {"name": "Реализовано", "description": "Фактическая ценность подтверждена в бизнес-результатах"}
+}
+
+
+def project_id_from_filename(excel_file):
+    """Id проекта из имени файла: "Бизнес кейс. Отдел продаж.xlsx" -> бизнес_кейс_отдел_продаж"""
+    stem = os.path.splitext(os.path.basename(excel_file))[0]
+    return re.sub(r"\W+", "_", stem).strip("_").lower() or "project"
+
+
+def project_id_for_file(excel_file):
+    """Определяем проект по имени Excel файла (известные файлы - по FILE_TO_PROJECT)"""
+    return FILE_TO_PROJECT.get(os.path.basename(excel_file)) or project_id_from_filename(excel_file)
+
+
+def open_storage():
+    """Хранилище проектов, разделов и истории изменений по настройкам окружения"""
+    return create_storage(
+        STORAGE_BACKEND,
+        PROJECTS_FILE,
+        CHANGELOG_FILE,
+        legacy_changelog_file=LEGACY_CHANGELOG_FILE,
+        db_file=SQLITE_DB_FILE
+    )
+
+
+def open_workbook_cache():
+    """Кэш разобранных Excel файлов со снимками в SNAPSHOT_DIR"""
+    return WorkbookCache(
+        snapshot_store=SnapshotStore(SNAPSHOT_DIR),
+        project_id_for=project_id_for_file
+    )
@@ -0,0 +1,279 @@
+"""Помесячные ряды раздела "e. Мониторинг эффекта": план и факт по проектам и показателям.
+
+Лист разбирается один раз в типизированные ряды [metric, month, plan, fact];
+EffectStore хранит ряды всех проектов в одной колоночной таблице, а передискретизация,
+накопленный эффект и отклонение от плана считаются векторно сразу по всем проектам.
+Дашборды и сводные итоги берут данные через EffectStore.query() и totals().
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from .column_types import parse_dates
+
+MONITORING_SECTION = "e. Мониторинг эффекта"
+# Передискретизация: частота pandas -> подпись
+FREQUENCIES = {"MS": "Месяц", "QS": "Квартал", "YS": "Год"}
+# Показатели-доли (конверсия и т. п.): при передискретизации усредняются, а не суммируются
+RATE_MARKERS = ("конверс", "%", "доля", "процент")
+
+# "План (конверсия)", "Факт: Выручка, млн руб"; строки без префикса считаются фактом
+KIND_LABEL = re.compile(r"^\s*(план|факт)\b\s*[(:\-–]?\s*(.*?)\s*\)?\s*$", re.IGNORECASE)
+# Столбцы "длинной" таблицы: показатель, месяц, план, факт
+METRIC_COLUMNS = ("Показатель", "Метрика", "Показатели")
+MONTH_COLUMNS = ("Месяц", "Дата", "Период")
+
+SERIES_COLUMNS = ["metric", "month", "plan", "fact"]
+
+
+def _find_column(df, candidates):
+    columns = {str(column).strip().lower(): column for column in df.columns}
+    for candidate in candidates:
+        if candidate.lower() in columns:
+            return columns[candidate.lower()]
+    return None
+
+
+def parse_values(values):
+    """Значения показателя в числа: "25%" -> 0.25, "1 200,5" -> 1200.5; даты и текст - NaN"""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64").reset_index(drop=True)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.Series(np.nan, index=range(len(values)))
+    text = values.astype("string").str.replace(r"[\s ]", "", regex=True).str.replace(",", ".", regex=False)
+    percent = text.str.endswith("%").fillna(False)
+    numbers = pd.to_numeric(text.str.rstrip("%"), errors="coerce").astype("float64")
+    return numbers.where(~percent, numbers / 100).reset_index(drop=True)
+
+
+def _to_months(values):
+    """Даты (или строки дат) в первое число месяца"""
+    values = pd.Series(values).reset_index(drop=True)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = parse_dates(values.astype("string").str.strip().fillna(""))
+    return values.astype("datetime64[ns]").dt.to_period("M").dt.to_timestamp()
+
+
+def _split_label(label):
+    """"План (конверсия)" -> ("plan", "Конверсия")"""
+    match = KIND_LABEL.match(label)
+    kind, metric = ("plan" if match.group(1).lower() == "план" else "fact", match.group(2)) if match else ("fact", label)
+    metric = metric.strip()
+    return kind, metric[:1].upper() + metric[1:]
+
+
+def _typed(series):
+    return series[SERIES_COLUMNS].astype(
+        {"metric": "string", "month": "datetime64[ns]", "plan": "float64", "fact": "float64"}
+    ).reset_index(drop=True)
+
+
+def empty_series():
+    return pd.DataFrame({
+        "metric": pd.Series(dtype="string"),
+        "month": pd.Series(dtype="datetime64[ns]"),
+        "plan": pd.Series(dtype="float64"),
+        "fact": pd.Series(dtype="float64"),
+    })
+
+
+def _wide_values(df):
+    """Лист "показатели по строкам, месяцы по столбцам": [(вид, показатель, месяц, значение)]"""
+    label_column, month_columns = df.columns[0], list(df.columns[1:])
+    if not month_columns:
+        return None
+    # Месяцы - в заголовках столбцов или в первой строке, где большинство ячеек - даты
+    header = _to_months(pd.Series([str(column) for column in month_columns]))
+    data = df
+    if header.notna().sum() * 2 < len(month_columns):
+        for position in range(len(df)):
+            row_months = _to_months(pd.Series([df[column].iloc[position] for column in month_columns], dtype=object))
+            if row_months.notna().sum() * 2 >= len(month_columns):
+                header, data = row_months, df.iloc[position + 1:]
+                break
+        else:
+            return None
+
+    labels = data[label_column].astype("string").str.strip().fillna("")
+    keep = (labels != "").to_numpy()
+    if not keep.any():
+        return None
+    kinds, metrics = zip(*(_split_label(label) for label in labels[keep]))
+    values = np.column_stack([parse_values(data[column]).to_numpy()[keep] for column in month_columns])
+    rows, columns = np.nonzero(~np.isnan(values) & header.notna().to_numpy())
+    return pd.DataFrame({
+        "kind": np.asarray(kinds, dtype=object)[rows],
+        "metric": np.asarray(metrics, dtype=object)[rows],
+        "month": header.to_numpy()[columns],
+        "value": values[rows, columns],
+    })
+
+
+def _long_values(df):
+    """Лист "показатель, месяц, план, факт" по строкам"""
+    metric_column, month_column = _find_column(df, METRIC_COLUMNS), _find_column(df, MONTH_COLUMNS)
+    plan_column, fact_column = _find_column(df, ("План",)), _find_column(df, ("Факт",))
+    if metric_column is None or month_column is None or (plan_column is None and fact_column is None):
+        return None
+    metrics = df[metric_column].astype("string").str.strip().reset_index(drop=True)
+    months = _to_months(df[month_column])
+    parts = []
+    for kind, column in (("plan", plan_column), ("fact", fact_column)):
+        if column is not None:
+            parts.append(pd.DataFrame({"kind": kind, "metric": metrics, "month": months,
+                                       "value": parse_values(df[column])}))
+    values = pd.concat(parts, ignore_index=True)
+    return values[values["metric"].notna() & (values["metric"] != "") & values["month"].notna()
+                  & values["value"].notna()]
+
+
+def parse_monitoring_sheet(df):
+    """Ряды раздела мониторинга: DataFrame [metric, month, plan, fact], месяц - первое число.
+
+    Понимает оба вида листа: месяцы по столбцам ("План (конверсия)" | 2025-05 | 2025-06 ...)
+    и таблицу по строкам (Показатель | Месяц | План | Факт).
+    """
+    if df is None or df.empty:
+        return empty_series()
+    values = _long_values(df)
+    if values is None:
+        values = _wide_values(df)
+    if values is None or values.empty:
+        return empty_series()
+    series = values.pivot_table(index=["metric", "month"], columns="kind", values="value", aggfunc="last")
+    series = series.reindex(columns=["plan", "fact"]).reset_index()
+    series.columns.name = None
+    return _typed(series)
+
+
+def is_rate_metric(metric):
+    name = str(metric).lower()
+    return any(marker in name for marker in RATE_MARKERS)
+
+
+class EffectStore:
+    """Ряды плана и факта всех проектов в одной колоночной таблице.
+
+    Ряды проекта хранятся отдельным блоком: замена или дозапись проекта
+    не трогает остальные, а общая таблица собирается заново только после изменений.
+    Столбцы таблицы: project_id, metric (категории), month, plan, fact, is_rate.
+    """
+
+    def __init__(self):
+        self._blocks = {}  # project_id -> DataFrame [metric, month, plan, fact]
+        self._table = None
+
+    def __contains__(self, project_id):
+        return project_id in self._blocks
+
+    def set_project(self, project_id, series):
+        """Заменяем ряды проекта"""
+        if series is None or series.empty:
+            self._blocks.pop(project_id, None)
+        else:
+            self._blocks[project_id] = _typed(series)
+        self._table = None
+
+    def append(self, project_id, series):
+        """Дописываем значения проекта; значение за тот же показатель и месяц заменяет прежнее"""
+        if series is None or series.empty:
+            return
+        current = self._blocks.get(project_id)
+        if current is not None:
+            merged = pd.concat([current, _typed(series)], ignore_index=True)
+            # Пустые значения новой записи не затирают заполненные
+            series = merged.groupby(["metric", "month"], sort=False, as_index=False).last()
+        self.set_project(project_id, series)
+
+    def remove_project(self, project_id):
+        self.set_project(project_id, None)
+
+    def copy(self):
+        """Независимая копия: блоки проектов не изменяются на месте, поэтому копия делит их с оригиналом"""
+        other = EffectStore()
+        other._blocks = dict(self._blocks)
+        other._table = self._table
+        return other
+
+    def table(self):
+        """Общая таблица рядов, упорядоченная по проекту, показателю и месяцу"""
+        if self._table is None:
+            if not self._blocks:
+                table = empty_series().assign(project_id=pd.Series(dtype="string"))
+            else:
+                table = pd.concat(self._blocks.values(), keys=list(self._blocks), names=["project_id", None])
+                table = table.reset_index(level=0).reset_index(drop=True)
+            table["project_id"] = table["project_id"].astype("category")
+            table["metric"] = table["metric"].astype("string").astype("category")
+            rate_metrics = [metric for metric in table["metric"].cat.categories if is_rate_metric(metric)]
+            table["is_rate"] = table["metric"].isin(rate_metrics).to_numpy()
+            table = table[["project_id"] + SERIES_COLUMNS + ["is_rate"]]
+            self._table = table.sort_values(["project_id", "metric", "month"], kind="stable").reset_index(drop=True)
+        return self._table
+
+    def metrics(self):
+        """Показатели, по которым есть значения"""
+        return sorted(self.table()["metric"].unique().tolist())
+
+    def query(self, project_ids=None, metrics=None, start=None, end=None, freq="MS"):
+        """Ряды с отклонением от плана и накопленным эффектом.
+
+        Столбцы: project_id, metric, month, plan, fact, deviation (факт - план),
+        deviation_pct (доля от плана), cum_plan, cum_fact (нарастающим итогом по проекту
+        и показателю; для показателей-долей не считается), is_rate.
+        freq: "MS" (месяц), "QS" (квартал), "YS" (год); месяцы суммируются, доли усредняются.
+        """
+        table = self.table()
+        mask = np.ones(len(table), dtype=bool)
+        if project_ids is not None:
+            mask &= table["project_id"].isin(list(project_ids)).to_numpy()
+        if metrics is not None:
+            mask &= table["metric"].isin(list(metrics)).to_numpy()
+        if start is not None:
+            mask &= (table["month"] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (table["month"] <= pd.Timestamp(end)).to_numpy()
+        series = table[mask]
+        if freq != "MS":
+            series = self._resample(series, freq)
+
+        groups = series.groupby(["project_id", "metric"], observed=True, sort=False)
+        deviation = series["fact"] - series["plan"]
+        plan = series["plan"].where(series["plan"] != 0)
+        return series.assign(
+            deviation=deviation,
+            deviation_pct=deviation / plan.abs(),
+            cum_plan=groups["plan"].cumsum().where(~series["is_rate"]),
+            cum_fact=groups["fact"].cumsum().where(~series["is_rate"]),
+        ).reset_index(drop=True)
+
+    @staticmethod
+    def _resample(series, freq):
+        """Периоды freq по всем проектам и показателям сразу: суммы для объемов, средние для долей"""
+        keys = ["project_id", "metric", pd.Grouper(key="month", freq=freq)]
+        groups = series.groupby(keys, observed=True)
+        resampled = groups[["plan", "fact"]].sum(min_count=1)
+        means = groups[["plan", "fact"]].mean()
+        is_rate = groups["is_rate"].first().to_numpy()
+        for column in ("plan", "fact"):
+            resampled[column] = np.where(is_rate, means[column], resampled[column])
+        resampled["is_rate"] = is_rate
+        return resampled.reset_index()
+
+    def totals(self, metric, start=None, end=None, freq="MS"):
+        """Итог портфеля по показателю: [month, plan, fact, deviation, cum_plan, cum_fact]
+
+        Объемы складываются по проектам, доли усредняются.
+        """
+        series = self.query(metrics=[metric], start=start, end=end, freq=freq)
+        if series.empty:
+            return pd.DataFrame(columns=["month", "plan", "fact", "deviation", "cum_plan", "cum_fact"])
+        groups = series.groupby("month")[["plan", "fact"]]
+        totals = groups.mean() if is_rate_metric(metric) else groups.sum(min_count=1)
+        totals["deviation"] = totals["fact"] - totals["plan"]
+        if not is_rate_metric(metric):
+            totals["cum_plan"] = totals["plan"].cumsum()
+            totals["cum_fact"] = totals["fact"].cumsum()
+        return totals.reset_index()
@@ -0,0 +1,99 @@
+"""Выгрузка разделов проектов в Excel: по книге на проект, перезаписываются только измененные листы"""
+import os
+import tempfile
+
+import pandas as pd
+
+from .job_queue import JobScheduler, merge_dict_args
+from .profiling import add_bytes, file_size, profiled
+
+
+def _cell_value(value):
+    """Пустые значения пишем пустыми ячейками, а не строками"""
+    if value is None or value == '':
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def write_sheet(workbook, sheet_name, df):
+    """Заменяем лист книги таблицей раздела, сохраняя позицию листа"""
+    if sheet_name in workbook.sheetnames:
+        position = workbook.sheetnames.index(sheet_name)
+        del workbook[sheet_name]
+        worksheet = workbook.create_sheet(sheet_name, position)
+    else:
+        worksheet = workbook.create_sheet(sheet_name)
+    worksheet.append([str(col) for col in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        worksheet.append([_cell_value(value) for value in row])
+
+
+@profiled("excel.update_workbook")
+def update_workbook(path, sheets, base_path=None):
+    """Перезаписываем в книге path только листы из sheets ({лист: DataFrame}).
+
+    Если книги еще нет, за основу берется base_path (исходный Excel файл проекта),
+    иначе создается новая книга. Файл заменяется атомарно через временный файл.
+    """
+    # openpyxl импортируется при первой выгрузке, а не при запуске приложения
+    import openpyxl
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(path):
+        workbook = openpyxl.load_workbook(path)
+    elif base_path and os.path.exists(base_path):
+        workbook = openpyxl.load_workbook(base_path)
+    else:
+        workbook = openpyxl.Workbook()
+        # Лист по умолчанию пустой новой книги нам не нужен
+        workbook.remove(workbook.active)
+
+    for sheet_name, df in sheets.items():
+        write_sheet(workbook, sheet_name, df)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".xlsx.tmp")
+    os.close(fd)
+    try:
+        workbook.save(tmp_path)
+        add_bytes(written=file_size(tmp_path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _export_sheets(sheets, path, base_path):
+    return update_workbook(path, sheets, base_path)
+
+
+class ExcelExporter:
+    """Фоновая выгрузка разделов в книги проектов в каталоге directory.
+
+    Выгрузки идут через планировщик фоновых задач: записи одной книги выполняются
+    по очереди, а повторные сохранения книги, ожидающей записи, объединяются
+    в одну запись всех измененных листов. Интерфейс не ждет записи файла.
+    """
+
+    def __init__(self, directory, scheduler=None):
+        self.directory = directory
+        self.scheduler = scheduler or JobScheduler(max_workers=1)
+
+    def target_path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def submit(self, filename, sheets, base_path=None):
+        """Ставим выгрузку листов в очередь; возвращает Job с путем к книге в результате"""
+        path = self.target_path(filename)
+        # Таблицы передаются как есть: при copy-on-write их правка в сессии не меняет выгружаемые данные
+        return self.scheduler.submit(
+            os.path.abspath(path), _export_sheets, dict(sheets), path, base_path,
+            label=f"Выгрузка в Excel: {filename}", merge=merge_dict_args
+        )
@@ -0,0 +1,442 @@
+"""Загрузка и очистка листов бизнес-кейсов из Excel файлов"""
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .column_types import infer_column_types
+from .fingerprint import file_hash
+from .profiling import add_bytes, file_size, profiled
+
+try:
+    # Строки, которые pd.read_excel по умолчанию считает пустыми значениями
+    from pandas._libs.parsers import STR_NA_VALUES as NA_STRINGS
+except ImportError:  # pragma: no cover - на случай изменения внутренних модулей pandas
+    NA_STRINGS = {"", "#N/A", "#N/A N/A", "#NA", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"}
+
+# Copy-on-Write: сессии получают дешевые копии общих таблиц,
+# а реальное копирование происходит только при изменении (в pandas 3 включено всегда)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# Строковые представления пустых значений, которые показываем как пустую ячейку
+EMPTY_MARKERS = ['nan', 'None', '<NA>']
+# Сколько непустых строк листа собирается в одну порцию при потоковом чтении
+STREAM_CHUNK_ROWS = 10000
+# Версия правил очистки: входит в отпечаток снимков, чтобы снимки со старой очисткой не использовались
+CLEANING_VERSION = 4
+
+
+def stringify_frame(df):
+    """Приводим все ячейки к строкам, пустые значения заменяем на '' (один проход по таблице)"""
+    str_df = df.astype(str)
+    return str_df.mask(df.isna() | str_df.isin(EMPTY_MARKERS), '')
+
+
+def blank_rows_mask(str_df):
+    """Маска строк, в которых все ячейки пустые (считается по столбцам, без цикла по строкам)"""
+    mask = np.ones(len(str_df), dtype=bool)
+    for col in range(str_df.shape[1]):
+        mask &= str_df.iloc[:, col].str.strip().eq('').to_numpy()
+    return pd.Series(mask, index=str_df.index)
+
+
+def is_year_header(col_str):
+    """Заголовок-год ("2025"): такие столбцы сохраняем, по ним агрегируются суммы"""
+    return len(col_str) == 4 and col_str.isdigit() and 1900 <= int(col_str) <= 2100
+
+
+@profiled("excel.clean_sheet")
+def clean_sheet_data(sheet_name, df):
+    """Очищаем и нормализуем данные листа"""
+    cleaned_df = df.copy()
+
+    # Удаляем полностью пустые строки и столбцы
+    cleaned_df = cleaned_df.dropna(how='all').dropna(axis=1, how='all')
+
+    # Переименовываем проблематичные колонки
+    new_columns = []
+    for i, col in enumerate(cleaned_df.columns):
+        col_str = str(col)
+        if (col_str.startswith('Unnamed:') or (col_str.isdigit() and not is_year_header(col_str))
+                or col_str in ['nan', 'None'] or col_str.strip() == ''):
+            # Даем осмысленные названия
+            if sheet_name == "a. Детали инициативы":
+                new_columns.append(f"Поле_{i+1}")
+            elif sheet_name == "b. Финансовое влияние":
+                new_columns.append(f"Финансы_{i+1}")
+            else:
+                new_columns.append(f"Столбец_{i+1}")
+        else:
+            new_columns.append(col_str)
+
+    cleaned_df.columns = new_columns
+
+    # Преобразуем в строки и удаляем строки где все значения пустые
+    cleaned_df = stringify_frame(cleaned_df)
+    cleaned_df = cleaned_df[~blank_rows_mask(cleaned_df)]
+
+    # Если данных недостаточно, дополняем базовой структурой
+    if len(cleaned_df) == 0:
+        if sheet_name == "a. Детали инициативы":
+            cleaned_df = pd.DataFrame({
+                "Параметр": ["Название инициативы", "Описание инициативы", "Ответственный за инициативу"],
+                "Значение": ["", "", ""],
+                "Комментарий": ["", "", ""]
+            })
+        else:
+            cleaned_df = pd.DataFrame({
+                "Параметр": [""],
+                "Значение": [""],
+                "Комментарий": [""]
+            })
+
+    # Компактные типы столбцов: числа (float32), даты, проценты, категории
+    return infer_column_types(cleaned_df)
+
+
+def _convert_cell(value):
+    """Значение ячейки openpyxl как в pd.read_excel: целые float - в int, маркеры пустоты - в None"""
+    if isinstance(value, str):
+        return None if value in NA_STRINGS else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _header_names(row, start=0):
+    """Названия столбцов из первой строки листа, как их строит pd.read_excel"""
+    names, seen = [], {}
+    for i, value in enumerate(row, start=start):
+        value = _convert_cell(value)
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            # Повторяющиеся заголовки: "Столбец", "Столбец.1", ...
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_worksheet_chunks(worksheet, chunk_size=STREAM_CHUNK_ROWS):
+    """Потоково читаем лист openpyxl (read_only) порциями DataFrame с сырыми значениями.
+
+    Первая строка - заголовок. Полностью пустые строки отбрасываются еще до
+    создания DataFrame; индекс порции - номер строки данных, как у pd.read_excel.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    columns = _header_names(header or ())
+    index, chunk, yielded = [], [], False
+    for row_number, row in enumerate(rows):
+        values = [_convert_cell(value) for value in row]
+        if all(value is None for value in values):
+            continue
+        if len(values) > len(columns):
+            columns += _header_names([None] * (len(values) - len(columns)), start=len(columns))
+        index.append(row_number)
+        chunk.append(values + [None] * (len(columns) - len(values)))
+        if len(chunk) >= chunk_size:
+            yield pd.DataFrame(chunk, index=index, columns=columns, dtype=object)
+            index, chunk, yielded = [], [], True
+    if chunk or not yielded:
+        yield pd.DataFrame(chunk, index=index, columns=columns, dtype=object)
+
+
+def frame_from_chunks(chunks):
+    """Собираем лист из порций: отбрасываем пустые столбцы и выводим типы столбцов"""
+    chunks = list(chunks)
+    df = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+    df = df.loc[:, df.notna().any().to_numpy()] if len(df) else df
+    if len(df) and len(df.index) == df.index[-1] + 1:
+        df.index = pd.RangeIndex(len(df))
+        return df.infer_objects()
+    df = df.infer_objects()
+    # pd.read_excel видит пропущенные пустые строки как NaN во всех столбцах,
+    # поэтому целые столбцы становятся float - сохраняем те же значения
+    int_columns = df.select_dtypes("integer").columns
+    if len(int_columns):
+        df = df.astype({col: "float64" for col in int_columns})
+    return df
+
+
+def _open_workbook(path):
+    """Книга openpyxl только для чтения; openpyxl импортируется при первом чтении Excel"""
+    import openpyxl
+    return openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+
+@profiled("excel.read_sheet")
+def read_sheet_streaming(path, sheet_name, chunk_size=STREAM_CHUNK_ROWS):
+    """Читаем один лист потоково, без полной объектной модели книги в памяти"""
+    add_bytes(read=file_size(path))
+    workbook = _open_workbook(path)
+    try:
+        return frame_from_chunks(iter_worksheet_chunks(workbook[sheet_name], chunk_size))
+    finally:
+        workbook.close()
+
+
+@profiled("excel.parse_workbook")
+def parse_workbook(path):
+    """Читаем все листы Excel файла потоково и очищаем их"""
+    add_bytes(read=file_size(path))
+    workbook = _open_workbook(path)
+    try:
+        return {
+            worksheet.title: clean_sheet_data(worksheet.title, frame_from_chunks(iter_worksheet_chunks(worksheet)))
+            for worksheet in workbook.worksheets
+        }
+    finally:
+        workbook.close()
+
+
+def list_sheet_names(path):
+    """Список листов книги без чтения данных"""
+    with pd.ExcelFile(path) as excel_file:
+        return list(excel_file.sheet_names)
+
+
+def parse_sheet(path, sheet_name):
+    """Читаем и очищаем один лист (выполняется в процессе пула)"""
+    return clean_sheet_data(sheet_name, read_sheet_streaming(path, sheet_name))
+
+
+def parse_workbooks(paths, max_workers=1):
+    """Разбираем несколько книг; при max_workers > 1 - по листам в пуле процессов.
+
+    Возвращает ({путь: {лист: DataFrame}}, {путь: исключение}).
+    Ошибка в одном файле не мешает загрузке остальных.
+    """
+    results, errors = {}, {}
+    if max_workers <= 1 or not paths:
+        for path in paths:
+            try:
+                results[path] = parse_workbook(path)
+            except Exception as e:
+                errors[path] = e
+        return results, errors
+
+    sheet_names = {}
+    for path in paths:
+        try:
+            sheet_names[path] = list_sheet_names(path)
+        except Exception as e:
+            errors[path] = e
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            path: [(name, executor.submit(parse_sheet, path, name)) for name in names]
+            for path, names in sheet_names.items()
+        }
+        for path, sheet_futures in futures.items():
+            try:
+                # Порядок листов сохраняем как в книге
+                results[path] = {name: future.result() for name, future in sheet_futures}
+            except Exception as e:
+                errors[path] = e
+                for _, future in sheet_futures:
+                    future.cancel()
+
+    return results, errors
+
+
+def file_signature(path):
+    """Отпечаток файла для кэша: (mtime, размер)"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class WorkbookCache:
+    """Общий для всех сессий кэш разобранных и очищенных Excel книг.
+
+    Ключ записи - (путь, SHA-256 содержимого): файл перечитывается, только если изменилось
+    его содержимое. Хэш пересчитывается лишь при смене (mtime, размер), поэтому
+    копирование или "touch" без правок не приводит к повторному разбору.
+    Каждый вызывающий получает copy-on-write копии таблиц, поэтому правки
+    одной сессии не попадают в кэш и в другие сессии.
+    """
+
+    def __init__(self, snapshot_store=None, project_id_for=None):
+        self._entries = {}  # путь -> ((путь, хэш), {лист: DataFrame})
+        self._sheets = {}   # путь -> ((путь, хэш), {лист: DataFrame}) для листов, прочитанных по одному
+        self._sheet_names = {}  # путь -> ((путь, хэш), [лист, ...])
+        self._hashes = {}  # путь -> ((mtime, размер), хэш)
+        self._lock = threading.Lock()
+        self._path_locks = defaultdict(threading.Lock)
+        # Необязательный снимок на диске: быстрее Excel при холодном старте процесса
+        self.snapshot_store = snapshot_store
+        self.project_id_for = project_id_for
+
+    def file_fingerprint(self, path):
+        """SHA-256 содержимого файла; пока (mtime, размер) не менялись, файл повторно не читается"""
+        abs_path = os.path.abspath(path)
+        signature = file_signature(path)
+        with self._lock:
+            cached = self._hashes.get(abs_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = file_hash(path)
+        with self._lock:
+            self._hashes[abs_path] = (signature, digest)
+        return digest
+
+    def _cache_key(self, path):
+        return os.path.abspath(path), self.file_fingerprint(path)
+
+    def _snapshot_signature(self, key):
+        return key[1:] + (CLEANING_VERSION,)
+
+    def _read_snapshot(self, path, key):
+        if self.snapshot_store is None:
+            return None
+        return self.snapshot_store.read(path, self._snapshot_signature(key))
+
+    def _write_sheet_snapshot(self, path, key, sheet_name, df):
+        if self.snapshot_store is None:
+            return
+        try:
+            self.snapshot_store.write_sheet(path, self._snapshot_signature(key), self.project_id_for(path), sheet_name, df)
+        except Exception:
+            pass
+
+    def _write_snapshot(self, path, key, sheets):
+        if self.snapshot_store is None:
+            return
+        try:
+            self.snapshot_store.write(path, self._snapshot_signature(key), self.project_id_for(path), sheets)
+        except Exception:
+            # Снимок - только ускорение: при ошибке записи данные остаются в памяти
+            pass
+
+    def get(self, path):
+        """Возвращаем листы одной книги"""
+        results, errors = self.get_many([path])
+        if path in errors:
+            raise errors[path]
+        return results[path]
+
+    def get_sheet(self, path, sheet_name):
+        """Возвращаем один лист книги, читая из Excel только его; результат запоминается.
+
+        None, если в книге нет такого листа.
+        """
+        key = self._cache_key(path)
+        with self._lock:
+            path_lock = self._path_locks[key[0]]
+
+        with path_lock:
+            entry = self._entries.get(key[0])
+            if entry is not None and entry[0] == key:
+                df = entry[1].get(sheet_name)
+                return None if df is None else df.copy(deep=False)
+
+            if self._sheets.get(key[0], (None,))[0] != key:
+                self._sheets[key[0]] = (key, {})
+            sheets = self._sheets[key[0]][1]
+            if sheet_name not in sheets:
+                if self._sheet_names.get(key[0], (None,))[0] != key:
+                    self._sheet_names[key[0]] = (key, list_sheet_names(path))
+                if sheet_name not in self._sheet_names[key[0]][1]:
+                    return None
+                df = None
+                if self.snapshot_store is not None:
+                    df = self.snapshot_store.read_sheet(path, self._snapshot_signature(key), sheet_name)
+                if df is None:
+                    df = parse_sheet(path, sheet_name)
+                    self._write_sheet_snapshot(path, key, sheet_name, df)
+                sheets[sheet_name] = df
+            return sheets[sheet_name].copy(deep=False)
+
+    def get_many(self, paths, max_workers=1):
+        """Возвращаем листы нескольких книг, перечитывая изменившиеся файлы параллельно.
+
+        Результат: ({путь: {лист: DataFrame}}, {путь: исключение}).
+        """
+        keys, errors = {}, {}
+        for path in paths:
+            try:
+                keys[path] = self._cache_key(path)
+            except OSError as e:
+                errors[path] = e
+
+        with self._lock:
+            path_locks = {key[0]: self._path_locks[key[0]] for key in keys.values()}
+
+        # Блокируем файлы в фиксированном порядке, чтобы сессии не ждали друг друга по кругу
+        locked = sorted(path_locks)
+        for abs_path in locked:
+            path_locks[abs_path].acquire()
+        try:
+            stale = {}
+            for path, key in keys.items():
+                if key[0] not in stale and self._entries.get(key[0], (None,))[0] != key:
+                    stale[key[0]] = path
+
+            # Неизменившиеся с момента снимка файлы читаем из снимка вместо Excel
+            for abs_path, path in list(stale.items()):
+                sheets = self._read_snapshot(path, keys[path])
+                if sheets is not None:
+                    self._entries[abs_path] = (keys[path], sheets)
+                    del stale[abs_path]
+
+            parsed, parse_errors = parse_workbooks(list(stale.values()), max_workers=min(max_workers, len(stale)))
+            errors.update(parse_errors)
+            for path, sheets in parsed.items():
+                self._entries[keys[path][0]] = (keys[path], sheets)
+                self._write_snapshot(path, keys[path], sheets)
+
+            results = {}
+            for path in paths:
+                entry = self._entries.get(keys[path][0]) if path in keys else None
+                if path in errors or entry is None:
+                    continue
+                results[path] = {sheet_name: df.copy(deep=False) for sheet_name, df in entry[1].items()}
+        finally:
+            for abs_path in locked:
+                path_locks[abs_path].release()
+
+        return results, errors
+
+    def version(self, paths):
+        """Ключи записей кэша для файлов (путь, хэш): меняются, только когда изменилось содержимое"""
+        with self._lock:
+            return tuple(self._entries[os.path.abspath(path)][0]
+                         for path in paths if os.path.abspath(path) in self._entries)
+
+    def invalidate(self, path=None):
+        """Сбрасываем кэш для файла или целиком"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._sheets.clear()
+                self._sheet_names.clear()
+                self._hashes.clear()
+            else:
+                for entries in (self._entries, self._sheets, self._sheet_names, self._hashes):
+                    entries.pop(os.path.abspath(path), None)
+
+
+def warm_workbook_cache(workbook_cache, excel_files, max_workers=1, progress=None):
+    """Разбираем Excel файлы заранее, чтобы разделы открывались без ожидания.
+
+    Файлы берутся группами по max_workers: книги группы, которых нет в кэше и снимках,
+    разбираются параллельно одним get_many, прогресс сообщается после каждой группы.
+    """
+    failed = []
+    step = max(1, max_workers)
+    for start in range(0, len(excel_files), step):
+        group = excel_files[start:start + step]
+        if progress:
+            progress(start / len(excel_files), ", ".join(os.path.basename(path) for path in group))
+        _, errors = workbook_cache.get_many(group, max_workers=max_workers)
+        failed.extend(f"{os.path.basename(path)} ({error})" for path, error in errors.items())
+    if failed:
+        raise RuntimeError(f"не удалось загрузить: {', '.join(failed)}")
+    return len(excel_files)
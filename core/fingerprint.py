@@ -0,0 +1,42 @@
+"""Отпечатки содержимого: таблиц разделов и исходных файлов.
+
+Отпечаток не зависит от времени изменения файла и от того, какой объект DataFrame
+держит данные, поэтому по нему видно, изменилось ли содержимое на самом деле.
+Отпечатки можно использовать как ключи кэшей (графики, расчеты по разделу).
+"""
+import hashlib
+
+import pandas as pd
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def _dtype_name(dtype):
+    """Название типа столбца для отпечатка: все строковые типы (str, string[pyarrow],
+    large_string[pyarrow] из снимка, object) - одно имя, чтобы отпечаток не зависел
+    от того, откуда загружена таблица"""
+    if pd.api.types.is_string_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype):
+        return "str"
+    return str(dtype)
+
+
+def frame_fingerprint(df):
+    """Отпечаток таблицы: названия и типы столбцов, индекс и значения (16 hex-символов)"""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(repr([(str(column), _dtype_name(dtype)) for column, dtype in df.dtypes.items()]).encode("utf-8"))
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=True)
+    except TypeError:
+        # Нехэшируемые значения в ячейках (списки, словари) - по строковому представлению
+        hashes = pd.util.hash_pandas_object(df.astype(str), index=True)
+    digest.update(hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    """SHA-256 содержимого файла"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,181 @@
+"""Диаграмма Ганта: задачи раздела "d. Диаграмма Ганта" и сводный план портфеля.
+
+Строки раздела разбираются в типизированные задачи (начало, конец, ответственный)
+один раз на версию раздела: ключ кэша - отпечаток содержимого раздела. Фигуры plotly
+кэшируются по тем же отпечаткам и окну дат, поэтому перезапуск страницы
+не перестраивает график. plotly импортируется только при построении фигуры.
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .column_types import parse_dates
+from .portfolio import parse_amounts
+
+GANTT_SECTION = "d. Диаграмма Ганта"
+# Возможные названия столбцов раздела (сравниваются без учета регистра)
+TASK_COLUMNS = ("Задача", "Мероприятие", "Этап", "Наименование", "Название")
+START_COLUMNS = ("Начало", "Дата начала", "Старт")
+END_COLUMNS = ("Конец", "Окончание", "Дата окончания", "Срок")
+DURATION_COLUMNS = ("Длительность", "Длительность, дней", "Дней")
+OWNER_COLUMNS = ("Ответственный", "Исполнитель", "Владелец")
+
+ROW_HEIGHT = 26
+MIN_HEIGHT = 260
+DAY = pd.Timedelta(days=1)
+
+
+def _find_column(df, candidates):
+    columns = {str(column).strip().lower(): column for column in df.columns}
+    for candidate in candidates:
+        if candidate.lower() in columns:
+            return columns[candidate.lower()]
+    return None
+
+
+def _to_dates(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.Series(values, dtype="datetime64[ns]").reset_index(drop=True)
+    text = pd.Series(values).astype("string").str.strip().reset_index(drop=True)
+    return parse_dates(text.fillna("")).astype("datetime64[ns]")
+
+
+def empty_tasks():
+    return pd.DataFrame({
+        "project_id": pd.Series(dtype="string"),
+        "project": pd.Series(dtype="string"),
+        "task": pd.Series(dtype="string"),
+        "start": pd.Series(dtype="datetime64[ns]"),
+        "end": pd.Series(dtype="datetime64[ns]"),
+        "owner": pd.Series(dtype="string"),
+    })
+
+
+def parse_tasks(df, project_id="", project_name="", default_owner=""):
+    """Задачи раздела: DataFrame [project_id, project, task, start, end, owner].
+
+    Конец включается в задачу. Недостающая дата восстанавливается по длительности (в днях),
+    строки без названия задачи или без дат пропускаются.
+    """
+    if df is None or df.empty:
+        return empty_tasks()
+    task_column = _find_column(df, TASK_COLUMNS)
+    start_column = _find_column(df, START_COLUMNS)
+    end_column = _find_column(df, END_COLUMNS)
+    if task_column is None or (start_column is None and end_column is None):
+        return empty_tasks()
+
+    missing = pd.Series(pd.NaT, index=range(len(df)), dtype="datetime64[ns]")
+    start = _to_dates(df[start_column]) if start_column is not None else missing
+    end = _to_dates(df[end_column]) if end_column is not None else missing
+    duration_column = _find_column(df, DURATION_COLUMNS)
+    if duration_column is not None:
+        # Длительность - число дней включительно: задача 01.05-20.05 длится 20 дней
+        days = pd.to_timedelta(parse_amounts(df[duration_column]).reset_index(drop=True) - 1, unit="D")
+        start = start.fillna(end - days)
+        end = end.fillna(start + days)
+    start = start.fillna(end)
+    end = end.fillna(start).where(end >= start, start)
+
+    owner_column = _find_column(df, OWNER_COLUMNS)
+    if owner_column is not None:
+        owners = pd.Series(df[owner_column]).astype("string").str.strip().reset_index(drop=True)
+        owners = owners.mask(owners.isin(["", "nan", "None", "<NA>"])).fillna(default_owner)
+    else:
+        owners = pd.Series(default_owner, index=range(len(df)), dtype="string")
+
+    tasks = pd.DataFrame({
+        "project_id": pd.Series(project_id, index=range(len(df)), dtype="string"),
+        "project": pd.Series(project_name or project_id, index=range(len(df)), dtype="string"),
+        "task": pd.Series(df[task_column]).astype("string").str.strip().reset_index(drop=True),
+        "start": start,
+        "end": end,
+        "owner": owners.astype("string"),
+    })
+    keep = tasks["start"].notna() & tasks["task"].notna() & ~tasks["task"].isin(["", "nan", "None", "<NA>"])
+    return tasks[keep].reset_index(drop=True)
+
+
+def timeline_span(tasks):
+    """(первая дата, последняя дата) задач или None"""
+    if tasks.empty:
+        return None
+    return tasks["start"].min(), tasks["end"].max()
+
+
+def filter_window(tasks, start=None, end=None):
+    """Задачи, пересекающиеся с окном дат [start, end] (границы включаются)"""
+    mask = pd.Series(True, index=tasks.index)
+    if start is not None:
+        mask &= tasks["end"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= tasks["start"] <= pd.Timestamp(end)
+    return tasks[mask]
+
+
+def build_figure(tasks, window=None, color_by="owner", show_project=False):
+    """Фигура plotly: по полосе на задачу, цвет - по ответственному или проекту.
+
+    Полосы строятся одним go.Bar на группу цвета (база - дата начала), а не фигурой
+    на задачу, поэтому план из тысяч задач строится за один проход.
+    """
+    import plotly.graph_objects as go
+
+    tasks = tasks.sort_values(["start", "end"], kind="stable")
+    labels = (tasks["project"] + " · " + tasks["task"]) if show_project else tasks["task"]
+    tasks = tasks.assign(label=labels)
+    figure = go.Figure()
+    for group, part in tasks.groupby(color_by, sort=False):
+        figure.add_trace(go.Bar(
+            name=str(group),
+            y=part["label"],
+            base=part["start"],
+            # Длина полосы в миллисекундах: конец входит в задачу
+            x=((part["end"] - part["start"] + DAY) / pd.Timedelta(milliseconds=1)).to_numpy(),
+            orientation="h",
+            customdata=list(zip(part["project"], part["owner"], part["start"].dt.strftime("%d.%m.%Y"),
+                                part["end"].dt.strftime("%d.%m.%Y"))),
+            hovertemplate="<b>%{y}</b><br>%{customdata[0]}<br>Ответственный: %{customdata[1]}"
+                          "<br>%{customdata[2]} - %{customdata[3]}<extra></extra>",
+        ))
+    rows = list(dict.fromkeys(tasks["label"]))
+    figure.update_yaxes(type="category", categoryorder="array", categoryarray=rows, autorange="reversed")
+    figure.update_xaxes(type="date", range=[pd.Timestamp(value) for value in window] if window else None)
+    figure.update_layout(
+        barmode="overlay",
+        height=max(MIN_HEIGHT, ROW_HEIGHT * len(rows) + 100),
+        margin={"l": 10, "r": 10, "t": 30, "b": 10},
+        showlegend=tasks[color_by].nunique() > 1,
+        legend_title_text="Проект" if color_by == "project" else "Ответственный",
+    )
+    return figure
+
+
+class GanttCache:
+    """Общий LRU кэш разобранных задач и фигур по ключам из отпечатков разделов.
+
+    Значения не изменяются после построения: сессии получают один и тот же объект.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        # Строим без блокировки: сессии не ждут чужие графики
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self._entries)
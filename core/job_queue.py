@@ -0,0 +1,164 @@
+"""Фоновые задачи ввода-вывода: пул потоков с ограниченной очередью и объединением записей"""
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+from .profiling import profiler
+
+
+class QueueFullError(Exception):
+    """Очередь фоновых задач заполнена"""
+
+
+class Job:
+    """Фоновая задача и ее состояние: queued, running, done или error"""
+
+    def __init__(self, target, label, func, args, merge=None, with_progress=False):
+        self.id = uuid.uuid4().hex
+        self.target = target
+        self.label = label
+        self.func = func
+        self.args = args
+        self.merge = merge
+        self.with_progress = with_progress
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        # Сколько повторных запросов объединено с этой задачей
+        self.coalesced = 0
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._finished = threading.Event()
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        """Ждем завершения; True, если задача завершилась"""
+        return self._finished.wait(timeout)
+
+    def set_progress(self, fraction, message=""):
+        """Прогресс от 0 до 1 (вызывается из самой задачи)"""
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        self.message = message
+
+
+class JobScheduler:
+    """Пул потоков для записи файлов, сохранения в хранилище и загрузки Excel.
+
+    У каждой задачи есть цель (файл, таблица): задачи одной цели выполняются
+    по очереди, а повторный запрос к цели, задача которой еще ждет запуска,
+    объединяется с ней - вместо нескольких записей выполняется одна.
+    merge(старые аргументы, новые аргументы) задает, как объединить запросы
+    (по умолчанию побеждают последние аргументы).
+    """
+
+    def __init__(self, max_workers=2, max_queue=64, keep_finished=100):
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._queued = {}   # цель -> задача, ожидающая запуска
+        self._running = {}  # цель -> выполняющаяся задача
+        self._target_locks = defaultdict(threading.Lock)
+        self._jobs = OrderedDict()  # id -> задача (последние keep_finished)
+        self._keep_finished = keep_finished
+        for i in range(max_workers):
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True).start()
+
+    def submit(self, target, func, *args, label=None, merge=None, progress=False):
+        """Ставим задачу в очередь; при progress=True func получает аргумент progress(доля, сообщение).
+
+        Возвращает Job (уже стоящую в очереди, если запрос объединен с ней).
+        QueueFullError, если очередь заполнена.
+        """
+        with self._lock:
+            queued = self._queued.get(target)
+            if queued is not None:
+                queued.args = merge(queued.args, args) if merge else args
+                queued.func = func
+                queued.coalesced += 1
+                return queued
+
+            job = Job(target, label or str(target), func, args, merge=merge, with_progress=progress)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError(target) from None
+            self._queued[target] = job
+            self._jobs[job.id] = job
+            self._trim()
+            return job
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(len(finished) - self._keep_finished, 0)]:
+            del self._jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            # Задачи одной цели не выполняются одновременно
+            with self._target_locks[job.target]:
+                with self._lock:
+                    if self._queued.get(job.target) is job:
+                        del self._queued[job.target]
+                    self._running[job.target] = job
+                    job.status = "running"
+                    job.started_at = time.time()
+                    func, args = job.func, job.args
+                try:
+                    with profiler.span(f"job: {job.label}", coalesced=job.coalesced):
+                        if job.with_progress:
+                            job.result = func(*args, progress=job.set_progress)
+                        else:
+                            job.result = func(*args)
+                    job.progress = 1.0
+                    job.status = "done"
+                except Exception as e:
+                    job.error = e
+                    job.status = "error"
+                finally:
+                    job.finished_at = time.time()
+                    with self._lock:
+                        if self._running.get(job.target) is job:
+                            del self._running[job.target]
+                    job._finished.set()
+                    self._queue.task_done()
+
+    def get(self, job_id):
+        """Задача по id или None, если она уже вытеснена из истории"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active(self):
+        """Задачи, ожидающие запуска или выполняющиеся"""
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done]
+
+    def wait_for(self, target, timeout=None):
+        """Ждем завершения всех задач цели (например, перед чтением с проверкой версии)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = self._queued.get(target) or self._running.get(target)
+            if pending is None:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            pending.wait(remaining)
+
+
+def concat_args(old_args, new_args):
+    """Объединение запросов: списки первого аргумента склеиваются"""
+    return (list(old_args[0]) + list(new_args[0]),) + tuple(new_args[1:])
+
+
+def merge_dict_args(old_args, new_args):
+    """Объединение запросов: словари первого аргумента сливаются, новые значения важнее"""
+    return (dict(old_args[0], **new_args[0]),) + tuple(new_args[1:])
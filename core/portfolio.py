@@ -0,0 +1,151 @@
+"""Финансовый эффект портфеля: суммы проектов по годам и сводные итоги"""
+import re
+from collections import defaultdict
+
+import pandas as pd
+
+FINANCIAL_SECTION = "b. Финансовое влияние"
+# Измерения сводных итогов: поле проекта -> подпись
+ROLLUP_DIMENSIONS = {
+    "status": "Статус",
+    "department": "Отдел",
+    "owner": "Владелец",
+}
+
+YEAR_HEADER = re.compile(r"^\s*((?:19|20)\d{2})\s*$")
+# "120 млн руб (2025)", "80-100 млн руб (2026)"
+AMOUNT_BY_YEAR = re.compile(
+    r"(\d+(?:[.,]\d+)?)(?:\s*[-–]\s*\d+(?:[.,]\d+)?)?\s*млн\.?\s*руб\w*\.?\s*\((\d{4})\)"
+)
+
+
+def parse_amounts(values):
+    """Строковые суммы ("1 200,5") в числа; нечисловые значения - NaN"""
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.Series(values, dtype="float64")
+    text = pd.Series(values, dtype=object).astype(str)
+    text = text.str.replace(r"[\s ]", "", regex=True).str.replace(",", ".", regex=False)
+    return pd.to_numeric(text, errors="coerce")
+
+
+def parse_financial_sheet(df):
+    """Суммы раздела "b. Финансовое влияние" по годам (столбцы-годы), млн руб.
+
+    Возвращает {год: сумма}; строки без числовых значений не учитываются.
+    """
+    year_columns = {col: int(YEAR_HEADER.match(str(col)).group(1))
+                    for col in df.columns if YEAR_HEADER.match(str(col))}
+    amounts = {}
+    for col, year in year_columns.items():
+        total = parse_amounts(df[col]).sum(min_count=1)
+        if pd.notna(total):
+            amounts[year] = amounts.get(year, 0.0) + float(total)
+    return amounts
+
+
+def parse_target_revenue(text):
+    """Суммы по годам из текстового поля target_revenue ("120 млн руб (2025), ...").
+
+    Для диапазонов ("80-100 млн руб (2026)") берется нижняя граница.
+    """
+    amounts = {}
+    for amount, year in AMOUNT_BY_YEAR.findall(text or ""):
+        amounts[int(year)] = amounts.get(int(year), 0.0) + float(amount.replace(",", "."))
+    return amounts
+
+
+def project_attributes(project):
+    """Значения измерений сводных итогов для проекта"""
+    return {
+        "status": project.get("status") or "Не указан",
+        "department": project.get("department") or "Не указан",
+        "owner": project.get("owner") or "Не указан",
+    }
+
+
+def project_amounts(project, financial_df=None):
+    """Суммы проекта по годам: из раздела финансового влияния, иначе из target_revenue"""
+    amounts = parse_financial_sheet(financial_df) if financial_df is not None else {}
+    return amounts or parse_target_revenue(project.get("target_revenue", ""))
+
+
+class PortfolioRollups:
+    """Предрасчитанные итоги портфеля по годам, L-статусу, отделу и владельцу.
+
+    Для каждого проекта хранится его вклад (суммы по годам и значения измерений).
+    Когда меняется проект или его раздел, старый вклад вычитается из итогов,
+    а новый добавляется - остальные проекты не пересчитываются.
+    """
+
+    def __init__(self):
+        self._amounts = {}     # project_id -> {год: сумма}
+        self._attributes = {}  # project_id -> {измерение: значение}
+        self._by_year = defaultdict(float)
+        self._rollups = {dimension: defaultdict(float) for dimension in ROLLUP_DIMENSIONS}
+
+    def __contains__(self, project_id):
+        return project_id in self._attributes
+
+    def _apply(self, project_id, sign):
+        amounts = self._amounts.get(project_id, {})
+        attributes = self._attributes.get(project_id)
+        if attributes is None:
+            return
+        for year, amount in amounts.items():
+            self._add(self._by_year, year, sign * amount)
+            for dimension, totals in self._rollups.items():
+                self._add(totals, (attributes[dimension], year), sign * amount)
+
+    @staticmethod
+    def _add(totals, key, amount):
+        totals[key] += amount
+        # Ключ без вклада убираем, чтобы удаленные значения не оставались в итогах с нулем
+        if abs(totals[key]) < 1e-9:
+            del totals[key]
+
+    def set_project(self, project_id, attributes=None, amounts=None):
+        """Обновляем вклад проекта: новые значения измерений и/или суммы по годам"""
+        self._apply(project_id, -1)
+        if attributes is not None:
+            self._attributes[project_id] = dict(attributes)
+        if amounts is not None:
+            self._amounts[project_id] = dict(amounts)
+        self._attributes.setdefault(project_id, {dimension: "Не указан" for dimension in ROLLUP_DIMENSIONS})
+        self._apply(project_id, 1)
+
+    def remove_project(self, project_id):
+        self._apply(project_id, -1)
+        self._attributes.pop(project_id, None)
+        self._amounts.pop(project_id, None)
+
+    def copy(self):
+        """Независимая копия итогов: вклады проектов заменяются целиком, поэтому словари вкладов общие"""
+        other = PortfolioRollups()
+        other._amounts = dict(self._amounts)
+        other._attributes = dict(self._attributes)
+        other._by_year = defaultdict(float, self._by_year)
+        other._rollups = {dimension: defaultdict(float, totals) for dimension, totals in self._rollups.items()}
+        return other
+
+    def project_amounts(self, project_id):
+        return dict(self._amounts.get(project_id, {}))
+
+    def by_year(self):
+        """Итог портфеля по годам: DataFrame [Год, Сумма (млн руб)]"""
+        years = sorted(self._by_year)
+        return pd.DataFrame({
+            "Год": pd.Series(years, dtype="int64"),
+            "Сумма (млн руб)": pd.Series([self._by_year[year] for year in years], dtype="float64"),
+        })
+
+    def rollup(self, dimension):
+        """Итоги по значениям измерения (строки) и годам (столбцы), млн руб"""
+        totals = self._rollups[dimension]
+        if not totals:
+            return pd.DataFrame()
+        series = pd.Series(totals.values(), index=pd.MultiIndex.from_tuples(totals.keys()))
+        table = series.unstack(fill_value=0.0).sort_index(axis=1)
+        table.columns = table.columns.astype(str)
+        table.index.name = ROLLUP_DIMENSIONS[dimension]
+        table["Итого"] = table.sum(axis=1)
+        return table.sort_values("Итого", ascending=False)
@@ -0,0 +1,254 @@
+"""Легкое профилирование горячих путей: время вызовов, счетчики, байты ввода-вывода, трасса Chrome"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+# Сколько последних вызовов хранится для трассы
+MAX_SPANS = 5000
+
+
+class CallStats:
+    """Накопленная статистика одного имени: вызовы, время и байты"""
+
+    __slots__ = ("calls", "total", "max", "last", "bytes_read", "bytes_written", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.errors = 0
+
+
+class Span:
+    """Один замеренный вызов (для трассы Chrome)"""
+
+    __slots__ = ("name", "start", "duration", "thread_id", "thread_name", "bytes_read", "bytes_written", "args")
+
+    def __init__(self, name, start, thread, args):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.args = args
+
+
+class Profiler:
+    """Сбор замеров по всему процессу: статистика по именам и кольцевой буфер вызовов.
+
+    Вложенные замеры идут по стеку текущего потока, поэтому байты, учтенные
+    через add_bytes(), относятся к самому внутреннему открытому замеру
+    и ко всем внешним. Замер стоит около микросекунды.
+    """
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._spans = deque(maxlen=max_spans)
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **args):
+        """Контекстный менеджер замера: with profiler.span("save"): ..."""
+        return _SpanContext(self, name, args)
+
+    def _start(self, name, args):
+        span = Span(name, time.perf_counter(), threading.current_thread(), args)
+        self._stack().append(span)
+        return span
+
+    def _finish(self, span, failed):
+        span.duration = time.perf_counter() - span.start
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        with self._lock:
+            stats = self._stats.get(span.name)
+            if stats is None:
+                stats = self._stats[span.name] = CallStats()
+            stats.calls += 1
+            stats.total += span.duration
+            stats.max = max(stats.max, span.duration)
+            stats.last = span.duration
+            stats.bytes_read += span.bytes_read
+            stats.bytes_written += span.bytes_written
+            stats.errors += int(failed)
+            self._spans.append(span)
+
+    def add_bytes(self, read=0, written=0):
+        """Учитываем прочитанные/записанные байты в открытых замерах текущего потока"""
+        if not self.enabled:
+            return
+        for span in self._stack():
+            span.bytes_read += read
+            span.bytes_written += written
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._spans.clear()
+
+    def summary(self):
+        """Статистика по именам: DataFrame, самые затратные - сверху"""
+        with self._lock:
+            rows = [(name, stats.calls, stats.total, stats.max, stats.last,
+                     stats.bytes_read, stats.bytes_written, stats.errors)
+                    for name, stats in self._stats.items()]
+        df = pd.DataFrame(rows, columns=["Имя", "Вызовы", "Всего, с", "Макс, с", "Последний, с",
+                                         "Прочитано, байт", "Записано, байт", "Ошибки"])
+        df["Среднее, мс"] = (df["Всего, с"] / df["Вызовы"].where(df["Вызовы"] > 0)) * 1000
+        return df.sort_values("Всего, с", ascending=False, ignore_index=True)
+
+    def last(self, name):
+        """Последний завершенный вызов с именем name или None"""
+        with self._lock:
+            for span in reversed(self._spans):
+                if span.name == name:
+                    return span
+        return None
+
+    def chrome_trace(self):
+        """Трасса в формате Chrome Trace Event (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+        events = []
+        threads = {}
+        for span in spans:
+            threads[span.thread_id] = span.thread_name
+            args = {key: _json_value(value) for key, value in span.args.items()}
+            if span.bytes_read:
+                args["bytes_read"] = span.bytes_read
+            if span.bytes_written:
+                args["bytes_written"] = span.bytes_written
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": round((span.start - self._origin) * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        for thread_id, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                           "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_json(self):
+        """Статистика и трасса одним JSON"""
+        summary = self.summary()
+        return json.dumps({
+            "summary": summary.to_dict(orient="records"),
+            **self.chrome_trace(),
+        }, ensure_ascii=False, default=_json_value)
+
+
+class _SpanContext:
+    __slots__ = ("profiler", "name", "args", "span")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.span = None
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self.span = self.profiler._start(self.name, self.args)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.span is not None:
+            # Управляющие исключения (например, st.rerun) наследуют BaseException и ошибкой не считаются
+            self.profiler._finish(self.span, exc_type is not None and issubclass(exc_type, Exception))
+        return False
+
+
+def _json_value(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+profiler = Profiler()
+
+
+def profiled(name=None):
+    """Декоратор замера функции; имя по умолчанию - имя функции"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_bytes(read=0, written=0):
+    profiler.add_bytes(read=read, written=written)
+
+
+def file_size(path):
+    """Размер файла в байтах (0, если файла нет)"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def estimate_size(value, _seen=None):
+    """Примерный объем значения в памяти, байт: таблицы - по memory_usage, контейнеры - рекурсивно"""
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if hasattr(value, "session_nbytes"):
+        # Представление разделов: только таблицы, скопированные в сессию
+        return value.session_nbytes()
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(key, _seen) + estimate_size(item, _seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(estimate_size(item, _seen) for item in value)
+    elif hasattr(value, "__dict__") and not isinstance(value, type):
+        # Объекты приложения (индексы, итоги портфеля) - по их атрибутам
+        size += estimate_size(vars(value), _seen)
+    return size
+
+
+def session_state_sizes(state):
+    """Объем каждого ключа session state, байт (от большего к меньшему)"""
+    sizes = {}
+    for key in list(state.keys()):
+        try:
+            sizes[str(key)] = estimate_size(state[key])
+        except Exception:
+            sizes[str(key)] = 0
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
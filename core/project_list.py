@@ -0,0 +1,134 @@
+"""Список проектов: фасеты фильтров, сортировка, постраничный вывод и компактная таблица"""
+import math
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from .portfolio import ROLLUP_DIMENSIONS, parse_target_revenue, project_attributes
+
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
+
+# Порядок L-статусов: неизвестные статусы - в конце
+STATUS_ORDER = {f"L{level}": level for level in range(6)}
+
+
+def target_revenue_total(project):
+    """Сумма целевой выручки проекта по всем годам (млн руб), из текстового поля target_revenue"""
+    return sum(parse_target_revenue(project.get("target_revenue", "")).values())
+
+
+# Варианты сортировки: подпись -> (ключ, по убыванию)
+SORT_OPTIONS = {
+    "Последнее обновление": (lambda project: str(project.get("last_updated", "")), True),
+    "Статус (L0 → L5)": (lambda project: STATUS_ORDER.get(project.get("status"), len(STATUS_ORDER)), False),
+    "Статус (L5 → L0)": (lambda project: STATUS_ORDER.get(project.get("status"), -1), True),
+    "Целевая выручка": (target_revenue_total, True),
+    "Название": (lambda project: str(project.get("name", "")).lower(), False),
+}
+
+
+def sort_projects(projects, sort_by):
+    """Проекты в порядке варианта сортировки sort_by (сортировка устойчивая)"""
+    key, descending = SORT_OPTIONS[sort_by]
+    return sorted(projects, key=key, reverse=descending)
+
+
+def page_count(total, page_size):
+    return max(math.ceil(total / page_size), 1)
+
+
+def get_page(items, page, page_size):
+    """Элементы страницы page (с 1); номер страницы приводится к допустимому диапазону.
+
+    Возвращает (элементы страницы, номер страницы, число страниц).
+    """
+    pages = page_count(len(items), page_size)
+    page = min(max(int(page), 1), pages)
+    start = (page - 1) * page_size
+    return items[start:start + page_size], page, pages
+
+
+def projects_table(projects, status_names=None):
+    """Компактная таблица проектов для st.dataframe (индекс - id проекта)"""
+    status_names = status_names or {}
+    return pd.DataFrame({
+        "Название": [project.get("name", "") for project in projects],
+        "Статус": [f"{project.get('status', '')} - {status_names.get(project.get('status'), '')}".rstrip(" -")
+                   for project in projects],
+        "Владелец": [project.get("owner", "") for project in projects],
+        "Отдел": [project.get("department", "") for project in projects],
+        "Целевая выручка, млн руб": np.array([target_revenue_total(project) for project in projects],
+                                             dtype="float64"),
+        "Обновлено": [str(project.get("last_updated", ""))[:10] for project in projects],
+    }, index=pd.Index([project["id"] for project in projects], name="id"))
+
+
+class ProjectFacets:
+    """Индексы фильтров списка: измерение (статус, владелец, отдел) -> значение -> {project_id}.
+
+    Обновляются по одному проекту при создании и редактировании, поэтому список
+    вариантов, счетчики и фильтрация не требуют прохода по всем проектам.
+    Значения измерений - те же, что в итогах портфеля (пустые - "Не указан").
+    """
+
+    def __init__(self, projects=()):
+        self._index = {dimension: defaultdict(set) for dimension in ROLLUP_DIMENSIONS}
+        self._values = {}  # project_id -> {измерение: значение}
+        self._ids = set()
+        for project in projects:
+            self.set_project(project)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def set_project(self, project):
+        """Добавляем проект или переносим его в новые значения измерений"""
+        self.remove_project(project["id"])
+        values = project_attributes(project)
+        for dimension, value in values.items():
+            self._index[dimension][value].add(project["id"])
+        self._values[project["id"]] = values
+        self._ids.add(project["id"])
+
+    def remove_project(self, project_id):
+        values = self._values.pop(project_id, None)
+        if values is None:
+            return
+        for dimension, value in values.items():
+            ids = self._index[dimension][value]
+            ids.discard(project_id)
+            if not ids:
+                del self._index[dimension][value]
+        self._ids.discard(project_id)
+
+    def values(self, dimension):
+        """Значения измерения в стабильном порядке (статусы - по уровню L0-L5)"""
+        if dimension == "status":
+            return sorted(self._index[dimension], key=lambda value: (STATUS_ORDER.get(value, len(STATUS_ORDER)), value))
+        return sorted(self._index[dimension], key=str.lower)
+
+    def _dimension_ids(self, dimension, selected_values):
+        ids = set()
+        for value in selected_values:
+            ids |= self._index[dimension].get(value, set())
+        return ids
+
+    def filter(self, selection, within=None):
+        """Id проектов, подходящих под выбор {измерение: [значения]}.
+
+        Внутри измерения значения объединяются, между измерениями - пересекаются;
+        пустой выбор измерения не ограничивает. within - дополнительное ограничение (например, поиск).
+        """
+        ids = set(self._ids) if within is None else self._ids & set(within)
+        for dimension, selected_values in selection.items():
+            if selected_values:
+                ids &= self._dimension_ids(dimension, selected_values)
+        return ids
+
+    def counts(self, dimension, selection, within=None):
+        """Сколько проектов даст каждое значение измерения при выборе в остальных измерениях"""
+        others = {other: values for other, values in selection.items() if other != dimension}
+        ids = self.filter(others, within)
+        return {value: len(self._index[dimension][value] & ids) for value in self.values(dimension)}
@@ -0,0 +1,106 @@
+"""Полнотекстовый поиск по проектам и содержимому разделов: инвертированный индекс токенов"""
+import bisect
+import re
+from collections import defaultdict
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Окончания, которые отбрасываются при нормализации (от длинных к коротким),
+# чтобы "конверсия", "конверсии" и "конверсию" давали один термин
+RUSSIAN_ENDINGS = sorted([
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ией",
+    "ия", "ии", "ию", "ий", "ый", "ой", "ая", "яя", "ое", "ее", "ую", "юю", "ом", "ем",
+    "ам", "ям", "ах", "ях", "ов", "ев", "ей", "ы", "и", "а", "я", "о", "е", "у", "ю", "ь",
+], key=len, reverse=True)
+MIN_STEM_LENGTH = 4
+
+
+def normalize_token(token):
+    """Нижний регистр, ё -> е и отбрасывание окончания (упрощенный стеммер)"""
+    token = token.lower().replace("ё", "е")
+    if token.isdigit():
+        return token
+    for ending in RUSSIAN_ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM_LENGTH:
+            return token[:-len(ending)]
+    return token
+
+
+def tokenize(text):
+    """Нормализованные термины текста"""
+    return [normalize_token(token) for token in TOKEN_PATTERN.findall(str(text))]
+
+
+class SearchIndex:
+    """Инвертированный индекс: термин -> документы, где документ - поле проекта или раздел.
+
+    Идентификатор документа - кортеж (project_id, поле или название раздела).
+    Документы переиндексируются по одному, поэтому правка раздела обновляет
+    только его термины. Поиск по префиксу идет по отсортированному словарю терминов.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(set)  # термин -> {doc_id, ...}
+        self._documents = {}               # doc_id -> {термин, ...}
+        self._terms = []                   # отсортированный словарь
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._documents
+
+    def index_document(self, doc_id, text):
+        """Индексируем (или переиндексируем) документ"""
+        terms = set(tokenize(text))
+        old_terms = self._documents.get(doc_id, set())
+        for term in old_terms - terms:
+            self._remove_posting(term, doc_id)
+        for term in terms - old_terms:
+            if term not in self._postings:
+                bisect.insort(self._terms, term)
+            self._postings[term].add(doc_id)
+        self._documents[doc_id] = terms
+
+    def remove_document(self, doc_id):
+        for term in self._documents.pop(doc_id, set()):
+            self._remove_posting(term, doc_id)
+
+    def _remove_posting(self, term, doc_id):
+        postings = self._postings.get(term)
+        if postings is None:
+            return
+        postings.discard(doc_id)
+        if not postings:
+            del self._postings[term]
+            del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def _prefix_matches(self, prefix):
+        """Документы, содержащие термин, начинающийся с prefix"""
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff")
+        if end - start == 1:
+            return self._postings[self._terms[start]]
+        matched = set()
+        for term in self._terms[start:end]:
+            matched |= self._postings[term]
+        return matched
+
+    def search(self, query):
+        """Документы, содержащие все слова запроса (каждое - как префикс термина)"""
+        terms = tokenize(query)
+        if not terms:
+            return set()
+        result = None
+        # Сначала самые редкие термины: пересечение быстро сужается
+        for matches in sorted((self._prefix_matches(term) for term in terms), key=len):
+            result = set(matches) if result is None else result & matches
+            if not result:
+                break
+        return result
+
+    def search_projects(self, query):
+        """{project_id: [поля и разделы с совпадениями]}"""
+        projects = defaultdict(list)
+        for project_id, field in sorted(self.search(query)):
+            projects[project_id].append(field)
+        return dict(projects)
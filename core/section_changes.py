@@ -0,0 +1,124 @@
+"""Поячеечное сравнение версий раздела и накопление изменений для истории"""
+import time
+
+import numpy as np
+
+from .excel_loader import stringify_frame
+
+
+def diff_frames(old, new):
+    """Сравниваем две версии таблицы раздела.
+
+    Возвращает словарь: измененные ячейки (строка, столбец, было, стало),
+    добавленные и удаленные строки и столбцы. Ячейки сравниваются
+    векторно по общим строкам и столбцам, как строки.
+    """
+    old_str = stringify_frame(old)
+    new_str = stringify_frame(new)
+
+    common_rows = old_str.index.intersection(new_str.index)
+    common_cols = old_str.columns.intersection(new_str.columns)
+    old_values = old_str.loc[common_rows, common_cols].to_numpy(dtype=object)
+    new_values = new_str.loc[common_rows, common_cols].to_numpy(dtype=object)
+
+    row_positions, col_positions = np.nonzero(old_values != new_values)
+    rows = common_rows[row_positions].tolist()
+    columns = common_cols[col_positions].tolist()
+    cells = [
+        {"row": row, "column": str(column), "old": old_values[r, c], "new": new_values[r, c]}
+        for row, column, r, c in zip(rows, columns, row_positions, col_positions)
+    ]
+
+    # Новые строки из редактора часто пустые - их не считаем изменением, пока не заполнены
+    added = new_str.loc[new_str.index.difference(old_str.index)]
+    added = added[(added != '').any(axis=1)]
+
+    return {
+        "cells": cells,
+        "added_rows": added.index.tolist(),
+        "removed_rows": old_str.index.difference(new_str.index).tolist(),
+        "added_columns": [str(col) for col in new_str.columns.difference(old_str.columns)],
+        "removed_columns": [str(col) for col in old_str.columns.difference(new_str.columns)],
+    }
+
+
+def has_changes(diff):
+    """Есть ли в результате diff_frames хоть одно изменение"""
+    return any(diff[key] for key in ("cells", "added_rows", "removed_rows", "added_columns", "removed_columns"))
+
+
+def summarize(diff):
+    """Краткое описание изменений для записи в историю"""
+    parts = []
+    if diff["cells"]:
+        columns = sorted({cell["column"] for cell in diff["cells"]})
+        parts.append(f"изменено ячеек: {len(diff['cells'])} (столбцы: {', '.join(columns[:5])}"
+                     f"{'…' if len(columns) > 5 else ''})")
+    if diff["added_rows"]:
+        parts.append(f"добавлено строк: {len(diff['added_rows'])}")
+    if diff["removed_rows"]:
+        parts.append(f"удалено строк: {len(diff['removed_rows'])}")
+    if diff["added_columns"]:
+        parts.append(f"добавлены столбцы: {', '.join(diff['added_columns'])}")
+    if diff["removed_columns"]:
+        parts.append(f"удалены столбцы: {', '.join(diff['removed_columns'])}")
+    return "; ".join(parts)
+
+
+class PendingChanges:
+    """Изменения разделов, накопленные между записями в историю.
+
+    Повторные правки одной ячейки схлопываются: сохраняется исходное
+    значение и последнее новое, а возврат к исходному значению убирает запись.
+    """
+
+    def __init__(self):
+        self._sections = {}  # (project_id, section) -> накопленные изменения
+        self.window_start = time.monotonic()
+
+    def __bool__(self):
+        return bool(self._sections)
+
+    def add(self, project_id, section_name, diff):
+        # Интервал отсчитываем от первого изменения после последней записи
+        if not self._sections:
+            self.window_start = time.monotonic()
+        pending = self._sections.setdefault((project_id, section_name), {
+            "cells": {}, "added_rows": [], "removed_rows": [], "added_columns": [], "removed_columns": []
+        })
+        for cell in diff["cells"]:
+            key = (cell["row"], cell["column"])
+            if key in pending["cells"]:
+                cell = dict(pending["cells"][key], new=cell["new"])
+            if cell["old"] == cell["new"]:
+                pending["cells"].pop(key, None)
+            else:
+                pending["cells"][key] = cell
+        for row in diff["added_rows"]:
+            if row not in pending["added_rows"]:
+                pending["added_rows"].append(row)
+        for row in diff["removed_rows"]:
+            if row in pending["added_rows"]:
+                # Строка добавлена и удалена до записи в историю - ее не было
+                pending["added_rows"].remove(row)
+            elif row not in pending["removed_rows"]:
+                pending["removed_rows"].append(row)
+            pending["cells"] = {key: cell for key, cell in pending["cells"].items() if key[0] != row}
+        for kind in ("added_columns", "removed_columns"):
+            for column in diff[kind]:
+                if column not in pending[kind]:
+                    pending[kind].append(column)
+
+    def is_due(self, interval):
+        """Прошел ли интервал с первого незаписанного изменения"""
+        return bool(self._sections) and time.monotonic() - self.window_start >= interval
+
+    def drain(self):
+        """Забираем накопленные изменения: [(project_id, section, diff), ...]"""
+        drained = []
+        for (project_id, section_name), pending in self._sections.items():
+            diff = dict(pending, cells=list(pending["cells"].values()))
+            if has_changes(diff):
+                drained.append((project_id, section_name, diff))
+        self._sections = {}
+        return drained
@@ -0,0 +1,244 @@
+"""Общее хранилище таблиц разделов: каждая таблица хранится один раз на процесс"""
+import threading
+from collections.abc import MutableMapping
+
+from .fingerprint import frame_fingerprint
+from .profiling import estimate_size
+
+
+class SectionSnapshot:
+    """Неизменяемый набор таблиц разделов и псевдонимов их ключей.
+
+    frames: {канонический ключ {project_id}_{section}: DataFrame}
+    aliases: {псевдоним (например, название раздела без проекта): канонический ключ}
+    loader: необязательная функция (канонический ключ) -> DataFrame или None;
+    таблицы, которых нет в frames, загружаются ею при первом обращении и запоминаются.
+    Снимок общий для всех сессий, поэтому загрузчик не должен зависеть от сессии:
+    исключение загрузчика запоминается как ошибка ключа (load_error) - его увидит любая
+    сессия, открывшая раздел, - а загрузка повторится при следующем обращении.
+    Одна и та же таблица может быть записана под несколькими ключами - это один объект.
+    """
+
+    def __init__(self, frames, aliases=None, loader=None):
+        self.frames = frames
+        self.aliases = aliases or {}
+        self.loader = loader
+        self._fingerprints = {}
+        self._derived = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, key):
+        return self.aliases.get(key, key)
+
+    def get(self, key):
+        """Таблица по каноническому ключу (загружается при первом обращении) или None"""
+        df = self.frames.get(key)
+        if df is None and self.loader is not None:
+            # Загружаем без блокировки снимка: сессии не ждут чужие разделы
+            try:
+                df = self.loader(key)
+            except Exception as e:
+                self._errors[key] = e
+                return None
+            self._errors.pop(key, None)
+            if df is not None:
+                with self._lock:
+                    df = self.frames.setdefault(key, df)
+        return df
+
+    def load_error(self, key):
+        """Исключение последней неудачной загрузки таблицы или None"""
+        return self._errors.get(key)
+
+    def fingerprint(self, key):
+        """Отпечаток содержимого таблицы (считается один раз: таблицы снимка не меняются) или None"""
+        fingerprint = self._fingerprints.get(key)
+        if fingerprint is None:
+            df = self.get(key)
+            if df is None:
+                return None
+            fingerprint = self._fingerprints.setdefault(key, frame_fingerprint(df))
+        return fingerprint
+
+    def keys(self):
+        """Ключи уже загруженных таблиц"""
+        with self._lock:
+            return list(self.frames)
+
+    def derived(self, name, build):
+        """Общие данные, построенные по таблицам снимка (итоги портфеля, ряды показателей):
+        build() вызывается один раз на снимок, то есть на версию исходных данных"""
+        value = self._derived.get(name)
+        if value is None:
+            # Строим без блокировки снимка, как и загрузку таблиц
+            value = build()
+            with self._lock:
+                value = self._derived.setdefault(name, value)
+        return value
+
+
+class SectionRegistry:
+    """Реестр общих снимков разделов: пока исходные данные не менялись, все сессии
+    получают один и тот же SectionSnapshot"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._snapshot = None
+
+    def get_or_build(self, version, build):
+        """Снимок для версии данных; build() -> (frames, aliases[, loader]) вызывается только при смене версии"""
+        with self._lock:
+            if self._snapshot is None or self._version != version:
+                self._snapshot = SectionSnapshot(*build())
+                self._version = version
+            return self._snapshot
+
+
+class SectionView(MutableMapping):
+    """Разделы одной сессии поверх общего снимка (copy-on-write).
+
+    Чтение отдает дешевые копии общих таблиц, запись попадает только
+    в собственный слой сессии. Псевдонимы ключей разрешаются через снимок,
+    поэтому правка по названию раздела и по полному ключу - одна и та же таблица.
+    """
+
+    def __init__(self, snapshot):
+        self._shared = snapshot
+        self._local = {}
+        self._deleted = set()
+        self._dirty = set()  # измененные разделы, еще не выгруженные
+        self._fingerprints = {}  # отпечатки собственных таблиц сессии
+        self._saved = {}  # отпечатки разделов на момент последнего сохранения
+
+    def resolve(self, key):
+        """Канонический ключ раздела"""
+        return self._shared.resolve(key)
+
+    def __getitem__(self, key):
+        key = self.resolve(key)
+        if key in self._local:
+            return self._local[key]
+        df = None if key in self._deleted else self._shared.get(key)
+        if df is None:
+            raise KeyError(key)
+        return df.copy(deep=False)
+
+    def __setitem__(self, key, df):
+        key = self.resolve(key)
+        self._local[key] = df
+        self._fingerprints.pop(key, None)
+        self._deleted.discard(key)
+        self._dirty.add(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        key = self.resolve(key)
+        self._local.pop(key, None)
+        self._fingerprints.pop(key, None)
+        self._dirty.discard(key)
+        if key in self._shared.frames:
+            self._deleted.add(key)
+
+    def __contains__(self, key):
+        key = self.resolve(key)
+        return key in self._local or (key not in self._deleted and self._shared.get(key) is not None)
+
+    def __iter__(self):
+        # Только канонические ключи уже загруженных таблиц:
+        # псевдонимы не дублируют таблицы при сохранении, а обход не читает Excel
+        shared_keys = self._shared.keys()
+        for key in shared_keys:
+            if key not in self._deleted:
+                yield key
+        shared_keys = set(shared_keys)
+        for key in list(self._local):
+            if key not in shared_keys:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def derived(self, name, build):
+        """Общие данные снимка (SectionSnapshot.derived); build(view) получает представление
+        без правок сессии"""
+        snapshot = self._shared
+        return snapshot.derived(name, lambda: build(SectionView(snapshot)))
+
+    def load_error(self, key):
+        """Почему раздел не загрузился (исключение загрузчика) или None"""
+        key = self.resolve(key)
+        return None if key in self._local else self._shared.load_error(key)
+
+    def same_source(self, other):
+        """Построены ли оба представления над одним общим снимком (исходные данные не менялись)"""
+        return self._shared is other._shared
+
+    def fingerprint(self, key):
+        """Отпечаток содержимого раздела (frame_fingerprint) или None - для ключей кэшей"""
+        key = self.resolve(key)
+        if key in self._local:
+            if key not in self._fingerprints:
+                self._fingerprints[key] = frame_fingerprint(self._local[key])
+            return self._fingerprints[key]
+        return None if key in self._deleted else self._shared.fingerprint(key)
+
+    def modified_keys(self):
+        """Ключи разделов, измененных в этой сессии"""
+        return set(self._local) | self._deleted
+
+    def dirty_keys(self):
+        """Разделы, содержимое которых отличается от сохраненного (правки, возвращенные
+        к исходным значениям, сохранять не нужно)"""
+        changed = set()
+        for key in list(self._dirty):
+            saved = self._saved[key] if key in self._saved else self._shared.fingerprint(key)
+            if self.fingerprint(key) != saved:
+                changed.add(key)
+            else:
+                self._dirty.discard(key)
+        return changed
+
+    def mark_clean(self, keys):
+        """Отмечаем разделы сохраненными"""
+        for key in keys:
+            self._saved[key] = self.fingerprint(key)
+        self._dirty.difference_update(keys)
+
+    def mark_dirty(self, keys):
+        """Возвращаем разделы в число несохраненных (например, если выгрузка не удалась)"""
+        for key in keys:
+            self._saved.pop(key, None)
+        self._dirty.update(key for key in keys if key in self)
+
+    def session_nbytes(self):
+        """Память, занятая собственными таблицами сессии (общие таблицы не учитываются)"""
+        return int(sum(df.memory_usage(deep=True).sum() for df in self._local.values()))
+
+
+class CopyOnWrite:
+    """Общий объект (например, итоги портфеля) для одной сессии: чтение идет из общего объекта,
+    а перед первой правкой сессия получает собственную копию (метод copy() объекта)"""
+
+    def __init__(self, shared):
+        self._shared = shared
+        self._own = None
+
+    def get(self):
+        return self._shared if self._own is None else self._own
+
+    def own(self):
+        """Объект для правок: собственная копия сессии"""
+        if self._own is None:
+            self._own = self._shared.copy()
+        return self._own
+
+    @property
+    def is_shared(self):
+        return self._own is None
+
+    def session_nbytes(self):
+        """Память сессии: только собственная копия (общий объект не учитывается)"""
+        return 0 if self._own is None else estimate_size(self._own)
@@ -0,0 +1,173 @@
+"""Бинарные снимки очищенных разделов в формате Arrow IPC (Feather v2)"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from .fingerprint import frame_fingerprint
+from .profiling import add_bytes, file_size, profiled
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _arrow_types_mapper(arrow_type):
+    # Строки оставляем в буферах Arrow (без копирования), остальные типы - стандартные numpy/Categorical
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def _write_atomic(path, write):
+    """Пишем файл через временный файл и переименование"""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class SnapshotStore:
+    """Снимки разделов по ключу {project_id}_{section}, по одному .arrow файлу на раздел.
+
+    Манифест хранит для каждого исходного Excel файла его отпечаток (хэш содержимого)
+    на момент снимка: снимок используется, только пока исходник не менялся.
+    Для каждого раздела хранится отпечаток таблицы: неизменившиеся разделы
+    новой версии файла не перезаписываются.
+    Файлы пишутся без сжатия, поэтому их можно читать через memory map без полной копии.
+    """
+
+    def __init__(self, directory, memory_map=True):
+        self.directory = directory
+        self.memory_map = memory_map
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _section_file(self, section_key):
+        # Названия разделов содержат кириллицу, точки и пробелы - используем хэш ключа
+        digest = hashlib.sha1(section_key.encode("utf-8")).hexdigest()[:16]
+        return f"{digest}.arrow"
+
+    @profiled("snapshot.read_section")
+    def read_section(self, filename):
+        """Читаем раздел из снимка (через memory map, если включено)"""
+        path = os.path.join(self.directory, filename)
+        add_bytes(read=file_size(path))
+        if self.memory_map:
+            # Файл не закрываем явно: буферы таблицы ссылаются на отображение,
+            # а ArrowDtype позволяет pandas работать со строками без копирования
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            df = table.to_pandas(types_mapper=_arrow_types_mapper)
+            if not isinstance(df.index, pd.RangeIndex):
+                df.index = pd.Index(df.index.to_numpy())
+            return df
+        with pa.OSFile(path, "rb") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    def _fresh_entry(self, source_path, signature):
+        entry = self._load_manifest().get(os.path.abspath(source_path))
+        if not entry or tuple(entry["signature"]) != tuple(signature):
+            return None
+        return entry
+
+    def read(self, source_path, signature):
+        """Листы исходного файла из снимка или None, если снимок устарел, неполон или отсутствует"""
+        entry = self._fresh_entry(source_path, signature)
+        # Снимок, собранный по одному листу, может содержать не все листы книги
+        if not entry or not entry.get("complete", True):
+            return None
+        try:
+            return {sheet_name: self.read_section(filename)
+                    for sheet_name, filename in entry["sections"].items()}
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+    def read_sheet(self, source_path, signature, sheet_name):
+        """Один лист исходного файла из снимка или None"""
+        entry = self._fresh_entry(source_path, signature)
+        if not entry or sheet_name not in entry["sections"]:
+            return None
+        try:
+            return self.read_section(entry["sections"][sheet_name])
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+    def _store_section(self, source_path, project_id, sheet_name, df, fingerprint, previous):
+        # В имени учитываем исходный файл: книги с одинаковым project_id не затирают снимки друг друга
+        filename = self._section_file(f"{os.path.abspath(source_path)}:{project_id}_{sheet_name}")
+        # Раздел не изменился с прошлого снимка этого файла - файл снимка оставляем как есть
+        if (previous and previous.get("sections", {}).get(sheet_name) == filename
+                and previous.get("fingerprints", {}).get(sheet_name) == fingerprint
+                and os.path.exists(os.path.join(self.directory, filename))):
+            return filename
+        return self._write_section(filename, df)
+
+    @profiled("snapshot.write_section")
+    def _write_section(self, filename, df):
+        table = pa.Table.from_pandas(df, preserve_index=None)
+
+        def write_table(f):
+            with pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+
+        path = os.path.join(self.directory, filename)
+        _write_atomic(path, write_table)
+        add_bytes(written=file_size(path))
+        return filename
+
+    def _update_manifest(self, source_path, project_id, signature, sections, fingerprints, complete):
+        with self._lock:
+            manifest = self._load_manifest()
+            key = os.path.abspath(source_path)
+            entry = manifest.get(key)
+            if not complete and entry and tuple(entry["signature"]) == tuple(signature):
+                # Дописываем лист к снимку той же версии файла
+                sections = dict(entry["sections"], **sections)
+                fingerprints = dict(entry.get("fingerprints", {}), **fingerprints)
+                complete = entry.get("complete", True)
+            manifest[key] = {
+                "project_id": project_id,
+                "signature": list(signature),
+                "sections": sections,
+                "fingerprints": fingerprints,
+                "complete": complete,
+            }
+            payload = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+            _write_atomic(self.manifest_path, lambda f: f.write(payload))
+
+    def write(self, source_path, signature, project_id, sheets):
+        """Сохраняем снимок всех листов исходного файла"""
+        os.makedirs(self.directory, exist_ok=True)
+        previous = self._load_manifest().get(os.path.abspath(source_path))
+        fingerprints = {sheet_name: frame_fingerprint(df) for sheet_name, df in sheets.items()}
+        sections = {sheet_name: self._store_section(source_path, project_id, sheet_name, df,
+                                                    fingerprints[sheet_name], previous)
+                    for sheet_name, df in sheets.items()}
+        self._update_manifest(source_path, project_id, signature, sections, fingerprints, complete=True)
+
+    def write_sheet(self, source_path, signature, project_id, sheet_name, df):
+        """Добавляем в снимок один лист исходного файла"""
+        os.makedirs(self.directory, exist_ok=True)
+        previous = self._load_manifest().get(os.path.abspath(source_path))
+        fingerprint = frame_fingerprint(df)
+        filename = self._store_section(source_path, project_id, sheet_name, df, fingerprint, previous)
+        self._update_manifest(source_path, project_id, signature, {sheet_name: filename},
+                              {sheet_name: fingerprint}, complete=False)
@@ -0,0 +1,311 @@
+"""Хранилище проектов, разделов и истории изменений: JSON файлы или SQLite"""
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from . import changelog_store
+from .profiling import add_bytes, file_size, profiled
+
+
+class ConflictError(Exception):
+    """Проект был изменен в другой сессии после того, как мы его прочитали"""
+
+
+@profiled("storage.write_json")
+def _write_json_atomic(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        add_bytes(written=file_size(tmp_path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _frame_to_bytes(df):
+    table = pa.Table.from_pandas(df, preserve_index=None)
+    sink = io.BytesIO()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    data = sink.getvalue()
+    add_bytes(written=len(data))
+    return data
+
+
+def _frame_from_bytes(data):
+    add_bytes(read=len(data))
+    return pa.ipc.open_file(pa.BufferReader(data)).read_all().to_pandas()
+
+
+class JsonStorage:
+    """Прежний формат: projects_database.json и журнал changelog.jsonl.
+
+    Проект сохраняется перечитыванием файла и заменой одной записи,
+    поэтому параллельные сессии не затирают проекты друг друга.
+    Разделы в этом режиме хранятся только в Excel.
+    """
+
+    name = "json"
+
+    def __init__(self, projects_file, changelog_file, legacy_changelog_file=None):
+        self.projects_file = projects_file
+        self.changelog_file = changelog_file
+        self.legacy_changelog_file = legacy_changelog_file
+        self._lock = threading.Lock()
+
+    def load_projects(self):
+        if not os.path.exists(self.projects_file):
+            return {}
+        with open(self.projects_file, "r", encoding="utf-8") as f:
+            return json.load(f) or {}
+
+    def save_projects(self, projects):
+        with self._lock:
+            _write_json_atomic(self.projects_file, projects)
+
+    def save_project(self, project, expected_last_updated=None):
+        """Сохраняем один проект; при expected_last_updated проверяем, что его не изменили"""
+        with self._lock:
+            projects = self.load_projects()
+            stored = projects.get(project["id"])
+            if expected_last_updated is not None and stored and stored.get("last_updated") != expected_last_updated:
+                raise ConflictError(project["id"])
+            projects[project["id"]] = project
+            _write_json_atomic(self.projects_file, projects)
+
+    def upsert_projects(self, projects):
+        """Добавляем или заменяем переданные проекты, не трогая остальные"""
+        with self._lock:
+            stored = self.load_projects()
+            stored.update(projects)
+            _write_json_atomic(self.projects_file, stored)
+
+    def load_sections(self):
+        return {}
+
+    def section_keys(self):
+        return set()
+
+    def load_section(self, key):
+        return None
+
+    def sections_version(self):
+        return None
+
+    def save_sections(self, sections):
+        return 0
+
+    def load_changelog(self):
+        if self.legacy_changelog_file:
+            changelog_store.migrate_legacy(self.legacy_changelog_file, self.changelog_file)
+        broken_lines = []
+        changelog = list(changelog_store.iter_entries(self.changelog_file, errors=broken_lines))
+        # Поврежденные строки (например, после сбоя при записи) убираем сжатием журнала
+        if broken_lines:
+            changelog_store.compact(self.changelog_file)
+        return changelog
+
+    def append_changelog(self, entry):
+        changelog_store.append_entry(self.changelog_file, entry)
+
+    def append_changelog_entries(self, entries):
+        changelog_store.append_entries(self.changelog_file, entries)
+
+    def import_batch(self, sections, projects, entries):
+        """Пачка массового импорта. Атомарной записи нескольких файлов нет, поэтому история
+        пишется раньше проектов: после сбоя между ними проекты остаются без хэша книги
+        и повторный запуск импортирует их снова (записи с уже известными id не дублируются).
+        Разделы в этом режиме не хранятся - возвращаем 0"""
+        if entries:
+            known = {entry.get("id") for entry in changelog_store.iter_entries(self.changelog_file)}
+            changelog_store.append_entries(self.changelog_file,
+                                           [entry for entry in entries if entry["id"] not in known])
+        if projects:
+            self.upsert_projects(projects)
+        return 0
+
+
+class SqliteStorage:
+    """SQLite в режиме WAL: построчные upsert вместо перезаписи файлов.
+
+    Одновременные сохранения одного проекта разрешаются оптимистично:
+    запись проходит, только если last_updated в базе совпадает с прочитанным.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            last_updated TEXT
+        );
+        CREATE TABLE IF NOT EXISTS sections (
+            key TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS changelog (
+            id TEXT PRIMARY KEY,
+            project_id TEXT,
+            timestamp TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS changelog_project_time ON changelog (project_id, timestamp);
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        # Соединение на поток: сессии Streamlit работают в разных потоках
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def is_empty(self):
+        return self._connect().execute("SELECT COUNT(*) FROM projects").fetchone()[0] == 0
+
+    def load_projects(self):
+        rows = self._connect().execute("SELECT data FROM projects ORDER BY rowid")
+        projects = {}
+        for (data,) in rows:
+            project = json.loads(data)
+            projects[project["id"]] = project
+        return projects
+
+    def save_projects(self, projects):
+        with self._connect() as conn:
+            self._write_projects(conn, projects)
+
+    @staticmethod
+    def _write_projects(conn, projects):
+        conn.executemany(
+            "INSERT INTO projects (id, data, last_updated) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data, last_updated = excluded.last_updated",
+            [(project["id"], json.dumps(project, ensure_ascii=False), project.get("last_updated"))
+             for project in projects.values()]
+        )
+
+    def upsert_projects(self, projects):
+        """Добавляем или заменяем переданные проекты, не трогая остальные"""
+        self.save_projects(projects)
+
+    def save_project(self, project, expected_last_updated=None):
+        """Сохраняем один проект; при expected_last_updated проверяем, что его не изменили"""
+        data = json.dumps(project, ensure_ascii=False)
+        with self._connect() as conn:
+            if expected_last_updated is not None:
+                cursor = conn.execute(
+                    "UPDATE projects SET data = ?, last_updated = ? WHERE id = ? AND last_updated = ?",
+                    (data, project.get("last_updated"), project["id"], expected_last_updated)
+                )
+                if cursor.rowcount:
+                    return
+                exists = conn.execute("SELECT 1 FROM projects WHERE id = ?", (project["id"],)).fetchone()
+                if exists:
+                    raise ConflictError(project["id"])
+            conn.execute(
+                "INSERT INTO projects (id, data, last_updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data, last_updated = excluded.last_updated",
+                (project["id"], data, project.get("last_updated"))
+            )
+
+    def sections_version(self):
+        """Меняется при каждом сохранении разделов"""
+        return self._connect().execute("SELECT COUNT(*), MAX(updated_at) FROM sections").fetchone()
+
+    def load_sections(self):
+        rows = self._connect().execute("SELECT key, data FROM sections")
+        return {key: _frame_from_bytes(data) for key, data in rows}
+
+    def section_keys(self):
+        """Ключи сохраненных разделов (без чтения таблиц)"""
+        return {key for (key,) in self._connect().execute("SELECT key FROM sections")}
+
+    def load_section(self, key):
+        """Один сохраненный раздел или None"""
+        row = self._connect().execute("SELECT data FROM sections WHERE key = ?", (key,)).fetchone()
+        return _frame_from_bytes(row[0]) if row else None
+
+    def save_sections(self, sections):
+        with self._connect() as conn:
+            self._write_sections(conn, sections)
+        return len(sections)
+
+    @staticmethod
+    def _write_sections(conn, sections):
+        updated_at = pd.Timestamp.now().isoformat()
+        conn.executemany(
+            "INSERT INTO sections (key, data, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            [(key, _frame_to_bytes(df), updated_at) for key, df in sections.items()]
+        )
+
+    def load_changelog(self):
+        rows = self._connect().execute("SELECT data FROM changelog ORDER BY timestamp")
+        return [json.loads(data) for (data,) in rows]
+
+    def append_changelog(self, entry):
+        self.append_changelog_entries([entry])
+
+    def append_changelog_entries(self, entries):
+        with self._connect() as conn:
+            self._write_changelog(conn, entries)
+
+    @staticmethod
+    def _write_changelog(conn, entries):
+        conn.executemany(
+            "INSERT OR IGNORE INTO changelog (id, project_id, timestamp, data) VALUES (?, ?, ?, ?)",
+            [(entry["id"], entry.get("project_id"), entry.get("timestamp"), json.dumps(entry, ensure_ascii=False))
+             for entry in entries]
+        )
+
+    def import_batch(self, sections, projects, entries):
+        """Пачка массового импорта одной транзакцией: разделы, проекты и записи истории
+        записываются вместе или не записываются вовсе. Возвращаем число разделов"""
+        with self._connect() as conn:
+            self._write_sections(conn, sections)
+            self._write_projects(conn, projects)
+            self._write_changelog(conn, entries)
+        return len(sections)
+
+    def import_json(self, json_storage):
+        """Импортируем проекты и историю из JSON хранилища"""
+        self.save_projects(json_storage.load_projects())
+        self.append_changelog_entries(json_storage.load_changelog())
+
+    def export_json(self, projects_file):
+        """Выгружаем проекты в формат projects_database.json"""
+        _write_json_atomic(projects_file, self.load_projects())
+
+
+def create_storage(backend, projects_file, changelog_file, legacy_changelog_file=None, db_file=None):
+    """Создаем хранилище по имени бэкенда ("json" или "sqlite")"""
+    json_storage = JsonStorage(projects_file, changelog_file, legacy_changelog_file)
+    if backend == "json":
+        return json_storage
+    if backend == "sqlite":
+        storage = SqliteStorage(db_file)
+        # При первом запуске переносим существующие данные из JSON
+        if storage.is_empty():
+            storage.import_json(json_storage)
+        return storage
+    raise ValueError(f"Неизвестный тип хранилища: {backend}")
@@ -0,0 +1,6 @@
+"""Тесты слоя данных (core) запускаются из корня репозитория: python -m pytest"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,140 @@
+import os
+
+import openpyxl
+import pytest
+
+from core.bulk_import import DETAILS_SECTION, import_workbooks
+from core.storage import create_storage
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path):
+    return create_storage(request.param, str(tmp_path / "projects_database.json"), str(tmp_path / "changelog.jsonl"),
+                          db_file=str(tmp_path / "smartpm.db"))
+
+
+def make_workbook(path, name, revenue=100):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    workbook = openpyxl.Workbook()
+    details = workbook.active
+    details.title = DETAILS_SECTION
+    details.append(["Название инициативы", "Описание инициативы", "Ответственный за инициативу"])
+    details.append([name, "Описание", "Иванов"])
+    financial = workbook.create_sheet("b. Финансовое влияние")
+    financial.append(["Показатель", "2025"])
+    financial.append(["Выручка", revenue])
+    workbook.save(path)
+    return str(path)
+
+
+def run_import(paths, storage, tmp_path, **kwargs):
+    return import_workbooks(paths, storage, snapshot_dir=str(tmp_path / "snapshots"), log=lambda message: None,
+                            **kwargs)
+
+
+def import_entries(storage):
+    return sorted(entry["id"] for entry in storage.load_changelog())
+
+
+def test_rerun_skips_unchanged_and_reimports_changed(storage, tmp_path):
+    paths = [make_workbook(tmp_path / "cases" / f"Кейс {i}.xlsx", f"Инициатива {i}") for i in range(2)]
+
+    report = run_import(paths, storage, tmp_path)
+    assert report["imported"] == paths and not report["failed"]
+    projects = storage.load_projects()
+    assert sorted(project["name"] for project in projects.values()) == ["Инициатива 0", "Инициатива 1"]
+    assert all(os.path.isabs(project["source_file"]) for project in projects.values())
+    entries = import_entries(storage)
+    assert len(entries) == 2
+
+    report = run_import(paths, storage, tmp_path)
+    assert report["unchanged"] == paths and not report["imported"] and not report["updated"]
+    assert import_entries(storage) == entries
+
+    make_workbook(paths[1], "Инициатива 1", revenue=200)
+    report = run_import(paths, storage, tmp_path)
+    assert report["updated"] == [paths[1]] and report["unchanged"] == [paths[0]]
+    assert [entry["action"] for entry in storage.load_changelog()].count("Обновление из Excel") == 1
+
+
+def test_same_file_name_in_two_directories_gets_distinct_ids(storage, tmp_path):
+    first = make_workbook(tmp_path / "north" / "Кейс.xlsx", "Север")
+    second = make_workbook(tmp_path / "south" / "Кейс.xlsx", "Юг")
+
+    run_import([first, second], storage, tmp_path)
+    projects = storage.load_projects()
+    assert len(projects) == 2
+    by_name = {project["name"]: project_id for project_id, project in projects.items()}
+    assert by_name["Север"] == "кейс"
+    assert by_name["Юг"].startswith("кейс_") and len(by_name["Юг"]) == len("кейс_") + 6
+
+    # Повторный запуск в другом порядке находит те же проекты по пути книги
+    report = run_import([second, first], storage, tmp_path)
+    assert len(report["unchanged"]) == 2
+    assert storage.load_projects().keys() == projects.keys()
+
+
+def test_mapping_sets_project_ids(storage, tmp_path):
+    first = make_workbook(tmp_path / "north" / "Кейс.xlsx", "Север")
+    second = make_workbook(tmp_path / "south" / "Кейс.xlsx", "Юг")
+
+    run_import([first, second], storage, tmp_path, mapping={first: "north_case", second: "south_case"})
+    assert set(storage.load_projects()) == {"north_case", "south_case"}
+
+
+def test_interrupted_import_resumes_from_unwritten_batch(storage, tmp_path):
+    paths = [make_workbook(tmp_path / "cases" / f"Кейс {i}.xlsx", f"Инициатива {i}") for i in range(3)]
+    import_batch = storage.import_batch
+    calls = []
+
+    def failing_import_batch(sections, projects, entries):
+        calls.append(1)
+        if len(calls) == 2:
+            raise OSError("сбой записи")
+        return import_batch(sections, projects, entries)
+
+    storage.import_batch = failing_import_batch
+    with pytest.raises(OSError):
+        run_import(paths, storage, tmp_path, batch_size=1)
+    assert len(storage.load_projects()) == 1
+
+    storage.import_batch = import_batch
+    report = run_import(paths, storage, tmp_path, batch_size=1)
+    assert report["unchanged"] == paths[:1] and report["imported"] == paths[1:]
+    projects = storage.load_projects()
+    assert len(projects) == 3
+    assert sorted(entry["project_id"] for entry in storage.load_changelog()) == sorted(projects)
+
+
+def test_json_crash_between_history_and_projects_is_repaired_by_rerun(tmp_path):
+    storage = create_storage("json", str(tmp_path / "projects_database.json"), str(tmp_path / "changelog.jsonl"))
+    path = make_workbook(tmp_path / "cases" / "Кейс.xlsx", "Инициатива")
+    upsert_projects = storage.upsert_projects
+
+    def crash(projects):
+        raise OSError("сбой записи")
+
+    storage.upsert_projects = crash
+    with pytest.raises(OSError):
+        run_import([path], storage, tmp_path)
+    # История уже записана, проекта с хэшем книги нет - повторный запуск импортирует книгу снова
+    assert len(storage.load_changelog()) == 1 and storage.load_projects() == {}
+
+    storage.upsert_projects = upsert_projects
+    report = run_import([path], storage, tmp_path)
+    assert report["imported"] == [path]
+    assert len(storage.load_changelog()) == 1
+
+
+def test_sqlite_batch_is_one_transaction(tmp_path, monkeypatch):
+    storage = create_storage("sqlite", str(tmp_path / "projects_database.json"), str(tmp_path / "changelog.jsonl"),
+                             db_file=str(tmp_path / "smartpm.db"))
+    path = make_workbook(tmp_path / "cases" / "Кейс.xlsx", "Инициатива")
+
+    def crash(conn, entries):
+        raise OSError("сбой записи")
+
+    monkeypatch.setattr(type(storage), "_write_changelog", staticmethod(crash))
+    with pytest.raises(OSError):
+        run_import([path], storage, tmp_path)
+    assert storage.load_projects() == {} and storage.section_keys() == set()
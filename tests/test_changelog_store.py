@@ -0,0 +1,87 @@
+import json
+
+from core import changelog_store
+
+
+def entry(number, project_id="p1", timestamp=None, action="Редактирование раздела"):
+    return {
+        "id": f"e{number}",
+        "project_id": project_id,
+        "timestamp": timestamp or f"2025-05-{number:02d}T10:00:00",
+        "action": action,
+    }
+
+
+def test_append_and_read_back(tmp_path):
+    path = str(tmp_path / "changelog.jsonl")
+
+    changelog_store.append_entry(path, entry(1))
+    changelog_store.append_entries(path, [entry(2), entry(3)])
+    changelog_store.append_entries(path, [])
+
+    assert [item["id"] for item in changelog_store.iter_entries(path)] == ["e1", "e2", "e3"]
+    assert len(open(path, encoding="utf-8").read().splitlines()) == 3
+
+
+def test_torn_last_line_is_skipped_and_next_entry_survives(tmp_path):
+    path = tmp_path / "changelog.jsonl"
+    path.write_text(json.dumps(entry(1), ensure_ascii=False) + "\n" + '{"id": "e2", "proj', encoding="utf-8")
+
+    changelog_store.append_entry(str(path), entry(3))
+
+    errors = []
+    assert [item["id"] for item in changelog_store.iter_entries(str(path), errors=errors)] == ["e1", "e3"]
+    assert errors == [2]
+
+
+def test_compact_drops_broken_lines_and_duplicates(tmp_path):
+    path = tmp_path / "changelog.jsonl"
+    lines = [entry(3), entry(1), entry(3)]
+    path.write_text("\n".join(json.dumps(item) for item in lines) + "\nне json\n", encoding="utf-8")
+
+    assert changelog_store.compact(str(path)) == 2
+
+    errors = []
+    assert [item["id"] for item in changelog_store.iter_entries(str(path), errors=errors)] == ["e1", "e3"]
+    assert errors == []
+
+
+def test_missing_file_reads_as_empty(tmp_path):
+    assert list(changelog_store.iter_entries(str(tmp_path / "missing.jsonl"))) == []
+
+
+def test_migrate_legacy_keeps_backup(tmp_path):
+    legacy = tmp_path / "changelog.json"
+    path = tmp_path / "changelog.jsonl"
+    legacy.write_text(json.dumps([entry(1), entry(2)], ensure_ascii=False), encoding="utf-8")
+
+    assert changelog_store.migrate_legacy(str(legacy), str(path))
+    assert [item["id"] for item in changelog_store.iter_entries(str(path))] == ["e1", "e2"]
+    assert not legacy.exists()
+    assert (tmp_path / "changelog.json.bak").exists()
+    # Повторный перенос не нужен: журнал уже есть
+    assert not changelog_store.migrate_legacy(str(legacy), str(path))
+
+
+def test_index_pages_newest_first_with_filters():
+    entries = [entry(number) for number in range(1, 26)]
+    entries.append(entry(26, action="Создание проекта", timestamp="2025-05-03T09:00:00"))
+    entries.append(entry(27, project_id="p2"))
+    index = changelog_store.ChangelogIndex(entries)
+
+    page, total = index.query("p1", page=1, page_size=10)
+    assert total == 26
+    assert [item["id"] for item in page[:2]] == ["e25", "e24"]
+
+    last_page, _ = index.query("p1", page=3, page_size=10)
+    assert [item["id"] for item in last_page] == ["e5", "e4", "e3", "e26", "e2", "e1"]
+
+    page, total = index.query("p1", date_from="2025-05-03", date_to="2025-05-04")
+    assert total == 3
+    assert [item["id"] for item in page] == ["e4", "e3", "e26"]
+
+    page, total = index.query("p1", actions=["Создание проекта"])
+    assert (total, page[0]["id"]) == (1, "e26")
+    assert index.count("p2") == 1
+    assert index.actions("p1") == ["Редактирование раздела", "Создание проекта"]
+    assert index.query("p3") == ([], 0)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from core.column_types import (CATEGORY, DATE, KINDS_ATTR, NUMERIC, PERCENT, TEXT, blank_row, column_kind,
+                               infer_column, infer_column_types)
+
+
+def test_amounts_keep_all_significant_digits():
+    kind, values = infer_column(pd.Series(["35123456.78", "1234567.89", ""]))
+    assert kind == NUMERIC
+    assert values.dtype == "float64"
+    assert values.iloc[0] == 35123456.78
+    assert values.iloc[1] == 1234567.89
+    assert np.isnan(values.iloc[2])
+
+
+def test_exact_values_are_stored_as_float32():
+    kind, values = infer_column(pd.Series(["1", "2,5", "1 200", "0.25"]))
+    assert kind == NUMERIC
+    assert values.dtype == "float32"
+    assert values.tolist() == [1.0, 2.5, 1200.0, 0.25]
+
+
+def test_percent_and_dates():
+    kind, values = infer_column(pd.Series(["12,5%", "30%", "100%"]))
+    assert kind == PERCENT
+    assert values.tolist() == [0.125, 0.3, 1.0]
+
+    kind, values = infer_column(pd.Series(["2025-05-01", "01.06.2025", "", "2025-07-01 00:00:00"]))
+    assert kind == DATE
+    assert values.iloc[1] == pd.Timestamp("2025-06-01")
+    assert pd.isna(values.iloc[2])
+
+
+def test_leading_zero_codes_stay_text():
+    kind, _ = infer_column(pd.Series(["00123", "00456", "00789"]))
+    assert kind == TEXT
+
+
+def test_single_header_cell_does_not_type_column():
+    # Столбец месяца в листе мониторинга: заполнен только заголовок-дата, план и факт пустые
+    kind, values = infer_column(pd.Series(["2025-05-01 00:00:00", "", ""]))
+    assert kind == TEXT
+    assert values.tolist() == ["2025-05-01 00:00:00", "", ""]
+    # Однострочная таблица (финансовое влияние) типизируется по своей единственной ячейке
+    assert infer_column(pd.Series(["35"]))[0] == NUMERIC
+
+
+def test_category_and_kinds_attr():
+    df = pd.DataFrame({
+        "Статус": ["L1", "L2", "L1", "L3", "L2", "L1", "L2", "L1"],
+        "План": ["1", "2", "3", "4", "5", "6", "7", "8"],
+    })
+    typed = infer_column_types(df)
+    assert typed.attrs[KINDS_ATTR] == {"Статус": CATEGORY, "План": NUMERIC}
+    assert isinstance(typed["Статус"].dtype, pd.CategoricalDtype)
+    # Без attrs (например, таблица из редактора) вид определяется по dtype
+    plain = pd.DataFrame({column: typed[column] for column in typed.columns})
+    assert column_kind(plain, "Статус") == CATEGORY
+    assert column_kind(plain, "План") == NUMERIC
+
+
+def test_blank_row_keeps_dtypes():
+    typed = infer_column_types(pd.DataFrame({"Дата": ["2025-05-01"] * 3, "Сумма": ["1", "2", "3"]}))
+    row = blank_row(typed)
+    assert len(row) == 1
+    assert row.dtypes.tolist() == typed.dtypes.tolist()
+    assert row.isna().all(axis=None)
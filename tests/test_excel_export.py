@@ -0,0 +1,102 @@
+import os
+import threading
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from core.excel_export import ExcelExporter, update_workbook
+from core.job_queue import JobScheduler
+
+SHEETS = ["a. Детали инициативы", "b. Финансовое влияние", "c. Поддерживающие расчеты"]
+
+
+def sheet_values(path, sheet_name):
+    workbook = openpyxl.load_workbook(path)
+    try:
+        return [list(row) for row in workbook[sheet_name].iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+
+def sheet_names(path):
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+@pytest.fixture
+def base_path(tmp_path):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for i, sheet_name in enumerate(SHEETS):
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(["Параметр", "Значение"])
+        worksheet.append([f"Исходный {i}", i])
+    path = tmp_path / "Кейс.xlsx"
+    workbook.save(path)
+    return str(path)
+
+
+def test_only_dirty_sheets_are_replaced(tmp_path, base_path):
+    path = str(tmp_path / "exports" / "Кейс.xlsx")
+    base_bytes = open(base_path, "rb").read()
+    financial = pd.DataFrame({"Показатель": ["Выручка", "Затраты"], "2025": [120.5, None]})
+
+    update_workbook(path, {SHEETS[1]: financial}, base_path=base_path)
+
+    assert open(base_path, "rb").read() == base_bytes
+    assert sheet_names(path) == SHEETS
+    assert sheet_values(path, SHEETS[1]) == [["Показатель", "2025"], ["Выручка", 120.5], ["Затраты", None]]
+    for sheet_name in (SHEETS[0], SHEETS[2]):
+        assert sheet_values(path, sheet_name) == sheet_values(base_path, sheet_name)
+
+    # Повторная выгрузка другого листа не трогает выгруженный раньше
+    update_workbook(path, {SHEETS[2]: pd.DataFrame({"Расчет": ["Новый"]})}, base_path=base_path)
+    assert sheet_values(path, SHEETS[1])[1] == ["Выручка", 120.5]
+    assert sheet_values(path, SHEETS[2]) == [["Расчет"], ["Новый"]]
+
+
+def test_new_workbook_without_base_has_only_exported_sheets(tmp_path):
+    path = str(tmp_path / "new.xlsx")
+    update_workbook(path, {SHEETS[0]: pd.DataFrame({"Параметр": ["Название"]})})
+    assert sheet_names(path) == [SHEETS[0]]
+
+
+def test_failed_save_keeps_previous_file(tmp_path, base_path, monkeypatch):
+    path = str(tmp_path / "exports" / "Кейс.xlsx")
+    update_workbook(path, {SHEETS[0]: pd.DataFrame({"Параметр": ["Первая версия"]})}, base_path=base_path)
+    exported_bytes = open(path, "rb").read()
+
+    def failing_save(workbook, filename):
+        with open(filename, "wb") as f:
+            f.write(b"partial")
+        raise OSError("диск заполнен")
+
+    monkeypatch.setattr(openpyxl.Workbook, "save", failing_save)
+    with pytest.raises(OSError):
+        update_workbook(path, {SHEETS[0]: pd.DataFrame({"Параметр": ["Вторая версия"]})})
+
+    assert open(path, "rb").read() == exported_bytes
+    assert os.listdir(os.path.dirname(path)) == ["Кейс.xlsx"]
+
+
+def test_exports_waiting_for_one_workbook_are_merged(tmp_path, base_path):
+    scheduler = JobScheduler(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    scheduler.submit("block", lambda: (started.set(), release.wait(5)))
+    assert started.wait(5)
+    exporter = ExcelExporter(str(tmp_path / "exports"), scheduler)
+
+    first = exporter.submit("Кейс.xlsx", {SHEETS[0]: pd.DataFrame({"Параметр": ["A"]})}, base_path=base_path)
+    second = exporter.submit("Кейс.xlsx", {SHEETS[2]: pd.DataFrame({"Параметр": ["C"]})}, base_path=base_path)
+    assert second is first
+
+    release.set()
+    assert first.wait(5) and first.status == "done"
+    path = exporter.target_path("Кейс.xlsx")
+    assert sheet_values(path, SHEETS[0]) == [["Параметр"], ["A"]]
+    assert sheet_values(path, SHEETS[1]) == sheet_values(base_path, SHEETS[1])
+    assert sheet_values(path, SHEETS[2]) == [["Параметр"], ["C"]]
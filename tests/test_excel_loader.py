@@ -0,0 +1,51 @@
+import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from core.excel_loader import clean_sheet_data, parse_workbook, read_sheet_streaming
+
+SHEETS = ["a. Детали инициативы", "e. Мониторинг эффекта"]
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    """Книга с объединенными и пустыми заголовками, повторами, пустыми строками и пустым столбцом"""
+    workbook = openpyxl.Workbook()
+    details = workbook.active
+    details.title = SHEETS[0]
+    details.append(["Название инициативы", "Описание инициативы", None])
+    details.append(["Инициатива", "Описание", None])
+    details.append([None, None, None])
+    details.append(["Вторая", "N/A", "Комментарий"])
+
+    monitoring = workbook.create_sheet(SHEETS[1])
+    monitoring.append(["Показатель", "План", None, "Факт", None, "Факт", 2025])
+    monitoring.merge_cells("B1:C1")
+    start = datetime.datetime(2025, 1, 1)
+    for i in range(12):
+        if i % 4 == 3:
+            monitoring.append([None] * 7)
+            continue
+        monitoring.append([f"Показатель {i}", 100 + i, 0.25 * i, None if i % 5 == 0 else 90.5 + i, None,
+                           start + datetime.timedelta(days=i), "n/a" if i == 2 else i])
+    path = tmp_path / "Кейс.xlsx"
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("sheet_name", SHEETS)
+@pytest.mark.parametrize("chunk_size", [1, 3, 10000])
+def test_streaming_reader_matches_read_excel(workbook_path, sheet_name, chunk_size):
+    expected = clean_sheet_data(sheet_name, pd.read_excel(workbook_path, sheet_name=sheet_name))
+    streamed = clean_sheet_data(sheet_name, read_sheet_streaming(workbook_path, sheet_name, chunk_size=chunk_size))
+    pd.testing.assert_frame_equal(streamed, expected)
+
+
+def test_parse_workbook_cleans_every_sheet_like_read_excel(workbook_path):
+    sheets = parse_workbook(workbook_path)
+    assert list(sheets) == SHEETS
+    for sheet_name in SHEETS:
+        expected = clean_sheet_data(sheet_name, pd.read_excel(workbook_path, sheet_name=sheet_name))
+        pd.testing.assert_frame_equal(sheets[sheet_name], expected)
@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from core.excel_loader import clean_sheet_data, parse_workbook
+from core.fingerprint import file_hash, frame_fingerprint
+from core.snapshot_store import SnapshotStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKBOOK = os.path.join(ROOT, "Бизнес_кейс_Михненко_Екатерина.xlsx")
+
+
+def test_fingerprint_depends_on_content_only():
+    df = pd.DataFrame({"Задача": ["Скрипт", "Обучение"], "Дней": [5.0, 10.0]})
+    assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+    changed = df.copy()
+    changed.loc[1, "Дней"] = 11.0
+    assert frame_fingerprint(changed) != frame_fingerprint(df)
+    assert frame_fingerprint(df.rename(columns={"Дней": "Дни"})) != frame_fingerprint(df)
+
+
+def test_fingerprint_ignores_string_storage():
+    df = pd.DataFrame({"Параметр": ["Конверсия", ""], "Значение": ["0.25", "0.3"]})
+    assert frame_fingerprint(df.astype("string[pyarrow]")) == frame_fingerprint(df)
+    assert frame_fingerprint(df.astype(pd.ArrowDtype(pa.large_string()))) == frame_fingerprint(df)
+    # Числа и строки с теми же цифрами - разные таблицы
+    assert frame_fingerprint(df.astype({"Значение": "float64"})) != frame_fingerprint(df)
+
+
+def test_fingerprint_handles_unhashable_cells():
+    df = pd.DataFrame({"Значения": [[1, 2], {"a": 1}]})
+    assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+
+
+def test_snapshot_round_trip_keeps_fingerprint(tmp_path):
+    df = clean_sheet_data("d. Диаграмма Ганта", pd.DataFrame({
+        "Задача": ["Скрипт", "Обучение", "Контроль"],
+        "Начало": ["2025-05-01", "2025-05-10", "2025-06-01"],
+        "Длительность": ["10", "20", "30"],
+    }))
+    store = SnapshotStore(str(tmp_path))
+    store.write_sheet("book.xlsx", ("hash", 1), "p", "d. Диаграмма Ганта", df)
+    restored = store.read_sheet("book.xlsx", ("hash", 1), "d. Диаграмма Ганта")
+    assert str(restored["Задача"].dtype) != str(df["Задача"].dtype)
+    assert frame_fingerprint(restored) == frame_fingerprint(df)
+
+
+@pytest.mark.skipif(not os.path.exists(WORKBOOK), reason="нет Excel файла бизнес-кейса")
+def test_workbook_sections_match_their_snapshot(tmp_path):
+    sheets = parse_workbook(WORKBOOK)
+    store = SnapshotStore(str(tmp_path))
+    store.write(WORKBOOK, ("hash", 1), "business_case_1", sheets)
+    restored = store.read(WORKBOOK, ("hash", 1))
+    assert set(restored) == set(sheets)
+    for sheet_name, df in sheets.items():
+        assert frame_fingerprint(restored[sheet_name]) == frame_fingerprint(df), sheet_name
+
+
+def test_file_hash(tmp_path):
+    path = tmp_path / "book.xlsx"
+    path.write_bytes(b"x" * 3_000_000)
+    first = file_hash(str(path))
+    os.utime(path, (0, 0))
+    assert file_hash(str(path)) == first
+    path.write_bytes(b"y" * 3_000_000)
+    assert file_hash(str(path)) != first
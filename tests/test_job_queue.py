@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from core.job_queue import JobScheduler, QueueFullError, concat_args, merge_dict_args
+
+TIMEOUT = 5
+
+
+def block_worker(scheduler, target="block"):
+    """Занимаем поток планировщика задачей, которая ждет release; возвращаем (задача, release)"""
+    started, release = threading.Event(), threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(TIMEOUT)
+
+    job = scheduler.submit(target, blocker)
+    assert started.wait(TIMEOUT)
+    return job, release
+
+
+def test_repeated_submits_to_one_target_make_one_write():
+    scheduler = JobScheduler(max_workers=1)
+    _, release = block_worker(scheduler)
+    writes = []
+
+    jobs = [scheduler.submit("projects", writes.append, {f"p{i}": i}, merge=merge_dict_args) for i in range(5)]
+    assert all(job is jobs[0] for job in jobs)
+    assert jobs[0].coalesced == 4
+
+    release.set()
+    assert scheduler.wait_for("projects", timeout=TIMEOUT)
+    assert writes == [{"p0": 0, "p1": 1, "p2": 2, "p3": 3, "p4": 4}]
+    assert jobs[0].status == "done"
+
+
+def test_last_arguments_win_without_merge():
+    scheduler = JobScheduler(max_workers=1)
+    _, release = block_worker(scheduler)
+    writes = []
+
+    for i in range(3):
+        scheduler.submit("file.xlsx", writes.append, i)
+    release.set()
+    assert scheduler.wait_for("file.xlsx", timeout=TIMEOUT)
+    assert writes == [2]
+
+
+def test_full_queue_rejects_new_targets_but_coalesces_queued_ones():
+    scheduler = JobScheduler(max_workers=1, max_queue=1)
+    _, release = block_worker(scheduler)
+    writes = []
+
+    scheduler.submit("changelog", writes.append, ["e1"], merge=concat_args)
+    with pytest.raises(QueueFullError):
+        scheduler.submit("projects", writes.append, {"p1": 1})
+    scheduler.submit("changelog", writes.append, ["e2"], merge=concat_args)
+
+    release.set()
+    assert scheduler.wait_for("changelog", timeout=TIMEOUT)
+    assert writes == [["e1", "e2"]]
+
+
+def test_wait_for_waits_for_running_job():
+    scheduler = JobScheduler(max_workers=1)
+    job, release = block_worker(scheduler, target="projects")
+
+    assert not scheduler.wait_for("projects", timeout=0.05)
+    assert scheduler.active() == [job]
+    release.set()
+    assert scheduler.wait_for("projects", timeout=TIMEOUT)
+    assert job.done and scheduler.active() == []
+    assert scheduler.wait_for("unknown", timeout=0)
+
+
+def test_jobs_of_one_target_do_not_overlap():
+    scheduler = JobScheduler(max_workers=2)
+    first, release = block_worker(scheduler, target="projects")
+    overlapped = []
+
+    second = scheduler.submit("projects", lambda: overlapped.append(not first.done))
+    assert second is not first
+    assert not second.wait(0.05)
+
+    release.set()
+    assert second.wait(TIMEOUT)
+    assert overlapped == [False]
+
+
+def test_errors_and_progress_are_reported_on_the_job():
+    scheduler = JobScheduler(max_workers=1)
+
+    def fail():
+        raise OSError("диск заполнен")
+
+    def with_progress(progress):
+        progress(0.5, "половина")
+        return "ok"
+
+    failed = scheduler.submit("a", fail)
+    reported = scheduler.submit("b", with_progress, progress=True)
+    assert failed.wait(TIMEOUT) and reported.wait(TIMEOUT)
+    assert failed.status == "error" and str(failed.error) == "диск заполнен"
+    assert (reported.status, reported.result, reported.progress, reported.message) == ("done", "ok", 1.0, "половина")
+    assert scheduler.get(failed.id) is failed
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from core.portfolio import PortfolioRollups, parse_financial_sheet, parse_target_revenue, project_amounts
+
+
+def attributes(status, department="Продажи", owner="Иванов"):
+    return {"status": status, "department": department, "owner": owner}
+
+
+def totals_by_year(rollups):
+    return dict(zip(rollups.by_year()["Год"], rollups.by_year()["Сумма (млн руб)"]))
+
+
+def test_financial_sheet_sums_year_columns():
+    df = pd.DataFrame({"Показатель": ["Выручка", "Затраты", "Итого"],
+                       "2025": ["1 200,5", "-200", "н/д"], "2026 ": ["", "", ""]})
+    assert parse_financial_sheet(df) == {2025: 1000.5}
+
+
+def test_target_revenue_takes_lower_bound_of_ranges():
+    assert parse_target_revenue("120 млн руб (2025), 80-100 млн руб (2026)") == {2025: 120.0, 2026: 80.0}
+    assert project_amounts({"target_revenue": "50 млн руб (2027)"}, pd.DataFrame()) == {2027: 50.0}
+
+
+def test_incremental_updates_match_totals():
+    rollups = PortfolioRollups()
+    rollups.set_project("p1", attributes("L1"), {2025: 100.0})
+    rollups.set_project("p2", attributes("L2"), {2025: 50.0, 2026: 30.0})
+
+    rollups.set_project("p1", attributes("L2"))
+    rollups.set_project("p2", amounts={2026: 10.0})
+
+    assert totals_by_year(rollups) == {2025: 100.0, 2026: 10.0}
+    status = rollups.rollup("status")
+    assert list(status.index) == ["L2"]
+    assert status.loc["L2", "Итого"] == 110.0
+
+    rollups.remove_project("p1")
+    assert "p1" not in rollups
+    assert totals_by_year(rollups) == {2026: 10.0}
+
+
+def test_copy_is_independent():
+    shared = PortfolioRollups()
+    shared.set_project("p1", attributes("L1"), {2025: 100.0})
+
+    own = shared.copy()
+    own.set_project("p1", amounts={2025: 290.0})
+    own.set_project("p2", attributes("L3"), {2026: 5.0})
+
+    assert totals_by_year(shared) == {2025: 100.0}
+    assert "p2" not in shared
+    assert totals_by_year(own) == {2025: 290.0, 2026: 5.0}
+    assert shared.project_amounts("p1") == {2025: 100.0}
@@ -0,0 +1,48 @@
+from core.search_index import SearchIndex, normalize_token, tokenize
+
+
+def make_index():
+    index = SearchIndex()
+    index.index_document(("p1", "Название"), "Увеличение конверсии КЭВ")
+    index.index_document(("p1", "b. Финансовое влияние"), "Выручка 120 млн руб")
+    index.index_document(("p2", "Название"), "Конверсия лид → запись")
+    index.index_document(("p2", "e. Мониторинг эффекта"), "Средний чек, Выручка")
+    return index
+
+
+def test_word_forms_share_a_stem():
+    assert normalize_token("Конверсии") == normalize_token("конверсию") == normalize_token("конверсия")
+    assert normalize_token("Ёмкости") == "емкост"
+    # Короткие слова и числа не обрезаются
+    assert tokenize("КЭВ 2025 чек") == ["кэв", "2025", "чек"]
+
+
+def test_prefix_matches():
+    index = make_index()
+    assert index.search("конв") == {("p1", "Название"), ("p2", "Название")}
+    assert index.search("конверсией") == {("p1", "Название"), ("p2", "Название")}
+    assert index.search("запис") == {("p2", "Название")}
+    assert index.search("xyz") == set()
+    assert index.search("") == set()
+
+
+def test_matches_inside_section_contents():
+    index = make_index()
+    assert index.search_projects("выручка") == {"p1": ["b. Финансовое влияние"], "p2": ["e. Мониторинг эффекта"]}
+    # Все слова запроса должны встретиться в одном документе
+    assert index.search_projects("выручка чек") == {"p2": ["e. Мониторинг эффекта"]}
+    assert index.search_projects("120 млн") == {"p1": ["b. Финансовое влияние"]}
+
+
+def test_reindexing_a_changed_project_replaces_its_terms():
+    index = make_index()
+
+    index.index_document(("p1", "Название"), "Сокращение затрат")
+    assert index.search("конверс") == {("p2", "Название")}
+    assert index.search("затрат") == {("p1", "Название")}
+
+    index.remove_document(("p2", "Название"))
+    assert index.search("конверс") == set()
+    assert ("p2", "Название") not in index
+    assert "конверс" not in index._terms
+    assert len(index) == 3
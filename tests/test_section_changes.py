@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from core import section_changes
+from core.section_changes import PendingChanges, diff_frames, has_changes, summarize
+
+
+def frame(values, index=None):
+    return pd.DataFrame({"Показатель": [name for name, _ in values], "2025": [amount for _, amount in values]},
+                        index=index)
+
+
+def test_diff_reports_cells_rows_and_columns():
+    old = frame([("Выручка", "100"), ("Затраты", "50"), ("Прибыль", "50")])
+    new = frame([("Выручка", "120"), ("Прибыль", "50"), ("Налоги", "10"), ("", "")], index=[0, 2, 3, 4])
+    new["2026"] = ""
+
+    diff = diff_frames(old, new)
+    assert diff["cells"] == [{"row": 0, "column": "2025", "old": "100", "new": "120"}]
+    assert diff["removed_rows"] == [1]
+    # Пустая строка, добавленная редактором, изменением не считается
+    assert diff["added_rows"] == [3]
+    assert diff["added_columns"] == ["2026"] and diff["removed_columns"] == []
+    assert has_changes(diff)
+    assert summarize(diff) == ("изменено ячеек: 1 (столбцы: 2025); добавлено строк: 1; удалено строк: 1; "
+                               "добавлены столбцы: 2026")
+
+
+def test_values_are_compared_as_text():
+    old = pd.DataFrame({"2025": [100.0, None]})
+    new = pd.DataFrame({"2025": ["100.0", ""]})
+    assert not has_changes(diff_frames(old, new))
+
+
+def test_repeated_edits_of_one_cell_collapse():
+    base = frame([("Выручка", "100")])
+    first = frame([("Выручка", "110")])
+    second = frame([("Выручка", "120")])
+    pending = PendingChanges()
+
+    pending.add("p1", "b", diff_frames(base, first))
+    pending.add("p1", "b", diff_frames(first, second))
+    [(project_id, section_name, diff)] = pending.drain()
+    assert (project_id, section_name) == ("p1", "b")
+    assert diff["cells"] == [{"row": 0, "column": "2025", "old": "100", "new": "120"}]
+    assert not pending
+
+
+def test_reverted_edit_and_added_then_removed_row_leave_nothing():
+    base = frame([("Выручка", "100")])
+    edited = frame([("Выручка", "110"), ("Новая", "5")])
+    pending = PendingChanges()
+
+    pending.add("p1", "b", diff_frames(base, edited))
+    pending.add("p1", "b", diff_frames(edited, base))
+    assert pending.drain() == []
+
+
+def test_is_due_counts_from_first_change_after_drain(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(section_changes, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    diff = diff_frames(frame([("Выручка", "100")]), frame([("Выручка", "110")]))
+    pending = PendingChanges()
+
+    clock[0] = 200.0
+    assert not pending.is_due(30)
+    pending.add("p1", "b", diff)
+    clock[0] = 220.0
+    pending.add("p2", "b", diff)
+    assert not pending.is_due(30)
+    clock[0] = 230.0
+    assert pending.is_due(30)
+
+    pending.drain()
+    assert not pending.is_due(30)
+    clock[0] = 300.0
+    pending.add("p1", "b", diff)
+    assert not pending.is_due(30)
@@ -0,0 +1,136 @@
+import pandas as pd
+import pytest
+
+from core.section_registry import CopyOnWrite, SectionRegistry, SectionSnapshot, SectionView
+
+KEY = "p1_b. Финансовое влияние"
+
+
+def make_snapshot(loader=None):
+    frames = {KEY: pd.DataFrame({"Показатель": ["Выручка"], "2025": ["100"]})}
+    return SectionSnapshot(frames, {"b. Финансовое влияние": KEY}, loader)
+
+
+def test_edits_stay_in_the_session():
+    snapshot = make_snapshot()
+    first, second = SectionView(snapshot), SectionView(snapshot)
+
+    first["b. Финансовое влияние"] = pd.DataFrame({"Показатель": ["Выручка"], "2025": ["200"]})
+
+    assert first[KEY].loc[0, "2025"] == "200"
+    assert second[KEY].loc[0, "2025"] == "100"
+    assert snapshot.frames[KEY].loc[0, "2025"] == "100"
+    assert first.modified_keys() == {KEY}
+    assert second.modified_keys() == set()
+
+
+def test_delete_hides_shared_table_only_for_the_session():
+    snapshot = make_snapshot()
+    first, second = SectionView(snapshot), SectionView(snapshot)
+
+    del first[KEY]
+
+    assert KEY not in first
+    assert KEY in second
+    with pytest.raises(KeyError):
+        first[KEY]
+
+
+def test_loader_is_called_once_and_missing_keys_are_not_cached():
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        return pd.DataFrame({"a": ["1"]}) if key == "p2_x" else None
+
+    snapshot = make_snapshot(loader)
+    view = SectionView(snapshot)
+
+    assert list(view) == [KEY]
+    assert view["p2_x"] is not snapshot.frames["p2_x"]
+    SectionView(snapshot)["p2_x"]
+    assert "p2_y" not in view
+    assert calls == ["p2_x", "p2_y"]
+    assert sorted(view) == sorted([KEY, "p2_x"])
+
+
+def test_dirty_keys_ignore_edits_reverted_to_saved_content():
+    view = SectionView(make_snapshot())
+    original = view[KEY]
+
+    view[KEY] = pd.DataFrame({"Показатель": ["Выручка"], "2025": ["300"]})
+    assert view.dirty_keys() == {KEY}
+    view.mark_clean({KEY})
+    assert view.dirty_keys() == set()
+
+    # Выгрузка не удалась: сравниваем снова с общей таблицей
+    view.mark_dirty({KEY})
+    assert view.dirty_keys() == {KEY}
+
+    view[KEY] = original.copy()
+    assert view.dirty_keys() == set()
+
+
+def test_registry_rebuilds_only_on_new_version():
+    registry = SectionRegistry()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {}, {}
+
+    first = registry.get_or_build(("v1",), build)
+    assert registry.get_or_build(("v1",), build) is first
+    assert registry.get_or_build(("v2",), build) is not first
+    assert len(builds) == 2
+
+
+def test_derived_is_built_once_per_snapshot_without_session_edits():
+    snapshot = make_snapshot()
+    view = SectionView(snapshot)
+    view[KEY] = pd.DataFrame({"Показатель": ["Выручка"], "2025": ["999"]})
+    builds = []
+
+    def build(sections):
+        builds.append(1)
+        return sections[KEY].loc[0, "2025"]
+
+    assert view.derived("total", build) == "100"
+    assert SectionView(snapshot).derived("total", build) == "100"
+    assert len(builds) == 1
+
+
+def test_copy_on_write_copies_before_first_edit():
+    shared = {"2025": 100}
+    wrapper = CopyOnWrite(shared)
+
+    assert wrapper.get() is shared
+    assert wrapper.is_shared
+    assert wrapper.session_nbytes() == 0
+
+    wrapper.own()["2025"] = 200
+    assert wrapper.own() is wrapper.get()
+    assert not wrapper.is_shared
+    assert shared == {"2025": 100}
+    assert wrapper.get() == {"2025": 200}
+    assert wrapper.session_nbytes() > 0
+
+
+def test_loader_error_is_visible_to_every_session_and_retried():
+    attempts = []
+
+    def loader(key):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise OSError("файл занят")
+        return pd.DataFrame({"a": ["1"]})
+
+    snapshot = make_snapshot(loader)
+    first, second = SectionView(snapshot), SectionView(snapshot)
+
+    assert "p2_x" not in first
+    assert str(second.load_error("p2_x")) == "файл занят"
+
+    assert "p2_x" in second
+    assert first.load_error("p2_x") is None
+    assert attempts == ["p2_x", "p2_x"]
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from core.storage import ConflictError, create_storage
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path):
+    return create_storage(request.param, str(tmp_path / "projects_database.json"), str(tmp_path / "changelog.jsonl"),
+                          db_file=str(tmp_path / "smartpm.db"))
+
+
+def project(project_id, name="Проект", last_updated="2025-05-01T10:00:00"):
+    return {"id": project_id, "name": name, "sections": {"a. Детали инициативы": ""}, "last_updated": last_updated}
+
+
+def test_projects_round_trip_and_upsert(storage):
+    storage.save_projects({"p1": project("p1"), "p2": project("p2")})
+    storage.upsert_projects({"p2": project("p2", name="Новое название"), "p3": project("p3")})
+
+    projects = storage.load_projects()
+    assert list(projects) == ["p1", "p2", "p3"]
+    assert projects["p2"]["name"] == "Новое название"
+    assert projects["p1"] == project("p1")
+
+
+def test_save_project_detects_concurrent_change(storage):
+    storage.save_project(project("p1"))
+    storage.save_project(project("p1", name="Сессия A", last_updated="2025-05-02T10:00:00"),
+                         expected_last_updated="2025-05-01T10:00:00")
+
+    with pytest.raises(ConflictError):
+        storage.save_project(project("p1", name="Сессия B", last_updated="2025-05-03T10:00:00"),
+                             expected_last_updated="2025-05-01T10:00:00")
+    assert storage.load_projects()["p1"]["name"] == "Сессия A"
+
+
+def test_new_project_saves_with_expected_version(storage):
+    storage.save_project(project("p1"), expected_last_updated="2025-01-01T00:00:00")
+    assert "p1" in storage.load_projects()
+
+
+def test_changelog_append_and_load(storage):
+    storage.append_changelog({"id": "e1", "project_id": "p1", "timestamp": "2025-05-01T10:00:00"})
+    storage.append_changelog_entries([{"id": "e2", "project_id": "p1", "timestamp": "2025-05-02T10:00:00"}])
+    assert [entry["id"] for entry in storage.load_changelog()] == ["e1", "e2"]
+
+
+def test_sqlite_sections_round_trip(tmp_path):
+    storage = create_storage("sqlite", str(tmp_path / "projects_database.json"), str(tmp_path / "changelog.jsonl"),
+                             db_file=str(tmp_path / "smartpm.db"))
+    df = pd.DataFrame({"Показатель": ["Выручка", ""], "2025": [35123456.78, None]})
+
+    assert storage.save_sections({"p1_b. Финансовое влияние": df}) == 1
+    version = storage.sections_version()
+
+    assert storage.section_keys() == {"p1_b. Финансовое влияние"}
+    pd.testing.assert_frame_equal(storage.load_section("p1_b. Финансовое влияние"), df)
+    assert storage.load_section("p1_missing") is None
+    storage.save_sections({"p1_c. Поддерживающие расчеты": df})
+    assert storage.sections_version() != version
+
+
+def test_json_storage_does_not_store_sections(tmp_path):
+    storage = create_storage("json", str(tmp_path / "projects_database.json"), str(tmp_path / "changelog.jsonl"))
+    assert storage.save_sections({"p1_a": pd.DataFrame({"a": ["1"]})}) == 0
+    assert storage.section_keys() == set()
+    assert storage.load_section("p1_a") is None
+
+
+def test_sqlite_imports_existing_json_data(tmp_path):
+    projects_file, changelog_file = str(tmp_path / "projects_database.json"), str(tmp_path / "changelog.jsonl")
+    json_storage = create_storage("json", projects_file, changelog_file)
+    json_storage.save_projects({"p1": project("p1")})
+    json_storage.append_changelog({"id": "e1", "project_id": "p1", "timestamp": "2025-05-01T10:00:00"})
+
+    storage = create_storage("sqlite", projects_file, changelog_file, db_file=str(tmp_path / "smartpm.db"))
+    assert storage.load_projects() == {"p1": project("p1")}
+    assert [entry["id"] for entry in storage.load_changelog()] == ["e1"]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_storage("csv", "projects_database.json", "changelog.jsonl")